@@ -0,0 +1,63 @@
+import asyncio
+import sys
+import os
+import time
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph, START, END
+from src.core.state import AgentState
+from src.agent.tool_node import build_tool_node
+from src.tools.web import search_web, scrape_website
+
+# Simulated network latency per tool (seconds)
+LATENCY = {"scrape_website": [0.4, 0.6, 0.8], "search_web": [0.5]}
+
+
+def stub(name):
+    delays = iter(LATENCY[name] * 10)
+
+    async def fake(**kwargs):
+        await asyncio.sleep(next(delays))
+        return f"{name} ok"
+
+    return fake
+
+
+async def run_benchmark():
+    scrape_website.coroutine = stub("scrape_website")
+    search_web.coroutine = stub("search_web")
+
+    turn = AIMessage(
+        content="",
+        tool_calls=[
+            {"name": "scrape_website", "args": {"url": f"https://example.com/{i}"}, "id": f"s{i}"}
+            for i in range(3)
+        ]
+        + [{"name": "search_web", "args": {"query": "agent zero"}, "id": "q0"}],
+    )
+    # ToolNode needs a graph runtime, so run it as a single-node graph.
+    workflow = StateGraph(AgentState)
+    workflow.add_node("tools", build_tool_node([search_web, scrape_website]))
+    workflow.add_edge(START, "tools")
+    workflow.add_edge("tools", END)
+    tools_app = workflow.compile()
+
+    start = time.perf_counter()
+    result = await tools_app.ainvoke({"messages": [turn], "step_count": 0})
+    elapsed = time.perf_counter() - start
+
+    serial = sum(sum(v) for v in LATENCY.values())
+    slowest = max(max(v) for v in LATENCY.values())
+    print("Multi-tool turn: 3x scrape_website + 1x search_web")
+    print(f"  tool messages : {len(result['messages']) - 1}")
+    print(f"  sum of tools  : {serial:.2f}s")
+    print(f"  slowest tool  : {slowest:.2f}s")
+    print(f"  wall clock    : {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
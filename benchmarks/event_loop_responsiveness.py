@@ -0,0 +1,93 @@
+import asyncio
+import sys
+import os
+import time
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from langchain_core.messages import AIMessage
+from src.agent import graph
+
+LLM_DELAY = 1.0  # seconds the stubbed model "thinks"
+TICK = 0.01  # heartbeat interval used to probe the event loop
+
+
+class SlowStubLLM:
+    """Stands in for `llm_with_tools`: answers after `delay` seconds."""
+
+    def __init__(self, delay: float = LLM_DELAY):
+        self.delay = delay
+
+    def invoke(self, messages, **kwargs):
+        time.sleep(self.delay)
+        return AIMessage(content="done")
+
+    async def ainvoke(self, messages, **kwargs):
+        await asyncio.sleep(self.delay)
+        return AIMessage(content="done")
+
+
+async def heartbeat(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def measure(label, run):
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(heartbeat(stop, lags))
+    await asyncio.sleep(TICK * 2)
+
+    start = time.perf_counter()
+    await run()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    print(
+        f"{label:<28} wall={elapsed:.2f}s ticks={len(lags):>4} "
+        f"max_lag={max(lags) * 1000:8.1f}ms"
+    )
+
+
+async def run_benchmark():
+    print("Event-loop responsiveness during a stubbed LLM call")
+    print(f"LLM delay: {LLM_DELAY}s, heartbeat every {TICK * 1000:.0f}ms\n")
+
+    state = {"messages": [("user", "hello")], "step_count": 0}
+
+    async def blocking():
+        # What a sync `invoke` inside the loop does: the loop stalls.
+        graph.reason_node({"messages": [], "step_count": 0})
+
+    async def non_blocking():
+        await graph.app.ainvoke(state)
+
+    # Warm up both paths with an instant model so one-off setup on the first
+    # call (model and graph initialisation) is not timed as LLM latency.
+    graph.llm_with_tools = SlowStubLLM(delay=0)
+    await blocking()
+    await non_blocking()
+    graph.llm_with_tools = SlowStubLLM()
+
+    await measure("sync reason_node (inline)", blocking)
+    await measure("async reason_node (graph)", non_blocking)
+
+    # Cancellation: the in-flight call is abandoned as soon as the task is cancelled.
+    task = asyncio.create_task(graph.app.ainvoke(state))
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    print(f"\ncancel latency: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
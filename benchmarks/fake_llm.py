@@ -0,0 +1,78 @@
+import asyncio
+import time
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from src.agent.prompt import CONTEXT_MARKER
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Deterministic stand-in for Gemini.
+
+    `steps` is a list of tool-call batches, each a list of `(tool_name, args)`.
+    Within a user turn the model emits batch N on its N-th step and then
+    `answer` once the script is exhausted, so every turn replays the same
+    trajectory. `latency` simulates model think time per call.
+    """
+
+    steps: List[List[tuple]] = []
+    answer: str = "Done."
+    latency: float = 0.0
+    calls: int = 0
+    bound_tools: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        self.bound_tools = [getattr(t, "name", str(t)) for t in tools]
+        return self
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        self.calls += 1
+        step = 0
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                if str(message.content).startswith(CONTEXT_MARKER):
+                    continue
+                break
+            if isinstance(message, AIMessage):
+                step += 1
+
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        usage = {
+            "input_tokens": prompt_chars // 4,
+            "output_tokens": 10,
+            "total_tokens": prompt_chars // 4 + 10,
+        }
+        if step < len(self.steps):
+            tool_calls = [
+                {"name": name, "args": args, "id": f"call-{self.calls}-{i}"}
+                for i, (name, args) in enumerate(self.steps[step])
+            ]
+            return AIMessage(content="", tool_calls=tool_calls, usage_metadata=usage)
+        return AIMessage(content=self.answer, usage_metadata=usage)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
@@ -0,0 +1,139 @@
+"""Load test for the multi-session server (src/server.py).
+
+Starts the server in-process with `get_llm()` swapped for the scripted fake
+model, then drives many concurrent WebSocket sessions through several turns
+each. Reports turn latency, throughput, queueing and memory, and checks that
+every session's files landed in its own workspace.
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --clients 100 --turns 5 --max-active 16 --llm-latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add project root to sys.path to allow imports
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ["WORKSPACE_ROOT"] = tempfile.mkdtemp(prefix="agent-zero-load-")
+os.environ["STREAM_OUTPUT"] = "false"
+os.environ["TRACE_ENABLED"] = "false"
+
+from websockets.asyncio.client import connect
+
+from benchmarks.fake_llm import ScriptedChatModel
+import src.core.llm
+
+# Every turn writes a note and reads it back, so sessions touch their workspaces.
+SCRIPT = [
+    [("write_file", {"filename": "note.md", "content": "# Note\n" + "load test " * 100})],
+    [("read_file", {"filename": "note.md"})],
+]
+
+fake_llm = ScriptedChatModel(steps=SCRIPT, answer="Wrote and checked note.md.")
+src.core.llm.get_llm = lambda *args, **kwargs: fake_llm
+
+from src.config import settings  # noqa: E402
+from src.server import AgentServer, run_server, session_workspace  # noqa: E402
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p95_ms": samples[int(len(samples) * 0.95) - 1] * 1000,
+        "n": len(samples),
+    }
+
+
+async def client(port: int, session_id: str, turns: int, latencies: list, counts: dict):
+    async with connect(f"ws://127.0.0.1:{port}/sessions/{session_id}", max_queue=None) as ws:
+        hello = json.loads(await ws.recv())
+        assert hello["type"] == "session" and hello["id"] == session_id, hello
+        for turn in range(turns):
+            start = time.perf_counter()
+            await ws.send(json.dumps({"type": "message", "content": f"turn {turn}: write a note"}))
+            # A second message while the turn runs must be refused
+            if turn == 0:
+                await ws.send(json.dumps({"type": "message", "content": "too early"}))
+            while True:
+                event = json.loads(await ws.recv())
+                counts[event["type"]] = counts.get(event["type"], 0) + 1
+                if event["type"] == "done":
+                    break
+                if event["type"] == "error" and "already running" not in event["message"]:
+                    raise RuntimeError(f"{session_id}: {event['message']}")
+            latencies.append(time.perf_counter() - start)
+
+
+async def run(args) -> dict:
+    fake_llm.latency = args.llm_latency
+    settings.server_max_active_turns = args.max_active
+    settings.server_max_sessions = max(settings.server_max_sessions, args.clients)
+
+    tracemalloc.start()
+    ready = asyncio.get_running_loop().create_future()
+    server_task = asyncio.create_task(run_server("127.0.0.1", 0, ready))
+    server, port = await ready
+    assert isinstance(server, AgentServer)
+
+    latencies, counts = [], {}
+    session_ids = [f"load-{i}" for i in range(args.clients)]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(client(port, session_id, args.turns, latencies, counts) for session_id in session_ids)
+    )
+    wall = time.perf_counter() - start
+    peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+
+    server_task.cancel()
+    try:
+        await server_task
+    except asyncio.CancelledError:
+        pass
+
+    isolated = all(
+        os.path.exists(os.path.join(session_workspace(s), "note.md")) for s in session_ids
+    ) and not os.path.exists(os.path.join(settings.workspace_root, "note.md"))
+    return {
+        "config": {
+            "clients": args.clients,
+            "turns": args.turns,
+            "max_active_turns": args.max_active,
+            "llm_latency_s": args.llm_latency,
+        },
+        "turn_latency": summarize(latencies),
+        "wall_s": wall,
+        "turns_per_s": len(latencies) / wall,
+        "events": counts,
+        "rejected_concurrent_messages": counts.get("error", 0),
+        "workspaces_isolated": isolated,
+        "peak_heap_kb": peak_kb,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50, help="concurrent sessions")
+    parser.add_argument("--turns", type=int, default=3, help="turns per session")
+    parser.add_argument("--max-active", type=int, default=8, help="server_max_active_turns")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="fake model think time (s)")
+    results = asyncio.run(run(parser.parse_args()))
+    print(json.dumps(results, indent=2))
+    if not results["workspaces_isolated"]:
+        sys.exit("Session workspaces were not isolated.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import itertools
+import json
+import random
+import statistics
+import sys
+import os
+import tempfile
+import time
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from src.tools.memory import FactStore
+
+SIZES = [1_000, 10_000, 100_000]
+OPS = 200  # timed single-key operations per size
+JSON_OPS = 5  # the legacy store is too slow to time more at 100k
+VOCABULARY = 20_000  # distinct words in the synthetic facts, Zipf-distributed
+
+
+def per_op(fn, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def bench_sqlite(tmp, size):
+    store = FactStore(os.path.join(tmp, f"facts_{size}.db"))
+    store.put_many((f"key-{i}", f"value number {i}") for i in range(size))
+
+    put = per_op(lambda i: store.put(f"key-{i * 7 % size}", f"updated {i}"), OPS)
+    get = per_op(lambda i: store.get(f"key-{i * 13 % size}"), OPS)
+    store.close()
+    return put, get
+
+
+def bench_legacy_json(tmp, size):
+    # Mirrors the old store_fact/retrieve_fact: load everything, touch one key, rewrite.
+    path = os.path.join(tmp, f"facts_{size}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({f"key-{i}": f"value number {i}" for i in range(size)}, f, indent=4)
+
+    def put(i):
+        with open(path, "r", encoding="utf-8") as f:
+            memory = json.load(f)
+        memory[f"key-{i}"] = f"updated {i}"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(memory, f, indent=4)
+
+    def get(i):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get(f"key-{i}")
+
+    return per_op(put, JSON_OPS), per_op(get, JSON_OPS)
+
+
+def synthetic_facts(size, rng):
+    words = [f"w{i}" for i in range(VOCABULARY)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(VOCABULARY)))
+    for i in range(size):
+        key = "_".join(rng.choices(words, cum_weights=cum_weights, k=2)) + f"_{i}"
+        yield key, " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(4, 12)))
+
+
+def bench_search(tmp, size):
+    """search_facts latency: queries are 2-3 words taken from a random fact."""
+    rng = random.Random(size)
+    store = FactStore(os.path.join(tmp, f"search_{size}.db"))
+    facts = list(synthetic_facts(size, rng))
+    store.put_many(facts)
+
+    start = time.perf_counter()
+    store.search("warm up", 5)  # first search builds the index
+    build = time.perf_counter() - start
+
+    samples = []
+    for _ in range(OPS):
+        words = rng.choice(facts)[1].split()
+        query = " ".join(rng.sample(words, min(len(words), rng.randint(2, 3))))
+        start = time.perf_counter()
+        store.search(query, 5)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    store.close()
+    return build, statistics.median(samples) * 1e6, samples[int(len(samples) * 0.95) - 1] * 1e6
+
+
+def run_benchmark():
+    print("Per-operation latency (microseconds)\n")
+    print(f"{'facts':>8} | {'sqlite put':>11} {'sqlite get':>11} | {'json put':>11} {'json get':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            s_put, s_get = bench_sqlite(tmp, size)
+            j_put, j_get = bench_legacy_json(tmp, size)
+            print(f"{size:>8} | {s_put:>11.1f} {s_get:>11.1f} | {j_put:>11.1f} {j_get:>11.1f}")
+
+        print("\nsearch_facts (top 5)\n")
+        print(f"{'facts':>8} | {'index build':>11} | {'p50 us':>9} {'p95 us':>9}")
+        for size in SIZES:
+            build, p50, p95 = bench_search(tmp, size)
+            print(f"{size:>8} | {build * 1000:>9.0f}ms | {p50:>9.1f} {p95:>9.1f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,297 @@
+"""Offline benchmark suite for the agent graph.
+
+Swaps `get_llm()` for a scripted fake model and stubs the network tools, then
+measures per-node overhead, tool latency, memory growth over a long session
+and throughput of concurrent graph runs. Results are written as JSON and
+compared against a stored baseline.
+
+    python benchmarks/run_benchmarks.py                   # run + compare
+    python benchmarks/run_benchmarks.py --save-baseline   # record a new baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add project root to sys.path to allow imports
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ["WORKSPACE_ROOT"] = tempfile.mkdtemp(prefix="agent-zero-bench-")
+os.environ["STREAM_OUTPUT"] = "false"
+
+from benchmarks.fake_llm import ScriptedChatModel
+import src.core.llm
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+REGRESSION_THRESHOLD = 0.5  # flag metrics that get >50% worse
+NOISE_FLOOR_MS = 0.5  # ignore absolute changes below scheduling noise
+
+# A research-style turn: search, scrape two pages concurrently, write and re-read a report.
+SCRIPT = [
+    [("search_web", {"query": "langgraph checkpointing"})],
+    [
+        ("scrape_website", {"url": "https://example.com/a"}),
+        ("scrape_website", {"url": "https://example.com/b"}),
+    ],
+    [("write_file", {"filename": "report.md", "content": "# Report\n" + "findings " * 200})],
+    [("read_file", {"filename": "report.md"})],
+]
+
+fake_llm = ScriptedChatModel(steps=SCRIPT, answer="Saved the report to report.md.")
+src.core.llm.get_llm = lambda *args, **kwargs: fake_llm
+
+from src.agent import graph  # noqa: E402  (must import after get_llm is swapped)
+from src.tools.web import search_web, scrape_website  # noqa: E402
+from src.tools.media import get_youtube_transcript  # noqa: E402
+
+NETWORK_LATENCY = 0.0
+PAYLOAD = "stubbed network content " * 160  # ~4k chars, like a trimmed scrape
+
+
+def stub_network_tools():
+    for tool in (search_web, scrape_website, get_youtube_transcript):
+
+        def func(*args, **kwargs):
+            time.sleep(NETWORK_LATENCY)
+            return PAYLOAD
+
+        async def coroutine(*args, **kwargs):
+            await asyncio.sleep(NETWORK_LATENCY)
+            return PAYLOAD
+
+        tool.func = func
+        tool.coroutine = coroutine
+
+
+def new_state(text="Research langgraph checkpointing and write a report."):
+    return {"messages": [("user", text)], "step_count": 0}
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def atimed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p95_ms": samples[int(len(samples) * 0.95) - 1] * 1000,
+        "n": len(samples),
+    }
+
+
+async def bench_node_overhead(repeat):
+    """Per-step cost of our own code, with a zero-latency model and tools."""
+    final = await graph.app.ainvoke(new_state())
+    history = final["messages"]
+    tool_turn = {"messages": history[:2], "step_count": 1}  # user + first tool call
+
+    tools_app = graph.StateGraph(graph.AgentState)
+    tools_app.add_node("tools", graph.build_tool_node(graph.tools_list))
+    tools_app.add_edge(graph.START, "tools")
+    tools_app.add_edge("tools", graph.END)
+    tools_app = tools_app.compile()
+
+    steps = len([m for m in history if m.type == "ai"])
+    run = await atimed(lambda: graph.app.ainvoke(new_state()), repeat)
+    return {
+        "reason_node": await atimed(lambda: graph.areason_node(final), repeat),
+        "router": timed(lambda: graph.router(final), repeat * 10),
+        "compact_node": timed(lambda: graph.compact_node(final), repeat),
+        "tool_node": await atimed(lambda: tools_app.ainvoke(tool_turn), repeat),
+        "graph_step": {k: v / steps if k != "n" else v for k, v in run.items()},
+        "steps_per_run": steps,
+    }
+
+
+async def bench_tools(repeat):
+    """Latency of local tools against the scratch workspace."""
+    by_name = {t.name: t for t in graph.tools_list}
+    await by_name["write_file"].ainvoke({"filename": "notes.txt", "content": "x" * 10_000})
+    cases = {
+        "write_file": {"filename": "notes.txt", "content": "x" * 10_000},
+        "read_file": {"filename": "notes.txt"},
+        "list_files": {"directory": "."},
+        "store_fact": {"key": "editor", "value": "vim"},
+        "retrieve_fact": {"key": "editor"},
+        "explore_project": {"directory": "."},
+        "search_web": {"query": "stubbed"},
+        "scrape_website": {"url": "https://example.com"},
+    }
+    results = {}
+    for name, args in cases.items():
+        results[name] = await atimed(lambda: by_name[name].ainvoke(args), repeat)
+    return results
+
+
+async def bench_memory_growth(turns):
+    """Python heap growth while one session accumulates `turns` turns."""
+    tracemalloc.start()
+    state = {"messages": [], "step_count": 0}
+    samples = []
+    for turn in range(turns):
+        state["messages"] = list(state["messages"]) + [("user", f"turn {turn}")]
+        state["step_count"] = 0
+        state = await graph.app.ainvoke(state)
+        if turn % max(turns // 10, 1) == 0 or turn == turns - 1:
+            samples.append({"turn": turn + 1, "kb": tracemalloc.get_traced_memory()[0] / 1024})
+    peak = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return {
+        "turns": turns,
+        "messages": len(state["messages"]),
+        "start_kb": samples[0]["kb"],
+        "end_kb": samples[-1]["kb"],
+        "peak_kb": peak,
+        "samples": samples,
+    }
+
+
+async def bench_throughput(concurrency, latency, rounds=3):
+    """Completed graph runs per second with `concurrency` sessions in flight
+    (best of `rounds`, to damp scheduler noise)."""
+    fake_llm.latency = latency
+    walls = []
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await asyncio.gather(*(graph.app.ainvoke(new_state()) for _ in range(concurrency)))
+            walls.append(time.perf_counter() - start)
+    finally:
+        fake_llm.latency = 0.0
+    return {
+        "concurrency": concurrency,
+        "llm_latency_s": latency,
+        "wall_s": min(walls),
+        "runs_per_s": concurrency / min(walls),
+    }
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Returns metrics that got worse than the baseline by more than the threshold.
+    Medians and memory regress upwards, throughput downwards; means and p95s
+    are recorded but too noisy to gate on."""
+    current, previous = flatten(results["metrics"]), flatten(baseline["metrics"])
+    regressions = []
+    for name, old in previous.items():
+        new = current.get(name)
+        if new is None or not old or name.endswith(".n") or "samples" in name:
+            continue
+        higher_is_better = name.endswith("runs_per_s")
+        if not (higher_is_better or name.endswith("p50_ms") or name.endswith("_kb")):
+            continue
+        if name.endswith("_ms") and abs(new - old) < NOISE_FLOOR_MS:
+            continue
+        change = (old - new) / old if higher_is_better else (new - old) / old
+        if change > threshold:
+            regressions.append((name, old, new, change))
+    return regressions
+
+
+async def run(args):
+    stub_network_tools()
+    metrics = {
+        "node_overhead": await bench_node_overhead(args.repeat),
+        "tools": await bench_tools(args.repeat),
+        "memory": await bench_memory_growth(args.turns),
+        "throughput": await bench_throughput(args.concurrency, args.llm_latency),
+    }
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "repeat": args.repeat,
+            "turns": args.turns,
+            "concurrency": args.concurrency,
+            "llm_latency": args.llm_latency,
+        },
+        "metrics": metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    overhead = results["metrics"]["node_overhead"]
+    for name in ("reason_node", "router", "compact_node", "tool_node", "graph_step"):
+        print(f"  {name:<14} p50={overhead[name]['p50_ms']:.3f}ms p95={overhead[name]['p95_ms']:.3f}ms")
+    memory = results["metrics"]["memory"]
+    print(f"  memory         {memory['start_kb']:.0f}KB -> {memory['end_kb']:.0f}KB over {memory['turns']} turns")
+    throughput = results["metrics"]["throughput"]
+    print(f"  throughput     {throughput['runs_per_s']:.1f} runs/s at concurrency {throughput['concurrency']}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline found; run with --save-baseline to record one.")
+        return 0
+
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["config"] != results["config"]:
+        print(f"Warning: baseline was recorded with {baseline['config']}; numbers may not be comparable.")
+    regressions = compare(results, baseline, args.threshold)
+    if not regressions:
+        print("No regressions against baseline.")
+        return 0
+    print("Regressions against baseline:")
+    for name, old, new, change in regressions:
+        print(f"  {name}: {old:.3f} -> {new:.3f} (+{change:.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Startup benchmark: how long it takes to import the agent and to answer `--help`.
+
+Each measurement runs in a fresh interpreter (`python -X importtime`), so
+nothing is cached in-process. Also checks that the heavy client libraries
+(Gemini SDK, GitPython, search/scraping, transcripts) are not imported until a
+model call or tool call needs them.
+
+    python benchmarks/startup.py                   # run + compare
+    python benchmarks/startup.py --save-baseline   # record a new baseline
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "startup_baseline.json")
+REGRESSION_THRESHOLD = 0.5
+
+COMMANDS = {
+    "import_graph": ["-c", "import src.agent.graph"],
+    "cli_help": ["-m", "src.main", "--help"],
+}
+# Loaded on first use only; importing any of them at startup is a regression.
+DEFERRED_MODULES = [
+    "langchain_google_genai",
+    "google.genai",
+    "git",
+    "duckduckgo_search",
+    "bs4",
+    "youtube_transcript_api",
+]
+PROBE = "import sys, json, src.agent.graph; print(json.dumps([m for m in {modules!r} if m in sys.modules]))"
+
+
+def parse_importtime(stderr: str):
+    """Returns `(total_us, [(cumulative_us, module), ...])`: the total over
+    top-level imports, and the imports those pulled in directly."""
+    total, modules = 0, []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            total += int(cumulative)
+        elif depth == 1:
+            modules.append((int(cumulative), name.strip()))
+    return total, sorted(modules, reverse=True)
+
+
+def measure(args, repeat: int, env: dict) -> dict:
+    walls, imports, top = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        done = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+        walls.append(time.perf_counter() - start)
+        if done.returncode != 0:
+            raise RuntimeError(done.stderr[-2000:])
+        total, top = parse_importtime(done.stderr)
+        imports.append(total)
+    return {
+        "wall_p50_ms": statistics.median(walls) * 1000,
+        "imports_p50_ms": statistics.median(imports) / 1000,
+        "top_imports": {name: us / 1000 for us, name in top[:8]},
+    }
+
+
+def deferred_imports_loaded(env: dict) -> list:
+    done = subprocess.run(
+        [sys.executable, "-c", PROBE.format(modules=DEFERRED_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    env = dict(os.environ, GOOGLE_API_KEY=os.environ.get("GOOGLE_API_KEY", "offline-benchmark"))
+    metrics = {name: measure(command, args.repeat, env) for name, command in COMMANDS.items()}
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"repeat": args.repeat},
+        "metrics": metrics,
+    }
+    for name, m in metrics.items():
+        print(f"  {name:<13} wall={m['wall_p50_ms']:.0f}ms imports={m['imports_p50_ms']:.0f}ms")
+        for module, ms in m["top_imports"].items():
+            print(f"      {ms:8.1f}ms  {module}")
+
+    failed = False
+    loaded = deferred_imports_loaded(env)
+    if loaded:
+        print(f"Imported at startup but should load on first use: {', '.join(loaded)}")
+        failed = True
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return int(failed)
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline found; run with --save-baseline to record one.")
+        return int(failed)
+
+    with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["metrics"]
+    for name, m in metrics.items():
+        for key in ("wall_p50_ms", "imports_p50_ms"):
+            old, new = baseline.get(name, {}).get(key), m[key]
+            if old and (new - old) / old > args.threshold:
+                print(f"Regression: {name}.{key}: {old:.0f}ms -> {new:.0f}ms")
+                failed = True
+    if not failed:
+        print("No regressions against baseline.")
+    return int(failed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
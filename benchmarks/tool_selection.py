@@ -0,0 +1,169 @@
+"""Benchmark for per-turn tool selection (src/agent/tool_selection.py).
+
+Replays a set of typical requests through the graph twice, once binding every
+tool schema and once with selection on, using a scripted fake model whose
+latency grows with the prompt size the way prefill does
+(`--base-latency` + `--prefill-ms-per-1k` per 1k input tokens; both are
+modelled, not measured against Gemini). Reports schema and input tokens per
+step, step latency, the number of steps (request_tools costs one), whether
+every scripted tool call was bound when it was made, and the selector's own
+overhead per step.
+
+    python benchmarks/tool_selection.py
+    python benchmarks/tool_selection.py --repeat 10 --prefill-ms-per-1k 40
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any
+
+# Add project root to sys.path to allow imports
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+os.environ["WORKSPACE_ROOT"] = tempfile.mkdtemp(prefix="agent-zero-tools-")
+os.environ["STREAM_OUTPUT"] = "false"
+os.environ["TRACE_ENABLED"] = "false"
+
+from benchmarks.fake_llm import ScriptedChatModel
+import src.core.llm
+
+PAYLOAD = "stubbed network content " * 40
+
+# (request, scripted tool-call batches)
+SCENARIOS = [
+    ("Fix the typo in notes.md", [
+        [("read_file", {"filename": "notes.md"})],
+        [("write_file", {"filename": "notes.md", "content": "# Notes\nfixed"})],
+    ]),
+    ("Run the tests and tell me what fails", [
+        [("execute_command", {"command": "echo 3 passed", "background": True})],
+        [("poll_job", {})],
+    ]),
+    ("Summarize this YouTube video: https://youtu.be/dQw4w9WgXcQ", [
+        [("get_youtube_transcript", {"video_url": "https://youtu.be/dQw4w9WgXcQ"})],
+        [("write_file", {"filename": "summary.md", "content": "# Summary"})],
+    ]),
+    ("Remember that I prefer tea over coffee", [
+        [("store_fact", {"key": "drink", "value": "tea"})],
+    ]),
+    ("Search the web for langgraph checkpointing and save a report", [
+        [("search_web", {"query": "langgraph checkpointing"})],
+        [("scrape_website", {"url": "https://example.com/a"})],
+        [("write_file", {"filename": "report.md", "content": "# Report"})],
+    ]),
+    # Not matched by the request: the model has to ask for a shell first
+    ("Tidy notes.md and check it still renders", [
+        [("request_tools", {"need": "run a shell command"})],
+        [("write_file", {"filename": "notes.md", "content": "# Notes"})],
+        [("execute_command", {"command": "echo rendered"})],
+    ]),
+]
+
+
+class PrefillChatModel(ScriptedChatModel):
+    """Scripted model that records the tools it was sent and sleeps longer
+    for longer prompts (tool schemas included)."""
+
+    base_latency: float = 0.0
+    prefill_ms_per_1k: float = 0.0
+    all_schemas: list = []
+    requests: list = []
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        schemas = kwargs.get("tools") or self.all_schemas
+        schema_tokens = len(json.dumps(schemas)) // 4
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        names = {s["function"]["name"] for s in schemas}
+        result = super()._generate(messages, stop, run_manager, **kwargs)
+        calls = result.generations[0].message.tool_calls
+        missing = [c["name"] for c in calls if c["name"] not in names]
+        self.requests.append((schema_tokens, prompt_tokens + schema_tokens, missing))
+        time.sleep(self.base_latency + (prompt_tokens + schema_tokens) / 1000 * self.prefill_ms_per_1k / 1000)
+        return result
+
+
+fake_llm = PrefillChatModel(answer="Done.")
+src.core.llm.get_llm = lambda *args, **kwargs: fake_llm
+
+from langchain_core.utils.function_calling import convert_to_openai_tool  # noqa: E402
+from src.agent import graph  # noqa: E402  (must import after get_llm is swapped)
+from src.agent.tool_selection import get_selector  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.tools.media import get_youtube_transcript  # noqa: E402
+from src.tools.web import scrape_website, search_web  # noqa: E402
+
+
+def stub_network_tools():
+    for tool in (search_web, scrape_website, get_youtube_transcript):
+        tool.func = lambda *args, **kwargs: PAYLOAD
+        tool.coroutine = None
+
+
+def run_mode(selection: bool, repeat: int) -> dict:
+    settings.tool_selection = selection
+    fake_llm.requests = []
+    step_latencies, histories = [], []
+    for _ in range(repeat):
+        for request, steps in SCENARIOS:
+            fake_llm.steps = steps
+            start = time.perf_counter()
+            result = graph.app.invoke({"messages": [("user", request)], "step_count": 0})
+            step_latencies.append((time.perf_counter() - start) / (len(steps) + 1))
+            histories.append(result["messages"])
+    schema_tokens = [r[0] for r in fake_llm.requests]
+    input_tokens = [r[1] for r in fake_llm.requests]
+    return {
+        "steps": len(fake_llm.requests) // repeat,
+        "schema_tokens_per_step": statistics.fmean(schema_tokens),
+        "input_tokens_per_step": statistics.fmean(input_tokens),
+        "input_tokens_total": sum(input_tokens) // repeat,
+        "step_latency_p50_ms": statistics.median(step_latencies) * 1000,
+        "unbound_tool_calls": sum(len(r[2]) for r in fake_llm.requests) // repeat,
+    }, histories
+
+
+def selector_overhead_us(histories) -> float:
+    selector = get_selector()
+    samples = []
+    for messages in histories:
+        for end in range(1, len(messages) + 1):
+            start = time.perf_counter()
+            selector.schemas(selector.select(messages[:end]))
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--base-latency", type=float, default=0.02, help="model time per call (s)")
+    parser.add_argument("--prefill-ms-per-1k", type=float, default=20.0, help="extra ms per 1k input tokens")
+    args = parser.parse_args()
+
+    stub_network_tools()
+    fake_llm.base_latency = args.base_latency
+    fake_llm.prefill_ms_per_1k = args.prefill_ms_per_1k
+    fake_llm.all_schemas = [convert_to_openai_tool(t) for t in graph.tools_list]
+
+    all_tools, _ = run_mode(False, args.repeat)
+    selected, histories = run_mode(True, args.repeat)
+    results = {
+        "config": vars(args),
+        "all_tools": all_tools,
+        "selected": selected,
+        "input_tokens_saved": 1 - selected["input_tokens_total"] / all_tools["input_tokens_total"],
+        "step_latency_saved": 1 - selected["step_latency_p50_ms"] / all_tools["step_latency_p50_ms"],
+        "selector_overhead_p50_us": selector_overhead_us(histories),
+    }
+    print(json.dumps(results, indent=2))
+    if selected["unbound_tool_calls"]:
+        sys.exit("Some tool calls were made without their schema bound.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+from langchain_core.messages import (
+    AIMessage,
+    HumanMessage,
+    RemoveMessage,
+    ToolMessage,
+)
+from src.config import settings
+from src.core.state import AgentState
+from src.core.telemetry import span
+
+CHARS_PER_TOKEN = 4
+STUB_CHARS = 300
+SUMMARY_MARKER = "[Summary of earlier conversation]"
+COMPACTED_MARKER = "[compacted]"
+MAX_SUMMARY_LINES = 30
+
+
+def message_text(message) -> str:
+    content = message.content
+    if isinstance(content, list):
+        return "".join(
+            part["text"] if isinstance(part, dict) and "text" in part else str(part)
+            for part in content
+        )
+    return str(content)
+
+
+def estimate_tokens(messages) -> int:
+    """Cheap, provider-agnostic estimate (~4 characters per token)."""
+    chars = 0
+    for message in messages:
+        chars += len(message_text(message))
+        for call in getattr(message, "tool_calls", None) or []:
+            chars += len(call["name"]) + len(str(call["args"]))
+    return chars // CHARS_PER_TOKEN
+
+
+def _recent_boundary(messages) -> int:
+    """Index of the oldest message kept verbatim: the last
+    `settings.context_keep_recent` model steps (an AI message plus its tool
+    results)."""
+    seen = 0
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], AIMessage):
+            seen += 1
+            if seen == settings.context_keep_recent:
+                return i
+    return 0
+
+
+def _stub(message):
+    text = message_text(message)
+    if len(text) <= STUB_CHARS or text.startswith(COMPACTED_MARKER):
+        return None
+    preview = text[:STUB_CHARS].replace("\n", " ")
+    content = f"{COMPACTED_MARKER} {preview}... ({len(text) - STUB_CHARS} chars omitted)"
+    # Copy rather than rebuild so ids, tool calls and provider metadata survive.
+    return message.model_copy(update={"content": content})
+
+
+def _summarize(messages) -> str:
+    """Deterministic digest of old turns: what was asked, which tools ran and
+    how the agent answered."""
+    lines = []
+    tools_used = []
+
+    def flush_tools():
+        if tools_used:
+            lines.append(f"Tools: {', '.join(tools_used)}")
+            tools_used.clear()
+
+    for message in messages:
+        text = message_text(message).replace("\n", " ")
+        if isinstance(message, HumanMessage):
+            flush_tools()
+            if text.startswith(SUMMARY_MARKER):
+                lines.extend(text[len(SUMMARY_MARKER):].strip().split(" | "))
+            else:
+                lines.append(f"User: {text[:200]}")
+        elif isinstance(message, AIMessage):
+            tools_used.extend(call["name"] for call in message.tool_calls)
+            if text and not message.tool_calls:
+                flush_tools()
+                lines.append(f"Agent: {text[:200]}")
+    flush_tools()
+    return f"{SUMMARY_MARKER} " + " | ".join(lines[-MAX_SUMMARY_LINES:])
+
+
+def compact_node(state: AgentState):
+    """Keeps the prompt inside `settings.context_token_budget`.
+
+    Over budget, tool outputs and long AI messages older than the recent
+    window are first replaced by short stubs. If that is not enough, every
+    turn before the current user request is folded into a single summary
+    message. Updates reuse message ids, so the `add_messages` reducer
+    rewrites history in place.
+    """
+    with span("step", "compact") as record:
+        update = _compact(state["messages"])
+        record["compacted"] = update is not None
+        return update
+
+
+def _compact(messages):
+    if estimate_tokens(messages) <= settings.context_token_budget:
+        return None
+
+    last_human = max(
+        (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0
+    )
+    boundary = _recent_boundary(messages)
+    compacted = list(messages)
+    updates = []
+
+    for i in range(boundary):
+        if i == last_human or not isinstance(messages[i], (ToolMessage, AIMessage)):
+            continue
+        stub = _stub(messages[i])
+        if stub is not None:
+            compacted[i] = stub
+            updates.append(stub)
+
+    if estimate_tokens(compacted) > settings.context_token_budget and last_human > 0:
+        old = compacted[:last_human]
+        summary = HumanMessage(content=_summarize(old), id=old[0].id)
+        updates = [u for u in updates if u.id not in {m.id for m in old}]
+        updates.append(summary)
+        updates.extend(RemoveMessage(id=m.id) for m in old[1:])
+
+    return {"messages": updates} if updates else None
@@ -1,20 +1,31 @@
-from langchain_core.messages import SystemMessage
+import asyncio
+import threading
+import warnings
+from langchain_core.runnables import RunnableLambda
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import ToolNode
 from src.core.state import AgentState
-from src.core.llm import get_llm
+from src.core.llm import get_llm, get_scheduler
+from src.core.scheduler import estimate_tokens
+from src.agent.tool_node import build_tool_node
+from src.agent.compaction import compact_node
+from src.agent.prompt import ContextCache, build_messages, current_request, usage_report
+from src.agent.routing import FAST, MAX_STEPS, STRONG, choose_tier
+from src.agent.tool_selection import get_selector, request_tools, selection_enabled
+from src.core.telemetry import span
+from src.config import settings
 from src.tools.filesystem import write_file, read_file, list_files
 from src.tools.web import search_web, scrape_website
-from src.tools.system import execute_command
+from src.tools.system import execute_command, poll_job, tail_job, kill_job
 from src.tools.media import get_youtube_transcript
-from src.tools.memory import store_fact, retrieve_fact, list_all_facts
+from src.tools.memory import store_fact, retrieve_fact, search_facts, list_all_facts, relevant_facts
 from src.tools.github import ingest_external_source, get_repo_history, get_file_diffs
 from src.tools.project import explore_project, generate_scrum_report
-from src.tools.resources import add_resource, list_resources
+from src.tools.search import search_workspace
+from src.tools.resources import add_resource, list_resources, search_resources
 from src.tools.planner import create_routine
 from src.tools.host import open_in_app
-
-from datetime import datetime
+from src.tools.artifacts import read_artifact
 
 # Define tools and LLM
 tools_list = [
@@ -24,26 +35,38 @@ tools_list = [
     search_web,
     scrape_website,
     execute_command,
+    poll_job,
+    tail_job,
+    kill_job,
     get_youtube_transcript,
     store_fact,
     retrieve_fact,
+    search_facts,
     list_all_facts,
     explore_project,
+    search_workspace,
     generate_scrum_report,
     add_resource,
     list_resources,
+    search_resources,
     create_routine,
     ingest_external_source,
     get_repo_history,
     get_file_diffs,
     open_in_app,
+    read_artifact,
+    request_tools,
 ]
 
 
-llm = get_llm()
-
-#  Bind tools to LLM
-llm_with_tools = llm.bind_tools(tools_list)
+# The models are built on the first reason step (see `_strong_model` /
+# `_fast_model`), so importing the graph does not load the Gemini client.
+llm = None
+llm_with_tools = None
+# Cheaper model for mechanical continuation steps (see src/agent/routing.py)
+fast_llm = None
+fast_llm_with_tools = None
+_models_lock = threading.Lock()
 
 # System Prompt
 SYSTEM_PROMPT = """You are Agent Zero, a versatile autonomous AI assistant.
@@ -59,31 +82,198 @@ OPERATIONAL GUIDELINES:
 2. PLAN your steps. Decide which tools are needed (e.g., search first, then scrape, then write).
 3. USE TOOLS. You interact with the world via tools. 
    - 'write_file', 'read_file', 'list_files' for file operations.
+     Large files come back as a summary; page through them with read_file's start_line/num_lines.
    - 'search_web', 'scrape_website' for internet research.
-   - 'execute_command' for shell commands in the workspace.
+   - 'execute_command' for shell commands in the workspace. For long builds or test runs pass background=True and follow up with 'poll_job', 'tail_job' or 'kill_job'.
    - 'get_youtube_transcript' for analyzing YouTube video content.
-   - 'store_fact', 'retrieve_fact', 'list_all_facts' for persistent long-term memory.
+   - 'store_fact', 'retrieve_fact', 'list_all_facts' for persistent long-term memory. Use 'search_facts' to find facts by topic instead of listing them all.
    - 'explore_project' to recursively map a directory for reports/updates.
+   - 'search_workspace' to find code or text across the workspace (regex + optional glob) instead of reading files one by one.
    - 'generate_scrum_report' to format project progress updates.
    - 'add_resource', 'list_resources' to manage and categorize links/resources.
+   - 'search_resources' to find the most relevant saved links for a topic (prefer it over 'list_resources').
    - 'create_routine' to generate realistic schedules based on tasks and deadlines.
-   - 'ingest_external_source' to clone public GitHub repos or extract .zip files into the workspace.
+   - 'ingest_external_source' to clone git repos or extract .zip files into the workspace. Clones are shallow by default; use partial/sparse_paths for very large repos.
    - 'get_repo_history' to read commit logs for status updates.
-   - 'get_file_diffs' to see uncommitted changes.
+   - 'get_file_diffs' to see uncommitted changes: a diffstat first, then one file's diff by path (paged by hunk); changes='staged' or 'all' for the index or everything since HEAD.
    - 'open_in_app' to open a workspace file in a host application (Notepad, Obsidian, etc.).
+   - 'read_artifact' to page through a long tool output. Outputs over a few thousand characters are saved as artifacts and you only see the beginning plus a handle; read further only if you need it.
+   - 'request_tools' when a tool listed here is not available to you. Only the tools relevant to the current request are attached; ask for others by name or by describing what you need.
 
 4. OBSERVE & ITERATE. If a tool fails, analyze the result and try a different approach.
 5. CONTEXTUAL MEMORY: You have a persistent memory of this session's messages. Do not "guess" or "re-read" files to find what was JUST discussed. Use the message history.
 6. FILE CONTENT PURITY: Files you create (e.g., Markdown reports, routines) must contain ONLY the raw data/requested content. NEVER include meta-comments like "(updated by agent)", "(modified)", or conversational filler inside the file itself.
+7. RUNTIME CONTEXT: The last message may start with "[Context]". It carries runtime information such as the current date; it is not a new user request.
 """
 
 
+context_cache = None  # created with the strong model in explicit cache mode
+
+
+def _strong_model():
+    """Returns `(llm, llm_with_tools)`, building them on first use. An
+    `llm_with_tools` set from outside (e.g. a test or benchmark stub) is used
+    as is, without building the Gemini client or a context cache."""
+    global llm, llm_with_tools, context_cache
+    with _models_lock:
+        if llm is None and llm_with_tools is None:
+            llm = get_llm()
+            if settings.prompt_cache_mode == "explicit":
+                context_cache = ContextCache(llm, SYSTEM_PROMPT, tools_list, settings.prompt_cache_ttl)
+            llm_with_tools = llm.bind_tools(tools_list)
+        return llm, llm_with_tools
+
+
+def _fast_model():
+    global fast_llm, fast_llm_with_tools
+    with _models_lock:
+        if fast_llm_with_tools is None:
+            fast_llm = get_llm(settings.fast_model)
+            fast_llm_with_tools = fast_llm.bind_tools(tools_list)
+        return fast_llm_with_tools
+
+
+def _prepare_call(state: AgentState, tier: str = STRONG):
+    """Returns the runnable, messages and call kwargs for one reason step.
+    With an explicit context cache the system prompt and tool schemas live in
+    the cache, so only the history and volatile context are sent. The cache
+    belongs to the strong model; fast steps use implicit caching."""
+    global context_cache
+    if tier == FAST:
+        # Not streamed: a fast step that answers is discarded (see _escalate)
+        return _fast_model(), _messages(state), {
+            "config": {"tags": [TAG_NOSTREAM]},
+            **_tool_kwargs(state),
+        }
+    model, model_with_tools = _strong_model()
+    if context_cache is not None:
+        try:
+            cache_name = context_cache.get_name()
+            messages = _messages(state, include_system=False)
+            return model, messages, {"cached_content": cache_name}
+        except Exception as e:
+            warnings.warn(f"Context cache unavailable, using implicit caching: {e}")
+            context_cache = None
+    return model_with_tools, _messages(state), _tool_kwargs(state)
+
+
+def _messages(state: AgentState, include_system: bool = True) -> list:
+    return build_messages(
+        SYSTEM_PROMPT, state["messages"], include_system, extra_context=_recalled_facts(state)
+    )
+
+
+def _recalled_facts(state: AgentState) -> str:
+    """Pre-reason hook: the stored facts most relevant to the current request
+    (`settings.memory_recall_k` of them), for the volatile context."""
+    if not settings.memory_recall_k:
+        return ""
+    facts = relevant_facts(current_request(state["messages"]), settings.memory_recall_k)
+    if not facts:
+        return ""
+    return "Possibly relevant facts from memory:\n" + "\n".join(f"- {k}: {v}" for k, v in facts)
+
+
+def _tool_kwargs(state: AgentState) -> dict:
+    """Replaces the bound tool schemas with this turn's selection
+    (see src/agent/tool_selection.py); empty when selection is off."""
+    if not selection_enabled():
+        return {}
+    selector = get_selector()
+    return {"tools": selector.schemas(selector.select(state["messages"]))}
+
+
+def _model_name(tier: str) -> str:
+    return settings.fast_model if tier == FAST else settings.gemini_model
+
+
+def _escalate(tier: str, response) -> bool:
+    """Answers are the strong model's job; a fast step may only call tools."""
+    return tier == FAST and not getattr(response, "tool_calls", None)
+
+
+def _record_usage(record: dict, response):
+    usage = usage_report(response)
+    record["prompt_tokens"] = usage["input_tokens"]
+    record["cached_tokens"] = usage["cached_tokens"]
+    record["completion_tokens"] = usage["output_tokens"]
+    record["tool_calls"] = len(getattr(response, "tool_calls", None) or [])
+
+
 # Define the Reason Node (Brain)
+def _call_model(state: AgentState, tier: str, record: dict):
+    runnable, messages, kwargs = _prepare_call(state, tier)
+    record["messages"] = len(messages)
+    record["tools"] = len(kwargs.get("tools") or tools_list)
+    scheduler = get_scheduler()
+    tokens = estimate_tokens(messages)
+    with span("model", tier, model=_model_name(tier)):
+        response = scheduler.call(lambda: runnable.invoke(messages, **kwargs), tokens)
+    scheduler.settle(tokens, response)
+    response.response_metadata["tier"] = tier
+    return response
+
+
+async def _acall_model(state: AgentState, tier: str, record: dict):
+    if settings.memory_recall_k or (tier == STRONG and (llm is None or context_cache is not None)):
+        # Building the client, creating/refreshing the cache and the first
+        # fact search (which builds the index) block.
+        runnable, messages, kwargs = await asyncio.to_thread(_prepare_call, state, tier)
+    else:
+        runnable, messages, kwargs = _prepare_call(state, tier)
+    record["messages"] = len(messages)
+    record["tools"] = len(kwargs.get("tools") or tools_list)
+    scheduler = get_scheduler()
+    tokens = estimate_tokens(messages)
+
+    async def request():
+        try:
+            return await asyncio.wait_for(
+                runnable.ainvoke(messages, **kwargs),
+                timeout=settings.llm_timeout,
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"LLM call did not complete within {settings.llm_timeout} seconds."
+            )
+
+    with span("model", tier, model=_model_name(tier)):
+        response = await scheduler.acall(request, tokens)
+    scheduler.settle(tokens, response)
+    response.response_metadata["tier"] = tier
+    return response
+
+
 def reason_node(state: AgentState):
-    current_date = datetime.now().strftime("%A, %d %B %Y")
-    prompt_text = f"{SYSTEM_PROMPT}\n\nCurrent Date: {current_date}"
-    messages = [SystemMessage(content=prompt_text)] + state["messages"]
-    response = llm_with_tools.invoke(messages)
+    """Sync path, used by `app.invoke` / `app.stream`."""
+    tier, why = choose_tier(state["messages"], state.get("step_count", 0))
+    with span("step", "reason", tier=tier, route=why) as record:
+        response = _call_model(state, tier, record)
+        if _escalate(tier, response):
+            record["tier"], record["route"] = STRONG, "fast step answered"
+            response = _call_model(state, STRONG, record)
+        _record_usage(record, response)
+
+    # Increment step count
+    step_count = state.get("step_count", 0) + 1
+
+    return {"messages": [response], "step_count": step_count}
+
+
+async def areason_node(state: AgentState):
+    """Async path, used by `app.ainvoke` / `app.astream`.
+    Awaits the model instead of blocking the event loop. Cancelling the
+    surrounding task cancels the in-flight request; a request that runs longer
+    than `settings.llm_timeout` raises TimeoutError (time spent waiting in the
+    scheduler's queue or backing off does not count).
+    """
+    tier, why = choose_tier(state["messages"], state.get("step_count", 0))
+    with span("step", "reason", tier=tier, route=why) as record:
+        response = await _acall_model(state, tier, record)
+        if _escalate(tier, response):
+            record["tier"], record["route"] = STRONG, "fast step answered"
+            response = await _acall_model(state, STRONG, record)
+        _record_usage(record, response)
 
     # Increment step count
     step_count = state.get("step_count", 0) + 1
@@ -93,8 +283,14 @@ def reason_node(state: AgentState):
 
 # Define the Router Logic
 def router(state: AgentState):
+    with span("step", "router") as record:
+        record["route"] = _route(state)
+        return record["route"]
+
+
+def _route(state: AgentState):
     # Check for infinite loops
-    if state.get("step_count", 0) > 15:
+    if state.get("step_count", 0) > MAX_STEPS:
         return END
 
     last_msg = state["messages"][-1]
@@ -108,11 +304,13 @@ def router(state: AgentState):
 workflow = StateGraph(AgentState)
 
 # Add nodes and edges
-workflow.add_node("reason", reason_node)
-workflow.add_node("tools", ToolNode(tools_list))
+workflow.add_node("compact", compact_node)
+workflow.add_node("reason", RunnableLambda(reason_node, afunc=areason_node))
+workflow.add_node("tools", build_tool_node(tools_list))
 
-workflow.add_edge(START, "reason")
+workflow.add_edge(START, "compact")
+workflow.add_edge("compact", "reason")
 workflow.add_conditional_edges("reason", router)
-workflow.add_edge("tools", "reason")
+workflow.add_edge("tools", "compact")
 
 app = workflow.compile()
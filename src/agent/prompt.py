@@ -0,0 +1,108 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+CONTEXT_MARKER = "[Context]"
+
+
+def volatile_context(extra: str = "") -> str:
+    """Per-request data. It is sent *after* the history so it never
+    invalidates the cached prefix."""
+    context = f"Current Date: {datetime.now().strftime('%A, %d %B %Y')}"
+    return f"{context}\n{extra}" if extra else context
+
+
+def build_messages(system_prompt: str, history, include_system: bool = True, extra_context: str = "") -> list:
+    """Orders the request for prefix caching: the static system prompt first
+    (tool schemas are bound separately and precede the contents), then the
+    append-only history, then volatile context (plus `extra_context`) last."""
+    messages = [SystemMessage(content=system_prompt)] if include_system else []
+    messages.extend(history)
+    messages.append(HumanMessage(content=f"{CONTEXT_MARKER}\n{volatile_context(extra_context)}"))
+    return messages
+
+
+def current_request(messages) -> str:
+    """Text of the latest user message, skipping injected context messages."""
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            if not message.text.startswith(CONTEXT_MARKER):
+                return message.text
+    return ""
+
+
+def prefix_fingerprint(system_prompt: str, tools) -> str:
+    """Hash of everything that must stay byte-identical between steps."""
+    schemas = [convert_to_openai_tool(t) for t in tools]
+    payload = system_prompt + json.dumps(schemas, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def usage_report(message) -> dict:
+    """Cached vs. uncached input tokens for one model response."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens", 0)
+    cached = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+    return {
+        "input_tokens": input_tokens,
+        "cached_tokens": cached,
+        "uncached_tokens": max(input_tokens - cached, 0),
+        "output_tokens": usage.get("output_tokens", 0),
+    }
+
+
+class ContextCache:
+    """Explicit Gemini context cache holding the system prompt and tool schemas.
+
+    The cache is created on first use, its TTL is extended once less than a
+    quarter of it remains, and it is recreated if the prefix changes. Requests
+    that use it must not resend the system prompt or tools.
+    """
+
+    def __init__(self, llm, system_prompt: str, tools, ttl: int):
+        self.llm = llm
+        self.system_prompt = system_prompt
+        self.tools = tools
+        self.ttl = ttl
+        self.name = None
+        self._fingerprint = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_name(self) -> str:
+        # The Gemini SDK is only needed once explicit caching is actually used
+        from google.genai import types
+        from langchain_google_genai._function_utils import (
+            convert_to_genai_function_declarations,
+        )
+
+        fingerprint = prefix_fingerprint(self.system_prompt, self.tools)
+        with self._lock:
+            now = time.time()
+            if self.name and fingerprint == self._fingerprint:
+                if self._expires_at - now > self.ttl / 4:
+                    return self.name
+                self.llm.client.caches.update(
+                    name=self.name,
+                    config=types.UpdateCachedContentConfig(ttl=f"{self.ttl}s"),
+                )
+                self._expires_at = now + self.ttl
+                return self.name
+
+            cache = self.llm.client.caches.create(
+                model=self.llm.model,
+                config=types.CreateCachedContentConfig(
+                    display_name="agent-zero-prefix",
+                    system_instruction=self.system_prompt,
+                    tools=convert_to_genai_function_declarations(self.tools),
+                    ttl=f"{self.ttl}s",
+                ),
+            )
+            self.name = cache.name
+            self._fingerprint = fingerprint
+            self._expires_at = now + self.ttl
+            return self.name
@@ -0,0 +1,77 @@
+"""Model tier selection for reason steps.
+
+Most steps of a long tool loop are mechanical ("read the next file", "poll the
+job again") and do not need the strongest model. With `settings.fast_model`
+set, such continuation steps go to the fast tier; planning (a new user
+request), recovery from tool errors, and the final answer go to the strong
+tier. A fast step that tries to answer instead of calling a tool is discarded
+and redone by the strong tier, so answers always come from the strong model.
+"""
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from src.agent.compaction import message_text
+from src.agent.prompt import CONTEXT_MARKER
+from src.config import settings
+
+FAST = "fast"
+STRONG = "strong"
+MAX_STEPS = 15  # reason steps per user turn before the graph stops
+
+# After these tools the next step is usually another lookup, not a decision.
+CONTINUATION_TOOLS = {
+    "read_file",
+    "list_files",
+    "explore_project",
+    "search_workspace",
+    "poll_job",
+    "tail_job",
+    "retrieve_fact",
+    "search_facts",
+    "list_all_facts",
+    "list_resources",
+    "search_resources",
+    "get_file_diffs",
+    "get_repo_history",
+    "read_artifact",
+}
+
+
+def routing_enabled() -> bool:
+    return bool(settings.fast_model) and settings.fast_model != settings.gemini_model
+
+
+def choose_tier(messages: list, step_count: int):
+    """Returns `(tier, reason)` for the next reason step."""
+    if not routing_enabled():
+        return STRONG, "single model"
+    if MAX_STEPS - step_count <= 2:
+        return STRONG, "step budget nearly spent"
+
+    results, call = [], None
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage):
+            results.append(message)
+        elif isinstance(message, AIMessage):
+            call = message
+            break
+        elif isinstance(message, HumanMessage) and not message_text(message).startswith(CONTEXT_MARKER):
+            return STRONG, "new request"
+    if call is None or not results:
+        return STRONG, "new request"
+
+    if any(
+        r.status == "error" or message_text(r).startswith(("Error", "Failed")) for r in results
+    ):
+        return STRONG, "tool error"
+    names = {c["name"] for c in call.tool_calls}
+    if not names <= CONTINUATION_TOOLS:
+        return STRONG, "after " + ", ".join(sorted(names - CONTINUATION_TOOLS))
+
+    streak = 0
+    for message in reversed(messages):
+        if isinstance(message, AIMessage):
+            if message.response_metadata.get("tier") != FAST:
+                break
+            streak += 1
+    if streak >= settings.fast_max_streak:
+        return STRONG, f"re-plan after {streak} fast steps"
+    return FAST, "continuation"
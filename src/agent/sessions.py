@@ -0,0 +1,150 @@
+"""Durable sessions backed by a LangGraph SQLite checkpointer.
+
+Every graph step is checkpointed under the session's thread id, so a crash or
+restart can pick the conversation (or an interrupted run) back up:
+
+    python -m src.main --resume <session>
+    python -m src.main --list-sessions
+
+Message history is a `DeltaChannel` (see `src/core/state.py`): each step
+stores only the messages it added, and a full snapshot is written every few
+dozen updates. Long sessions are compacted back to a single checkpoint and
+sessions idle for `checkpoint_retention_days` are deleted.
+"""
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from src.config import settings
+
+SESSIONS_DDL = """
+CREATE TABLE IF NOT EXISTS sessions (
+    thread_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    turns INTEGER NOT NULL DEFAULT 0
+)
+"""
+COMPACT_PREFIX = ".compact-"  # scratch threads; not a valid session id
+
+
+def checkpoint_path() -> str:
+    return settings.checkpoint_db or os.path.join(
+        settings.workspace_root, ".checkpoints", "sessions.db"
+    )
+
+
+def new_session_id() -> str:
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+class SessionStore:
+    """The checkpointed graph plus bookkeeping for resume, compaction and expiry."""
+
+    def __init__(self, saver: AsyncSqliteSaver):
+        from src.agent.graph import workflow  # the tool registry loads with the first session
+
+        self.saver = saver
+        self.app = workflow.compile(checkpointer=saver)
+
+    @staticmethod
+    def config(session_id: str) -> dict:
+        return {"configurable": {"thread_id": session_id}}
+
+    async def _execute(self, sql: str, params=()):
+        async with self.saver.lock, self.saver.conn.execute(sql, params) as cursor:
+            rows = await cursor.fetchall()
+            await self.saver.conn.commit()
+            return rows
+
+    async def setup(self):
+        await self.saver.setup()
+        await self._execute(SESSIONS_DDL)
+        for table in ("checkpoints", "writes"):
+            # Left behind by a compaction that was cut off before its swap
+            # (a prefix range rather than LIKE, so the primary key is used)
+            await self._execute(
+                f"DELETE FROM {table} WHERE thread_id >= ? AND thread_id < ?",
+                (COMPACT_PREFIX, COMPACT_PREFIX[:-1] + chr(ord(COMPACT_PREFIX[-1]) + 1)),
+            )
+
+    async def exists(self, session_id: str) -> bool:
+        rows = await self._execute(
+            "SELECT 1 FROM checkpoints WHERE thread_id = ? LIMIT 1", (session_id,)
+        )
+        return bool(rows)
+
+    async def touch(self, session_id: str):
+        """Records a turn so the session shows up in listings and expiry."""
+        now = time.time()
+        await self._execute(
+            "INSERT INTO sessions (thread_id, created_at, updated_at, turns) VALUES (?, ?, ?, 1) "
+            "ON CONFLICT(thread_id) DO UPDATE SET updated_at = excluded.updated_at, turns = turns + 1",
+            (session_id, now, now),
+        )
+
+    async def list(self) -> list:
+        """Returns `(session_id, updated_at, turns)`, most recent first."""
+        return await self._execute(
+            "SELECT thread_id, updated_at, turns FROM sessions ORDER BY updated_at DESC"
+        )
+
+    async def checkpoint_count(self, session_id: str) -> int:
+        rows = await self._execute(
+            "SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (session_id,)
+        )
+        return rows[0][0]
+
+    async def compact(self, session_id: str, keep: int = None) -> bool:
+        """Collapses a session's checkpoint history into one checkpoint holding
+        the current state once it exceeds `keep` checkpoints. Sessions with an
+        unfinished run are left alone so they can still be resumed."""
+        keep = settings.checkpoint_keep if keep is None else keep
+        if await self.checkpoint_count(session_id) <= keep:
+            return False
+        config = self.config(session_id)
+        snapshot = await self.app.aget_state(config)
+        if snapshot.next:
+            return False
+        # Build the collapsed history under a scratch thread, then swap it in
+        # with one transaction: a crash leaves the old history or the new one.
+        scratch = f"{COMPACT_PREFIX}{uuid.uuid4().hex}"
+        await self.app.aupdate_state(self.config(scratch), snapshot.values, as_node="reason")
+        async with self.saver.lock:
+            for table in ("checkpoints", "writes"):
+                await self.saver.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (session_id,))
+                await self.saver.conn.execute(
+                    f"UPDATE {table} SET thread_id = ? WHERE thread_id = ?", (session_id, scratch)
+                )
+            await self.saver.conn.commit()
+        return True
+
+    async def expire(self, days: float = None) -> list:
+        """Deletes sessions not used for `days` days and reclaims the space."""
+        days = settings.checkpoint_retention_days if days is None else days
+        if days <= 0:
+            return []
+        cutoff = time.time() - days * 86400
+        expired = [
+            row[0]
+            for row in await self._execute(
+                "SELECT thread_id FROM sessions WHERE updated_at < ?", (cutoff,)
+            )
+        ]
+        for session_id in expired:
+            await self.saver.adelete_thread(session_id)
+            await self._execute("DELETE FROM sessions WHERE thread_id = ?", (session_id,))
+        if expired:
+            await self._execute("VACUUM")
+        return expired
+
+
+@asynccontextmanager
+async def open_sessions(path: str = None):
+    path = path or checkpoint_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    async with AsyncSqliteSaver.from_conn_string(path) as saver:
+        store = SessionStore(saver)
+        await store.setup()
+        yield store
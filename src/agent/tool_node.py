@@ -0,0 +1,102 @@
+import asyncio
+import json
+import threading
+import time
+import weakref
+from langchain_core.messages import ToolMessage
+from langgraph.prebuilt import ToolNode
+from src.config import settings
+from src.core.telemetry import span
+from src.tools.artifacts import offload
+
+KEEP_INLINE = {"read_artifact"}  # tools whose output is never turned into an artifact
+
+# One semaphore per event loop: asyncio primitives cannot be shared across loops.
+_loop_semaphores = weakref.WeakKeyDictionary()
+_thread_semaphore = None
+
+
+def _get_async_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _loop_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.tool_concurrency)
+        _loop_semaphores[loop] = semaphore
+    return semaphore
+
+
+def _get_thread_semaphore() -> threading.BoundedSemaphore:
+    global _thread_semaphore
+    if _thread_semaphore is None:
+        _thread_semaphore = threading.BoundedSemaphore(settings.tool_concurrency)
+    return _thread_semaphore
+
+
+def _record_result(record: dict, result):
+    content = getattr(result, "content", "")
+    record["output_chars"] = len(content) if isinstance(content, str) else len(str(content))
+    # Tools report failures as "Error ..."/"Failed ..." strings rather than raising.
+    if getattr(result, "status", None) == "error" or str(content).startswith(("Error", "Failed")):
+        record["error"] = str(content)[:200]
+
+
+def _offload(request, result, record: dict):
+    """Replaces a large tool output with an artifact handle and a preview, so
+    the full text is not carried in the message history."""
+    name = request.tool_call["name"]
+    if (
+        not isinstance(result, ToolMessage)
+        or not isinstance(result.content, str)
+        or len(result.content) <= settings.artifact_threshold_chars
+        or name in KEEP_INLINE
+        or result.status == "error"
+    ):
+        return result
+    preview = offload(result.content, name)
+    record["artifact_chars"] = len(result.content)
+    return result.model_copy(update={"content": preview})
+
+
+def _input_chars(request) -> int:
+    return len(json.dumps(request.tool_call["args"], default=str))
+
+
+def _limit_concurrency(request, execute):
+    queued = time.perf_counter()
+    with _get_thread_semaphore():
+        with span(
+            "tool",
+            request.tool_call["name"],
+            input_chars=_input_chars(request),
+            queue_ms=round((time.perf_counter() - queued) * 1000, 3),
+        ) as record:
+            result = execute(request)
+            _record_result(record, result)
+            return _offload(request, result, record)
+
+
+async def _alimit_concurrency(request, execute):
+    queued = time.perf_counter()
+    async with _get_async_semaphore():
+        with span(
+            "tool",
+            request.tool_call["name"],
+            input_chars=_input_chars(request),
+            queue_ms=round((time.perf_counter() - queued) * 1000, 3),
+        ) as record:
+            result = await execute(request)
+            _record_result(record, result)
+            return await asyncio.to_thread(_offload, request, result, record)
+
+
+def build_tool_node(tools) -> ToolNode:
+    """Creates the graph's tool executor.
+    All tool calls from one model turn run concurrently (async tools are awaited,
+    sync-only tools run in worker threads), capped at `settings.tool_concurrency`
+    in flight at once. Each call is recorded as a "tool" telemetry span.
+    """
+    return ToolNode(
+        tools,
+        wrap_tool_call=_limit_concurrency,
+        awrap_tool_call=_alimit_concurrency,
+    )
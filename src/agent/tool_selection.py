@@ -0,0 +1,166 @@
+"""Per-turn tool selection.
+
+Binding every tool sends all schemas (~2.7k tokens) with every request, even
+for a plain file edit. Instead each reason step binds
+  - a small core set (file access, artifacts, `request_tools`),
+  - the tools whose name/description best match the current user request
+    (BM25 over the descriptions plus a few trigger words),
+  - tools used in this turn or the previous `RECENT_TURNS` turns, and
+  - tools the model asked for with `request_tools` during this turn,
+expanded with their companions (a background job needs poll_job, ...).
+
+The selection is derived from the message history alone, so it is the same
+for every step of a turn (keeping the prompt prefix cacheable) and survives
+checkpoint resume. Every tool stays registered with the tool node; only the
+schemas sent to the model shrink.
+"""
+import re
+import threading
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from src.agent.compaction import message_text
+from src.agent.prompt import CONTEXT_MARKER
+from src.config import settings
+from src.core.text_index import BM25Index
+
+CORE_TOOLS = {"read_file", "write_file", "list_files", "read_artifact", "request_tools"}
+RECENT_TURNS = 2
+REQUEST_K = 4  # tools attached per request_tools call
+MIN_RELATIVE_SCORE = 0.3  # drop matches much weaker than the best one
+
+# Words users say that the descriptions don't
+KEYWORDS = {
+    "search_web": "internet online google look up research news latest",
+    "scrape_website": "web page site url http https link article read page",
+    "execute_command": "run shell terminal bash script test tests build install pip npm python pytest compile",
+    "get_youtube_transcript": "youtube video watch summarize clip",
+    "store_fact": "remember memorize save note preference",
+    "retrieve_fact": "remember recall preference",
+    "list_all_facts": "remember memory know about me",
+    "search_facts": "remember recall memory know about me preference",
+    "explore_project": "project structure overview tree codebase repository repo",
+    "search_workspace": "find grep where defined usage code occurrences",
+    "generate_scrum_report": "scrum standup demo status update progress report",
+    "add_resource": "bookmark save link resource",
+    "list_resources": "bookmarks links resources saved",
+    "search_resources": "bookmarks links resources saved find",
+    "create_routine": "schedule plan day week timetable calendar deadlines study",
+    "ingest_external_source": "clone git github repo repository zip download",
+    "get_repo_history": "git commits log history changes recent",
+    "get_file_diffs": "git diff changes modified uncommitted staged review",
+    "open_in_app": "open launch notepad obsidian editor show",
+}
+
+# Tools that only make sense together
+COMPANIONS = {
+    "execute_command": {"poll_job", "tail_job", "kill_job"},
+    "poll_job": {"tail_job", "kill_job"},
+    "store_fact": {"retrieve_fact", "search_facts"},
+    "retrieve_fact": {"search_facts", "store_fact"},
+    "search_facts": {"retrieve_fact", "store_fact"},
+    "list_all_facts": {"search_facts", "store_fact"},
+    "add_resource": {"search_resources", "list_resources"},
+    "list_resources": {"search_resources"},
+    "search_resources": {"list_resources"},
+    "search_web": {"scrape_website"},
+    "ingest_external_source": {"explore_project", "get_repo_history"},
+    "get_repo_history": {"get_file_diffs"},
+    "get_file_diffs": {"get_repo_history"},
+    "generate_scrum_report": {"explore_project", "get_repo_history", "get_file_diffs"},
+}
+
+
+def selection_enabled() -> bool:
+    # With an explicit context cache the full schema set is already cached
+    return settings.tool_selection and settings.prompt_cache_mode != "explicit"
+
+
+def _turns(messages):
+    """Yields `(request_text, ai_messages)` per user turn, newest first."""
+    calls = []
+    for message in reversed(messages):
+        if isinstance(message, AIMessage):
+            calls.append(message)
+        elif isinstance(message, HumanMessage):
+            text = message_text(message)
+            if not text.startswith(CONTEXT_MARKER):
+                yield text, calls
+                calls = []
+    if calls:
+        yield "", calls
+
+
+class ToolSelector:
+    def __init__(self, tools, k: int = 6):
+        self.tools = list(tools)
+        self.names = [t.name for t in self.tools]
+        self.k = k
+        self.index = BM25Index()
+        for t in self.tools:
+            if t.name not in CORE_TOOLS:
+                text = f"{t.name.replace('_', ' ')} {t.description} {KEYWORDS.get(t.name, '')}"
+                self.index.add(t.name, text)
+        self._name_re = re.compile(r"\b(" + "|".join(map(re.escape, self.names)) + r")\b")
+        self._schemas = {}
+        self._lock = threading.Lock()
+
+    def match(self, text: str, k: int) -> set:
+        """Tools named in `text` plus the `k` best description matches."""
+        named = set(self._name_re.findall(text.lower()))
+        hits = self.index.search(text, k)
+        if hits:
+            floor = hits[0][1] * MIN_RELATIVE_SCORE
+            named |= {name for name, score in hits if score >= floor}
+        return named
+
+    def select(self, messages) -> list:
+        """The tools to bind for the next reason step, in registry order."""
+        chosen = set(CORE_TOOLS)
+        for turn, (request, calls) in enumerate(_turns(messages)):
+            if turn > RECENT_TURNS:
+                break
+            if turn == 0:
+                chosen |= self.match(request, self.k)
+            for message in calls:
+                for call in message.tool_calls:
+                    chosen.add(call["name"])
+                    if turn == 0 and call["name"] == "request_tools":
+                        chosen |= self.match(str(call["args"].get("need", "")), REQUEST_K)
+        for name in list(chosen):
+            chosen |= COMPANIONS.get(name, set())
+        return [t for t in self.tools if t.name in chosen]
+
+    def schemas(self, tools) -> list:
+        """Function declarations for `tools`, converted once per tool."""
+        with self._lock:
+            for t in tools:
+                if t.name not in self._schemas:
+                    self._schemas[t.name] = convert_to_openai_tool(t)
+            return [self._schemas[t.name] for t in tools]
+
+
+_selector = None
+_selector_lock = threading.Lock()
+
+
+def get_selector() -> ToolSelector:
+    global _selector
+    with _selector_lock:
+        if _selector is None:
+            from src.agent.graph import tools_list
+
+            _selector = ToolSelector(tools_list, settings.tool_selection_k)
+        return _selector
+
+
+@tool
+def request_tools(need: str) -> str:
+    """Attaches more tools from the system prompt's list for the rest of this
+    request. Describe the capability you need or give tool names,
+    e.g. 'run the test suite' or 'get_repo_history, get_file_diffs'."""
+    selector = get_selector()
+    found = [name for name in selector.names if name in selector.match(need, REQUEST_K)]
+    if not found:
+        return f"No tool matches '{need}'. Available tools: {', '.join(selector.names)}"
+    return f"Attached from your next step: {', '.join(found)}."
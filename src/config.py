@@ -1,11 +1,52 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import SecretStr
 
 class Settings(BaseSettings):
     google_api_key: SecretStr
     gemini_model: str = "gemini-3-flash"
+    fast_model: str = ""
+    fast_max_streak: int = 4
     workspace_root: str = "./workspace"
     log_level:  str = "INFO"
+    llm_timeout: float = 120.0
+    llm_rpm: int = 0
+    llm_tpm: int = 0
+    llm_max_retries: int = 5
+    llm_backoff_base: float = 2.0
+    llm_backoff_max: float = 60.0
+    tool_concurrency: int = 4
+    tool_selection: bool = True
+    tool_selection_k: int = 6
+    http_cache_ttl: int = 3600
+    http_cache_max_mb: int = 100
+    search_cache_ttl: int = 86400
+    search_cache_max_mb: int = 20
+    context_token_budget: int = 24000
+    context_keep_recent: int = 4
+    prompt_cache_mode: str = "implicit"
+    prompt_cache_ttl: int = 3600
+    stream_output: bool = True
+    trace_enabled: bool = True
+    trace_file: str = ""
+    trace_max_mb: int = 10
+    trace_backups: int = 3
+    metrics_port: int = 0
+    command_output_chars: int = 8000
+    read_file_max_bytes: int = 64000
+    memory_recall_k: int = 0
+    artifact_threshold_chars: int = 4000
+    artifact_preview_chars: int = 1500
+    artifact_max_mb: int = 200
+    checkpoint_db: str = ""
+    checkpoint_keep: int = 200
+    checkpoint_retention_days: float = 30
+    server_host: str = "127.0.0.1"
+    server_port: int = 8765
+    server_max_sessions: int = 64
+    server_max_active_turns: int = 8
+    server_max_message_chars: int = 20000
     
     model_config = SettingsConfigDict(
         env_file=".env", 
@@ -13,4 +54,23 @@ class Settings(BaseSettings):
         extra="ignore"    
     )
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
+
+_session_workspace = ContextVar("session_workspace", default=None)
+
+
+def workspace_root() -> str:
+    """The directory tools operate in: the current session's own workspace
+    under the server (see `scoped_workspace`), `settings.workspace_root` otherwise."""
+    return _session_workspace.get() or settings.workspace_root
+
+
+@contextmanager
+def scoped_workspace(path: str):
+    """Points `workspace_root()` at `path` for the enclosed code, including
+    tasks and worker threads started from it (they copy the context)."""
+    token = _session_workspace.set(path)
+    try:
+        yield
+    finally:
+        _session_workspace.reset(token)
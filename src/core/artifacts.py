@@ -0,0 +1,58 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from src.core.cache import LRUDirectory
+
+HANDLE = re.compile(r"^art-([0-9a-f]{16})$")
+
+
+class ArtifactStore:
+    """Content-addressed store for large tool outputs.
+
+    Each output is saved once as `<digest>.txt` under `directory` and named by
+    a short handle (`art-<digest>`), so identical outputs share a file and a
+    handle stays valid across turns and restarts. Writes and reads bump the
+    file mtime; once the total size goes over `max_bytes` the least recently
+    used artifacts are evicted first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files = LRUDirectory(self.directory, "*/*.txt", max_bytes)
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / f"{digest}.txt"
+
+    def put(self, text: str) -> str:
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        path = self._path(digest)
+        with self._lock:
+            if path.exists():
+                os.utime(path)
+                return f"art-{digest}"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._files.account(len(data))
+        return f"art-{digest}"
+
+    def get(self, handle: str):
+        """Returns the artifact's text, or None if the handle is unknown or evicted."""
+        match = HANDLE.match(handle.strip())
+        if not match:
+            return None
+        path = self._path(match.group(1))
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)
+        except OSError:
+            return None
+        return text
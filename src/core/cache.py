@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class LRUCache:
+    """Keeps the `size` most recently used objects built by `create(key)`,
+    e.g. one store per session workspace. Evicted objects are passed to
+    `on_evict` (to save or close them) outside the lock."""
+
+    def __init__(self, size: int, create, on_evict=None):
+        self.size = size
+        self.create = create
+        self.on_evict = on_evict
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        evicted = []
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                item = self._items[key] = self.create(key)
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                evicted.append(self._items.popitem(last=False)[1])
+        if self.on_evict:
+            for old in evicted:
+                self.on_evict(old)
+        return item
+
+
+class LRUDirectory:
+    """Keeps the files matching `pattern` under `directory` within `max_bytes`.
+
+    Callers report each write or delete as a size delta to `account` (holding
+    their own lock); the running total is seeded by one directory scan. Once
+    it goes over `max_bytes` the least recently used files (oldest mtime, so
+    readers bump it) are deleted until the total is back under 90% of it.
+    """
+
+    def __init__(self, directory: Path, pattern: str, max_bytes: int):
+        self.directory = directory
+        self.pattern = pattern
+        self.max_bytes = max_bytes
+        self.total_bytes = None
+
+    def entries(self):
+        if not self.directory.exists():
+            return []
+        return [p for p in self.directory.glob(self.pattern) if p.is_file()]
+
+    def account(self, delta: int):
+        if self.total_bytes is None:
+            self.total_bytes = sum(p.stat().st_size for p in self.entries())
+        else:
+            self.total_bytes += delta
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        entries = []
+        for p in self.entries():
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        # Evict down to 90% so we don't rescan on every subsequent write.
+        target = self.max_bytes * 0.9
+        for _, size, p in entries:
+            if total <= target:
+                break
+            try:
+                p.unlink()
+                total -= size
+            except OSError:
+                pass
+        self.total_bytes = total
+
+
+class DiskCache:
+    """A small content-addressed JSON cache on disk.
+
+    Each entry is stored as `<sha256(key)>.json` under `directory`. Entries carry
+    an `expires_at` timestamp; expired entries are still returned by `get` with
+    `fresh=False` so callers can revalidate them. Reads bump the file mtime, and
+    when the total size goes over `max_bytes` the least recently used files are
+    evicted first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl: float):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._files = LRUDirectory(self.directory, "*/*.json", max_bytes)
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def get(self, key: str):
+        """Returns `(value, fresh)` or `(None, False)` on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None, False
+        return entry["value"], entry["expires_at"] > time.time()
+
+    def set(self, key: str, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({"key": key, "expires_at": time.time() + ttl, "value": value})
+
+        with self._lock:
+            old_size = path.stat().st_size if path.exists() else 0
+            # Write to a temp file first so readers never see a partial entry.
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._files.account(path.stat().st_size - old_size)
+
+    def delete(self, key: str):
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = path.stat().st_size
+                path.unlink()
+                self._files.account(-size)
+            except OSError:
+                pass
@@ -0,0 +1,148 @@
+import asyncio
+import atexit
+import os
+import re
+import weakref
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from typing import Optional
+import httpx
+from src.config import settings
+from src.core.cache import DiskCache
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+TIMEOUT = 10.0
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+_client = None
+# AsyncClient connections are bound to the loop that opened them.
+_async_clients = weakref.WeakKeyDictionary()
+_cache = None
+
+
+def get_client() -> httpx.Client:
+    """Process-wide pooled client (keep-alive, HTTP/2 when `h2` is installed)."""
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            headers=HEADERS,
+            follow_redirects=True,
+            timeout=TIMEOUT,
+            limits=LIMITS,
+            http2=HTTP2,
+        )
+        atexit.register(_client.close)
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            headers=HEADERS,
+            follow_redirects=True,
+            timeout=TIMEOUT,
+            limits=LIMITS,
+            http2=HTTP2,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def get_cache() -> DiskCache:
+    global _cache
+    if _cache is None:
+        _cache = DiskCache(
+            os.path.join(settings.workspace_root, ".cache", "http"),
+            max_bytes=settings.http_cache_max_mb * 1024 * 1024,
+            ttl=settings.http_cache_ttl,
+        )
+    return _cache
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used as the cache key: lowercase scheme/host, no default
+    port, no fragment, sorted query string."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not (scheme == "http" and port == 80) and not (scheme == "https" and port == 443):
+        host = f"{host}:{port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def _freshness(headers) -> Optional[float]:
+    """Seconds the response may be served without revalidation, or None if it
+    must not be stored at all."""
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0
+    max_age = re.search(r"max-age=(\d+)", cache_control)
+    if max_age:
+        return min(int(max_age.group(1)), settings.http_cache_ttl)
+    return settings.http_cache_ttl
+
+
+def _conditional_headers(entry) -> dict:
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _handle_response(key: str, entry, response: httpx.Response) -> str:
+    cache = get_cache()
+    if response.status_code == 304 and entry is not None:
+        ttl = _freshness(response.headers)
+        cache.set(key, entry, ttl=ttl or 0)
+        return entry["text"]
+
+    response.raise_for_status()
+    ttl = _freshness(response.headers)
+    if ttl is not None:
+        entry = {
+            "url": str(response.url),
+            "text": response.text,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+        cache.set(key, entry, ttl=ttl)
+    return response.text
+
+
+def fetch_text(url: str) -> str:
+    """GETs `url` through the pooled client and the on-disk cache.
+    Fresh entries are served without touching the network; stale ones are
+    revalidated with a conditional GET."""
+    key = normalize_url(url)
+    entry, fresh = get_cache().get(key)
+    if entry is not None and fresh:
+        return entry["text"]
+    headers = _conditional_headers(entry) if entry else {}
+    response = get_client().get(url, headers=headers)
+    return _handle_response(key, entry, response)
+
+
+async def afetch_text(url: str) -> str:
+    key = normalize_url(url)
+    entry, fresh = await asyncio.to_thread(get_cache().get, key)
+    if entry is not None and fresh:
+        return entry["text"]
+    headers = _conditional_headers(entry) if entry else {}
+    response = await get_async_client().get(url, headers=headers)
+    return await asyncio.to_thread(_handle_response, key, entry, response)
@@ -1,9 +1,39 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+import threading
 from src.config import settings
+from src.core.scheduler import LLMScheduler
+from src.core.telemetry import register_gauge
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm(model: str = None):
+    # Imported here: the Gemini SDK is the slowest import in the project
+    from langchain_google_genai import ChatGoogleGenerativeAI
 
-def get_llm():
     return ChatGoogleGenerativeAI(
-        model=settings.gemini_model,
+        model=model or settings.gemini_model,
         google_api_key=settings.google_api_key,
-        temperature=1.0
-    )
\ No newline at end of file
+        temperature=1.0,
+        timeout=settings.llm_timeout,
+        # A single HTTP attempt: retries and backoff are the scheduler's job
+        max_retries=1,
+    )
+
+
+def get_scheduler() -> LLMScheduler:
+    """The process-wide scheduler every model request goes through."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                rpm=settings.llm_rpm,
+                tpm=settings.llm_tpm,
+                max_retries=settings.llm_max_retries,
+                backoff_base=settings.llm_backoff_base,
+                backoff_max=settings.llm_backoff_max,
+            )
+            register_gauge("llm_queue_depth", lambda: _scheduler.queue_depth)
+            register_gauge("llm_throttle_s", lambda: round(_scheduler.stats["throttle_s"], 3))
+            register_gauge("llm_retries", lambda: _scheduler.stats["retries"])
+        return _scheduler
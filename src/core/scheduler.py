@@ -0,0 +1,250 @@
+"""Client-side scheduling for model requests.
+
+Every reason step goes through one `LLMScheduler` (see `get_scheduler()` in
+`src/core/llm.py`), which
+  - admits requests through token buckets for requests/min and tokens/min, so
+    the agent slows itself down instead of hitting the API's quota,
+  - retries rate-limit (429 / RESOURCE_EXHAUSTED) and transient server errors
+    with jittered exponential backoff, waiting at least as long as the API's
+    retry-after hint and pausing *all* queued requests meanwhile,
+  - serves waiting requests by priority: interactive turns before background
+    work (see `priority()`), first come first served within a level.
+
+Queue depth, throttle time and retries are recorded on an "llm" span per call.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from langchain_core.exceptions import ModelRateLimitError
+from src.core.telemetry import span
+
+INTERACTIVE = 0
+BACKGROUND = 10
+POLL_INTERVAL = 0.05  # how often requests behind the head of the queue re-check
+
+_priority = ContextVar("llm_priority", default=INTERACTIVE)
+_RETRY_HINT = re.compile(
+    r"(?:retry in|retryDelay['\"]?\s*[:=]\s*['\"]?)\s*(\d+(?:\.\d+)?)\s*s", re.IGNORECASE
+)
+
+
+@contextmanager
+def priority(level: int):
+    """Runs the enclosed model calls at `level` (lower is served first)."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def is_rate_limit(error: Exception) -> bool:
+    return (
+        isinstance(error, ModelRateLimitError)
+        or getattr(error, "code", None) == 429
+        or "RESOURCE_EXHAUSTED" in str(error)
+    )
+
+
+def is_transient(error: Exception) -> bool:
+    code = getattr(error, "code", None)
+    return (isinstance(code, int) and code >= 500) or "UNAVAILABLE" in str(error)
+
+
+def retry_after(error: Exception):
+    """Seconds the API asked us to wait, from a Retry-After header or the
+    RetryInfo delay Gemini puts in its error message; None if absent."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        if value is not None:
+            return float(value)
+    except (TypeError, ValueError):
+        pass
+    match = _RETRY_HINT.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+def estimate_tokens(messages) -> int:
+    """Rough prompt size (4 characters per token), settled against real usage afterwards."""
+    if isinstance(messages, str):
+        return len(messages) // 4 + 1
+    return sum(len(str(getattr(m, "content", m))) for m in messages) // 4 + 1
+
+
+class TokenBucket:
+    """Refills `per_minute` units evenly over a minute, holding at most a
+    minute's worth. The level may go negative when actual usage exceeds the
+    estimate that was taken; later requests then wait for the debt."""
+
+    def __init__(self, per_minute: float, clock=time.monotonic):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.clock = clock
+        self.level = float(per_minute)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (capped at a full bucket)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(missing, 0) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+
+class LLMScheduler:
+    """Admission control and retries for model calls; `rpm`/`tpm` of 0 mean unlimited."""
+
+    def __init__(
+        self,
+        rpm: int = 0,
+        tpm: int = 0,
+        max_retries: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 60.0,
+        clock=time.monotonic,
+    ):
+        self.requests = TokenBucket(rpm, clock) if rpm else None
+        self.tokens = TokenBucket(tpm, clock) if tpm else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.paused_until = 0.0
+        self._queue = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "throttle_s": 0.0}
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def _enqueue(self, level: int):
+        ticket = (level, next(self._seq))
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+            return ticket, len(self._queue)
+
+    def _leave(self, ticket):
+        with self._lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+
+    def _try_admit(self, ticket, tokens: int) -> float:
+        """Admits `ticket` and returns 0, or returns how long to wait first."""
+        with self._lock:
+            if self._queue[0] != ticket:
+                return POLL_INTERVAL
+            wait = max(
+                self.paused_until - self.clock(),
+                self.requests.wait_time(1) if self.requests else 0,
+                self.tokens.wait_time(tokens) if self.tokens else 0,
+            )
+            if wait > 0:
+                return wait
+            heapq.heappop(self._queue)
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            return 0
+
+    def settle(self, estimated: int, response):
+        """Corrects the tokens/min bucket once the real usage is known."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        if self.tokens and usage.get("total_tokens"):
+            with self._lock:
+                self.tokens.take(usage["total_tokens"] - estimated)
+
+    def _backoff(self, error: Exception, attempt: int):
+        """Seconds to pause before retrying, or None if `error` is not retryable."""
+        limited = is_rate_limit(error)
+        if attempt >= self.max_retries or not (limited or is_transient(error)):
+            return None
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        hint = retry_after(error)
+        if hint is not None:
+            delay = max(delay, hint + random.uniform(0, 0.1 * hint + 0.05))
+        with self._lock:
+            self.stats["retries"] += 1
+            self.stats["rate_limited"] += limited
+            # Everyone waits: the quota is shared, so other requests would fail too
+            self.paused_until = max(self.paused_until, self.clock() + delay)
+        return delay
+
+    def _record(self, record: dict, level: int, depth: int, throttled: float, attempt: int):
+        record.update(
+            priority=level,
+            queue_depth=depth,
+            throttle_ms=round(throttled * 1000, 3),
+            retries=attempt,
+        )
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["throttle_s"] += throttled
+
+    def call(self, fn, tokens: int = 0):
+        """Runs `fn()` (one model request) when admitted, retrying as needed."""
+        level = _priority.get()
+        throttled, attempt = 0.0, 0
+        with span("llm", "scheduler", tokens=tokens) as record:
+            try:
+                while True:
+                    ticket, depth = self._enqueue(level)
+                    queued = time.perf_counter()
+                    try:
+                        while (wait := self._try_admit(ticket, tokens)) > 0:
+                            time.sleep(wait)
+                    finally:
+                        self._leave(ticket)
+                        throttled += time.perf_counter() - queued
+                    try:
+                        return fn()
+                    except Exception as e:
+                        if self._backoff(e, attempt) is None:
+                            raise
+                        attempt += 1
+            finally:
+                self._record(record, level, depth, throttled, attempt)
+
+    async def acall(self, fn, tokens: int = 0):
+        """Async `call`: `fn()` returns an awaitable. Waiting never blocks the loop."""
+        level = _priority.get()
+        throttled, attempt = 0.0, 0
+        with span("llm", "scheduler", tokens=tokens) as record:
+            try:
+                while True:
+                    ticket, depth = self._enqueue(level)
+                    queued = time.perf_counter()
+                    try:
+                        while (wait := self._try_admit(ticket, tokens)) > 0:
+                            await asyncio.sleep(wait)
+                    finally:
+                        self._leave(ticket)
+                        throttled += time.perf_counter() - queued
+                    try:
+                        return await fn()
+                    except Exception as e:
+                        if self._backoff(e, attempt) is None:
+                            raise
+                        attempt += 1
+            finally:
+                self._record(record, level, depth, throttled, attempt)
@@ -1,6 +1,35 @@
+import hashlib
+import uuid
 from typing import TypedDict, Annotated
+from langchain_core.messages import convert_to_messages
+from langgraph.channels.delta import DeltaChannel
 from langgraph.graph.message import add_messages
 
+
+def _message_id(previous_id: str, index: int, message) -> str:
+    # Derived from the message's position and content rather than uuid4, so
+    # replaying the same writes from a checkpoint reproduces the same ids.
+    digest = hashlib.sha256(
+        f"{previous_id}:{index}:{message.type}:{message.content}".encode("utf-8")
+    ).digest()
+    return str(uuid.UUID(bytes=digest[:16]))
+
+
+def merge_messages(messages: list, writes: list) -> list:
+    """Folds a batch of `messages` updates into the history, like `add_messages`.
+    Checkpoints store only these writes (see `DeltaChannel`), not the full list.
+    """
+    for update in writes:
+        update = convert_to_messages(update if isinstance(update, list) else [update])
+        previous_id = messages[-1].id if messages else ""
+        update = [
+            m if m.id else m.model_copy(update={"id": _message_id(previous_id, i, m)})
+            for i, m in enumerate(update)
+        ]
+        messages = add_messages(messages, update)
+    return messages
+
+
 class AgentState(TypedDict):
-    messages: Annotated[list, add_messages]
-    step_count: int
\ No newline at end of file
+    messages: Annotated[list, DeltaChannel(merge_messages, snapshot_frequency=50)]
+    step_count: int
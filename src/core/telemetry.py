@@ -0,0 +1,212 @@
+"""Structured spans for graph steps and tool calls.
+
+Every span is written as one JSON line to a rotating trace file and kept in a
+small in-process window that the optional metrics endpoint serves.
+
+    python -m src.core.telemetry [trace.jsonl]   # p50/p95 latency per step and tool
+"""
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+from src.config import settings
+
+WINDOW = 1000  # spans kept in memory per (kind, name)
+
+_logger = None
+_logger_lock = threading.Lock()
+_recent = defaultdict(lambda: deque(maxlen=WINDOW))
+_recent_lock = threading.Lock()
+_gauges = {}  # name -> callable returning the current value
+
+
+def trace_path() -> str:
+    return settings.trace_file or os.path.join(settings.workspace_root, ".traces", "trace.jsonl")
+
+
+def _get_logger():
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            import structlog
+
+            path = trace_path()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = RotatingFileHandler(
+                path,
+                maxBytes=settings.trace_max_mb * 1024 * 1024,
+                backupCount=settings.trace_backups,
+                encoding="utf-8",
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            std_logger = logging.getLogger("agent_zero.trace")
+            std_logger.handlers = [handler]
+            std_logger.setLevel(logging.INFO)
+            std_logger.propagate = False
+            _logger = structlog.wrap_logger(
+                std_logger,
+                processors=[
+                    structlog.processors.TimeStamper(fmt="iso", utc=True),
+                    structlog.processors.JSONRenderer(),
+                ],
+            )
+    return _logger
+
+
+@contextmanager
+def span(kind: str, name: str, **attrs):
+    """Times the enclosed block and records it as a span.
+    The yielded dict can be filled with extra attributes (token counts,
+    payload sizes); an exception marks the span as failed and is re-raised.
+    """
+    record = dict(attrs)
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        if settings.trace_enabled:
+            _emit(kind, name, record)
+
+
+def _emit(kind: str, name: str, record: dict):
+    with _recent_lock:
+        _recent[(kind, name)].append(record)
+    try:
+        _get_logger().info("span", kind=kind, name=name, **record)
+    except OSError:
+        # Tracing must never take the agent down (read-only workspace, full disk).
+        pass
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(int(round(q * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def summarize(records) -> dict:
+    """Aggregates span records into per-(kind, name) latency/token stats."""
+    groups = defaultdict(list)
+    for record in records:
+        groups[(record["kind"], record["name"])].append(record)
+
+    summary = {}
+    for (kind, name), group in sorted(groups.items()):
+        durations = [r["duration_ms"] for r in group]
+        summary[f"{kind}:{name}"] = {
+            "count": len(group),
+            "errors": sum(1 for r in group if r.get("error")),
+            "p50_ms": percentile(durations, 0.50),
+            "p95_ms": percentile(durations, 0.95),
+            "max_ms": max(durations),
+            "prompt_tokens": sum(r.get("prompt_tokens", 0) for r in group),
+            "completion_tokens": sum(r.get("completion_tokens", 0) for r in group),
+            "cached_tokens": sum(r.get("cached_tokens", 0) for r in group),
+            "retries": sum(r.get("retries", 0) for r in group),
+            "throttle_ms": sum(r.get("throttle_ms", 0) for r in group),
+        }
+    return summary
+
+
+def register_gauge(name: str, read):
+    """Adds a live value (e.g. a queue depth) to the metrics endpoint."""
+    _gauges[name] = read
+
+
+def current_metrics() -> dict:
+    with _recent_lock:
+        records = [
+            dict(r, kind=kind, name=name)
+            for (kind, name), spans in _recent.items()
+            for r in spans
+        ]
+    metrics = summarize(records)
+    if _gauges:
+        metrics["gauges"] = {name: read() for name, read in _gauges.items()}
+    return metrics
+
+
+def read_trace(path: str = None) -> list:
+    """Loads spans from the trace file and its rotated backups, oldest first."""
+    path = path or trace_path()
+    # Rotated backups are trace.jsonl.1 (newest) .. trace.jsonl.N (oldest)
+    backups = [f for f in glob.glob(path + ".*") if f.rsplit(".", 1)[1].isdigit()]
+    files = sorted(backups, key=lambda f: int(f.rsplit(".", 1)[1]), reverse=True) + [path]
+    records = []
+    for file in files:
+        if not os.path.exists(file):
+            continue
+        with open(file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = json.dumps(current_metrics(), indent=2).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serves live span metrics as JSON on http://host:port/metrics."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def print_summary(path: str = None):
+    from rich.console import Console
+    from rich.table import Table
+
+    summary = summarize(read_trace(path))
+    if not summary:
+        print(f"No spans found in {path or trace_path()}.")
+        return
+
+    table = Table(title="Agent Zero latency by step and tool")
+    table.add_column("span", no_wrap=True)
+    for column in ("count", "errors", "p50 ms", "p95 ms", "max ms", "prompt tok", "cached tok"):
+        table.add_column(column, justify="right")
+    for name, stats in summary.items():
+        table.add_row(
+            name,
+            str(stats["count"]),
+            str(stats["errors"]),
+            f"{stats['p50_ms']:.1f}",
+            f"{stats['p95_ms']:.1f}",
+            f"{stats['max_ms']:.1f}",
+            str(stats["prompt_tokens"]),
+            str(stats["cached_tokens"]),
+        )
+    Console().print(table)
+
+
+if __name__ == "__main__":
+    print_summary(sys.argv[1] if len(sys.argv) > 1 else None)
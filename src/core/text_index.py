@@ -0,0 +1,123 @@
+import heapq
+import math
+import re
+from collections import defaultdict
+from operator import itemgetter
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to was what with".split()
+)
+
+
+def tokenize(text: str) -> list:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 ranking.
+
+    Documents are added incrementally; scoring only touches the postings of
+    the query terms, so search cost depends on the query, not the corpus size.
+    With `max_scan` set, no query term scans more than about twice that many
+    postings: once a term is that common, or that many documents already
+    match the query's rarer terms, it only rescores those candidates. A
+    common term that is the query's rarest starts from its strongest
+    postings, kept per term as documents are added. Scores stay exact; weak
+    matches on common words alone may be left out.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, max_scan: int = None):
+        self.k1 = k1
+        self.b = b
+        self.max_scan = max_scan
+        self.postings = defaultdict(dict)  # term -> {doc_id: term frequency}
+        self.doc_lengths = {}
+        self.doc_terms = {}
+        self._total_length = 0
+        self._strongest = {}  # term -> {doc_id: None}, for terms over max_scan
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, doc_id, text: str):
+        if doc_id in self.doc_lengths:
+            self.remove(doc_id)
+        tokens = tokenize(text)
+        for token in tokens:
+            postings = self.postings[token]
+            postings[doc_id] = postings.get(doc_id, 0) + 1
+        self.doc_lengths[doc_id] = len(tokens)
+        self.doc_terms[doc_id] = set(tokens)
+        self._total_length += len(tokens)
+        if self.max_scan:
+            for token in self.doc_terms[doc_id]:
+                self._track_strongest(token, doc_id)
+
+    def _track_strongest(self, term: str, doc_id):
+        # New documents join the list; it is trimmed back to the `max_scan`
+        # strongest whenever it doubles, so upkeep is amortized O(1) per add.
+        strongest = self._strongest.get(term)
+        if strongest is None:
+            if len(self.postings[term]) <= self.max_scan:
+                return
+            strongest = self._strongest[term] = dict.fromkeys(self.postings[term])
+        strongest[doc_id] = None
+        if len(strongest) > 2 * self.max_scan:
+            postings, lengths = self.postings[term], self.doc_lengths
+            slope = self.b / (self._total_length / len(lengths) or 1.0)
+
+            def weight(d):  # BM25 term weight without the idf, which is shared
+                tf = postings[d]
+                return tf / (tf + self.k1 * (1 - self.b + slope * lengths[d]))
+
+            self._strongest[term] = dict.fromkeys(heapq.nlargest(self.max_scan, strongest, key=weight))
+
+    def remove(self, doc_id):
+        length = self.doc_lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self.doc_terms.pop(doc_id):
+            del self.postings[term][doc_id]
+            strongest = self._strongest.get(term)
+            if strongest is not None:
+                strongest.pop(doc_id, None)
+                if len(self.postings[term]) <= self.max_scan:
+                    del self._strongest[term]
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def search(self, query: str, k: int = 10, allowed=None) -> list:
+        """Returns up to `k` `(doc_id, score)` pairs, best first. `allowed`
+        optionally restricts results to a set of doc ids."""
+        n = len(self.doc_lengths)
+        if not n:
+            return []
+        avgdl = self._total_length / n or 1.0
+        scores = defaultdict(float)
+        # BM25 term weight: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+        k1_plus_1, base, slope = self.k1 + 1, self.k1 * (1 - self.b), self.k1 * self.b / avgdl
+        lengths = self.doc_lengths
+
+        # Rarest terms first, so common ones can be restricted to their candidates
+        terms = sorted(set(tokenize(query)), key=lambda t: len(self.postings.get(t, ())))
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            if self.max_scan and (len(postings) > self.max_scan or len(scores) >= self.max_scan):
+                # Common term, or enough matches already: score a bounded candidate set
+                candidates = self._strongest[term] if not scores else list(scores)
+                if scores and len(postings) < len(scores):
+                    candidates = [doc_id for doc_id in postings if doc_id in scores]
+            else:
+                candidates = postings
+            for doc_id in candidates:
+                tf = postings.get(doc_id)
+                if tf is None or (allowed is not None and doc_id not in allowed):
+                    continue
+                scores[doc_id] += idf * tf * k1_plus_1 / (tf + base + slope * lengths[doc_id])
+
+        return heapq.nlargest(k, scores.items(), key=itemgetter(1))
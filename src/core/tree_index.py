@@ -0,0 +1,196 @@
+import json
+import os
+import re
+import tempfile
+import threading
+
+
+def _glob_to_regex(pattern: str) -> str:
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1 :]:
+            end = pattern.index("]", i + 1)
+            body = pattern[i + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """Patterns from one `.gitignore`, matched against paths relative to the
+    directory that file lives in. Supports negation, directory-only patterns,
+    anchoring and `**`."""
+
+    def __init__(self, base: str, lines):
+        self.base = base  # workspace-relative, "" for the root
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate or line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            # A slash at the start or in the middle anchors the pattern
+            anchored = "/" in line
+            regex = _glob_to_regex(line.lstrip("/"))
+            if not anchored:
+                regex = "(?:.*/)?" + regex
+            self.rules.append((re.compile(regex + r"\Z"), negate, dir_only))
+
+    @classmethod
+    def load(cls, base: str, path: str):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return cls(base, f.readlines())
+        except OSError:
+            return None
+
+    def match(self, rel_path: str, is_dir: bool):
+        """True if ignored, False if re-included, None if no pattern applies."""
+        if self.base:
+            rel_path = rel_path[len(self.base) + 1 :]
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
+
+def is_ignored(rule_stack, rel_path: str, is_dir: bool) -> bool:
+    """Deeper `.gitignore` files override shallower ones; last match wins."""
+    ignored = False
+    for rules in rule_stack:
+        result = rules.match(rel_path, is_dir)
+        if result is not None:
+            ignored = result
+    return ignored
+
+
+class TreeIndex:
+    """Persistent per-directory listing cache for a workspace.
+
+    Each directory's entries are stored with the directory's mtime. A lookup
+    only re-runs `scandir` when that mtime has changed (an entry was added,
+    removed or renamed), so repeat walks of a large, mostly unchanged tree cost
+    one `stat` per directory.
+    """
+
+    def __init__(self, root: str, path: str):
+        self.root = root
+        self.path = path
+        self.dirs = {}  # rel_dir -> {"mtime": ns, "dirs": [...], "files": [...]}
+        self.dirty = False
+        self.scans = 0
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("root") == root:
+                self.dirs = data["dirs"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def listing(self, rel_dir: str):
+        """Returns `(subdirectories, files)` of a workspace-relative directory."""
+        full = os.path.join(self.root, rel_dir)
+        mtime = os.stat(full).st_mtime_ns
+        with self._lock:
+            cached = self.dirs.get(rel_dir)
+            if cached and cached["mtime"] == mtime:
+                return cached["dirs"], cached["files"]
+
+        dirs, files = [], []
+        with os.scandir(full) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.name)
+                    else:
+                        files.append(entry.name)
+                except OSError:
+                    continue
+        dirs.sort()
+        files.sort()
+
+        with self._lock:
+            self.scans += 1
+            if cached:
+                # Forget subtrees that no longer exist
+                for gone in set(cached["dirs"]) - set(dirs):
+                    prefix = f"{rel_dir}/{gone}" if rel_dir else gone
+                    for key in [k for k in self.dirs if k == prefix or k.startswith(prefix + "/")]:
+                        del self.dirs[key]
+            self.dirs[rel_dir] = {"mtime": mtime, "dirs": dirs, "files": files}
+            self.dirty = True
+        return dirs, files
+
+    def save(self):
+        with self._lock:
+            if not self.dirty:
+                return
+            data = json.dumps({"root": self.root, "dirs": self.dirs})
+            self.dirty = False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+
+def ancestor_rules(root: str, rel_dir: str) -> list:
+    """`.gitignore` rules from the workspace root down to (excluding) `rel_dir`."""
+    rules = []
+    parts = rel_dir.split("/") if rel_dir else []
+    for depth in range(len(parts)):
+        base = "/".join(parts[:depth])
+        loaded = IgnoreRules.load(base, os.path.join(root, base, ".gitignore"))
+        if loaded:
+            rules.append(loaded)
+    return rules
+
+
+def iter_files(index: TreeIndex, rel_root: str, ignore_dirs):
+    """Yields the workspace-relative paths of all non-ignored files under `rel_root`."""
+    stack = [(rel_root, ancestor_rules(index.root, rel_root))]
+    while stack:
+        rel_dir, rules = stack.pop()
+        try:
+            dirs, files = index.listing(rel_dir)
+        except OSError:
+            continue
+        if ".gitignore" in files:
+            loaded = IgnoreRules.load(rel_dir, os.path.join(index.root, rel_dir, ".gitignore"))
+            rules = rules + [loaded] if loaded else rules
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        for f in files:
+            if not is_ignored(rules, prefix + f, False):
+                yield prefix + f
+        for d in dirs:
+            if d not in ignore_dirs and not is_ignored(rules, prefix + d, True):
+                stack.append((prefix + d, rules))
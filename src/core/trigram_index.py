@@ -0,0 +1,297 @@
+import marshal
+import os
+import re
+import tempfile
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+MAX_INDEX_BYTES = 1024 * 1024  # larger text files are scanned, not indexed
+SNIFF_BYTES = 8192
+SWEEP_INTERVAL = 10.0  # seconds between full mtime revalidations
+SAVE_INTERVAL = 60.0  # seconds between writes of the on-disk copy
+FORMAT_VERSION = 1
+
+_REGEX_META = set(".^$*+?{}[]()|\\")
+_WORD = re.compile(rb"\w{3,}")
+
+_pending_lock = threading.Lock()
+_pending_paths = set()
+_sweep_generation = 0  # bumped by mark_stale(); each index sweeps once per bump
+_change_count = 0  # bumped by every mark_stale() call
+
+
+def mark_stale(path: str = None):
+    """Tells the index a file changed (or, without a path, that anything may
+    have changed, e.g. after a shell command). Applied on the next search."""
+    global _sweep_generation, _change_count
+    with _pending_lock:
+        _change_count += 1
+        if path is None:
+            _sweep_generation += 1
+        else:
+            _pending_paths.add(os.path.abspath(path))
+
+
+def change_count() -> int:
+    """How many times `mark_stale` was called. Other caches of working-tree
+    state (e.g. git diffs) key on it to notice the agent's own edits."""
+    with _pending_lock:
+        return _change_count
+
+
+def trigrams(data: bytes, cache: dict = None) -> set:
+    """Lower-cased trigrams of the words (runs of [A-Za-z0-9_]) in `data`.
+    Indexing words rather than every byte window is several times cheaper and
+    still gives a superset of candidates: a literal's word trigrams occur in
+    any file containing the literal. `cache` memoizes per-word trigrams."""
+    cache = {} if cache is None else cache
+    words = set(_WORD.findall(data.lower()))
+    for word in words.difference(cache):
+        cache[word] = frozenset([word[i : i + 3] for i in range(len(word) - 2)])
+    return set().union(*map(cache.__getitem__, words))
+
+
+def _class_end(pattern: str, i: int) -> int:
+    """Index just past the character class opened by the "[" at `i`."""
+    i += 1
+    if pattern.startswith("^", i):
+        i += 1
+    if pattern.startswith("]", i):
+        i += 1  # a "]" right after the opening bracket is a member
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            i += 2
+        elif pattern[i] == "]":
+            return i + 1
+        else:
+            i += 1
+    return len(pattern)
+
+
+def literal_runs(pattern: str) -> list:
+    """Literal substrings every match of the regex `pattern` must contain.
+    Conservative: anything it cannot reason about (classes, groups, optional
+    characters) just ends the current run; alternation yields no literals."""
+    runs, run = [], []
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\" and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            if depth == 0 and not nxt.isalnum():
+                run.append(nxt)
+            else:
+                runs.append("".join(run))
+                run = []
+            i += 2
+            continue
+        if c == "[":
+            runs.append("".join(run))
+            run = []
+            i = _class_end(pattern, i)
+            continue
+        if c == "|":
+            return []
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth = max(depth - 1, 0)
+        elif depth == 0 and c in "?*{":
+            if run:
+                run.pop()  # the preceding character may be absent
+            if c == "{":
+                end = pattern.find("}", i)
+                i = len(pattern) - 1 if end < 0 else end
+        elif depth == 0 and c not in _REGEX_META:
+            run.append(c)
+            i += 1
+            continue
+        runs.append("".join(run))
+        run = []
+        i += 1
+    runs.append("".join(run))
+    return [r for r in runs if len(r) >= 3]
+
+
+class TrigramIndex:
+    """In-memory trigram index over the text files of a workspace.
+
+    Each file gets an integer id; `postings` maps a lower-cased byte trigram to
+    the ids of files containing it. A changed file is re-added under a new id
+    and its old id is retired; postings are compacted once retired ids make up
+    half of them. Freshness comes from file mtimes, re-checked on search when
+    `mark_stale` was called or `SWEEP_INTERVAL` has passed. With a `path`, the
+    index is also kept on disk and reloaded, then revalidated, by later runs.
+    """
+
+    def __init__(self, root: str, list_files, path: str = None):
+        self.root = root
+        self.list_files = list_files  # () -> iterable of root-relative paths
+        self.path = path  # on-disk copy, so a new process starts warm
+        self.files = {}  # rel_path -> (mtime_ns, size, file_id)
+        self.paths = []  # file_id -> rel_path, None once retired
+        self.unindexed = set()  # rel_paths of large text files, always scanned
+        self.postings = defaultdict(lambda: array("I"))
+        self.retired = 0
+        self.last_sweep = 0.0
+        self.sweep_generation = 0
+        self.last_save = 0.0
+        self.dirty = False
+        self._lock = threading.RLock()
+        if path:
+            self._load()
+
+    def _load(self) -> None:
+        # marshal rather than pickle: loading it cannot run code, and the
+        # file lives in the agent-writable workspace.
+        try:
+            with open(self.path, "rb") as f:
+                data = marshal.load(f)
+            if data.get("version") != FORMAT_VERSION or data.get("root") != self.root:
+                return
+            files, postings = data["files"], data["postings"]
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, KeyError):
+            return
+        self.paths = list(data["paths"])
+        for rel_path, (mtime, size, file_id, scanned) in files.items():
+            self.files[rel_path] = (mtime, size, file_id)
+            if scanned:
+                self.unindexed.add(rel_path)
+        for gram, ids in postings.items():
+            self.postings[gram].frombytes(ids)
+        self.last_save = time.monotonic()
+
+    def save(self) -> None:
+        with self._lock:
+            if not self.path or not self.dirty:
+                return
+            if self.retired:
+                self._compact()
+            data = {
+                "version": FORMAT_VERSION,
+                "root": self.root,
+                "paths": self.paths,
+                "files": {
+                    p: entry + (p in self.unindexed,) for p, entry in self.files.items()
+                },
+                "postings": {gram: ids.tobytes() for gram, ids in self.postings.items()},
+            }
+            self.dirty = False
+            self.last_save = time.monotonic()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            marshal.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def _add(self, rel_path: str, stat, cache: dict = None) -> None:
+        self.dirty = True
+        try:
+            with open(os.path.join(self.root, rel_path), "rb") as f:
+                head = f.read(SNIFF_BYTES)
+                if b"\0" in head:
+                    self.files[rel_path] = (stat.st_mtime_ns, stat.st_size, None)
+                    return
+                if stat.st_size > MAX_INDEX_BYTES:
+                    self.files[rel_path] = (stat.st_mtime_ns, stat.st_size, None)
+                    self.unindexed.add(rel_path)
+                    return
+                data = head + f.read()
+        except OSError:
+            return
+        file_id = len(self.paths)
+        self.paths.append(rel_path)
+        self.files[rel_path] = (stat.st_mtime_ns, stat.st_size, file_id)
+        for gram in trigrams(data, cache):
+            self.postings[gram].append(file_id)
+
+    def _remove(self, rel_path: str) -> None:
+        entry = self.files.pop(rel_path, None)
+        self.dirty = self.dirty or entry is not None
+        self.unindexed.discard(rel_path)
+        if entry and entry[2] is not None:
+            self.paths[entry[2]] = None
+            self.retired += 1
+
+    def _update(self, rel_path: str, cache: dict = None) -> None:
+        try:
+            stat = os.stat(os.path.join(self.root, rel_path))
+        except OSError:
+            self._remove(rel_path)
+            return
+        entry = self.files.get(rel_path)
+        if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            return
+        self._remove(rel_path)
+        self._add(rel_path, stat, cache)
+
+    def _sweep(self) -> None:
+        seen = set()
+        cache = {}  # word -> trigrams, shared across the files of one sweep
+        for rel_path in self.list_files():
+            seen.add(rel_path)
+            self._update(rel_path, cache)
+        for rel_path in set(self.files) - seen:
+            self._remove(rel_path)
+        self.last_sweep = time.monotonic()
+
+    def _compact(self) -> None:
+        remap = {}
+        paths = []
+        for file_id, rel_path in enumerate(self.paths):
+            if rel_path is not None:
+                remap[file_id] = len(paths)
+                paths.append(rel_path)
+                mtime, size, _ = self.files[rel_path]
+                self.files[rel_path] = (mtime, size, remap[file_id])
+        postings = defaultdict(lambda: array("I"))
+        for gram, ids in self.postings.items():
+            kept = array("I", (remap[i] for i in ids if i in remap))
+            if kept:
+                postings[gram] = kept
+        self.paths, self.postings, self.retired = paths, postings, 0
+
+    def refresh(self) -> None:
+        # Several indexes (one per server session) share the pending state:
+        # each takes only the paths under its own root.
+        prefix = os.path.join(os.path.abspath(self.root), "")
+        with _pending_lock:
+            paths = [p for p in _pending_paths if p.startswith(prefix)]
+            _pending_paths.difference_update(paths)
+            generation = _sweep_generation
+        with self._lock:
+            sweep = generation != self.sweep_generation
+            self.sweep_generation = generation
+            if sweep or time.monotonic() - self.last_sweep > SWEEP_INTERVAL:
+                self._sweep()
+            else:
+                for path in paths:
+                    rel_path = os.path.relpath(path, self.root).replace(os.sep, "/")
+                    self._update(rel_path)
+            if self.retired and self.retired * 2 > len(self.paths):
+                self._compact()
+            save = self.dirty and time.monotonic() - self.last_save > SAVE_INTERVAL
+        if save:
+            self.save()
+
+    def candidates(self, literals: list) -> list:
+        """Paths of files that may contain every literal (all files if none)."""
+        with self._lock:
+            grams = set()
+            for literal in literals:
+                grams |= trigrams(literal.encode("utf-8"))
+            if not grams:
+                ids = range(len(self.paths))
+            else:
+                lists = sorted((self.postings.get(g, ()) for g in grams), key=len)
+                ids = set(lists[0])
+                for other in lists[1:]:
+                    if not ids:
+                        break
+                    ids.intersection_update(other)
+                ids = sorted(ids)
+            found = [self.paths[i] for i in ids if self.paths[i] is not None]
+            return found + sorted(self.unindexed)
@@ -1,117 +1,278 @@
+import argparse
 import asyncio
 import sys
+import time
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.live import Live
 from rich.spinner import Spinner
+from rich.table import Table
 from rich.text import Text
-from src.agent.graph import app
+from src.agent.prompt import usage_report
+from src.config import settings
+from src.core.scheduler import is_rate_limit
+from src.core.telemetry import start_metrics_server
 
 console = Console()
 
 
-async def main():
-    console.print(
-        Panel.fit(
-            "[bold cyan]Agent Zero Initialized[/bold cyan]\n"
-            "Your autonomous AI assistant is ready.\n"
-            "Type [bold red]'quit'[/bold red] to exit.",
-            border_style="bright_blue",
+def _content_text(content) -> str:
+    # Process Multi-part content
+    if isinstance(content, list):
+        return "".join(
+            part["text"] if isinstance(part, dict) and "text" in part else str(part)
+            for part in content
+            if not isinstance(part, dict) or part.get("type", "text") == "text"
         )
-    )
-
-    # Initialize session state
-    state = {"messages": [], "step_count": 0}
-
-    while True:
-        try:
-            user_input = console.input("[bold green]>> [/bold green]")
-            if user_input.lower() in ["quit", "exit"]:
-                console.print("[bold yellow]Goodbye![/bold yellow]")
-                break
-
-            if not user_input.strip():
-                continue
-
-            # Update state for new turn
-            state["messages"].append(("user", user_input))
-            state["step_count"] = 0
-
-            console.print(f"\n[dim]Starting workflow for: {user_input}[/dim]")
-
-            async for event in app.astream(state):
-                for key, value in event.items():
-                    # Update local state with the results from the graph
-                    state.update(value)
-
-                    # Format node header
-                    if key == "reason":
-                        icon = "🧠"
-                        color = "cyan"
-                    elif key == "tools":
-                        icon = "🛠️"
-                        color = "orange3"
-                    else:
-                        icon = "📍"
-                        color = "white"
-
-                    console.print(f"\n[bold {color}]{icon} Node: {key}[/bold {color}]")
-
-                    last_msg = value["messages"][-1]
-
-                    # Handle Tool Calls
-                    if hasattr(last_msg, "tool_calls") and last_msg.tool_calls:
-                        for tool_call in last_msg.tool_calls:
-                            console.print(
-                                Panel(
-                                    f"[bold yellow]Tool:[/bold yellow] {tool_call['name']}\n"
-                                    f"[bold yellow]Args:[/bold yellow] {tool_call['args']}",
-                                    title="Action Requested",
-                                    border_style="yellow",
-                                )
-                            )
+    return str(content)
+
+
+class MarkdownStream:
+    """Renders streamed model tokens as Markdown.
+    Completed blocks (text up to a blank line, outside code fences) are printed
+    once and never re-rendered; only the block still being written sits in a
+    `Live` region, redrawn at most every `interval` seconds.
+    """
+
+    def __init__(self, console: Console, interval: float = 0.1):
+        self.console = console
+        self.interval = interval
+        self.live = None
+        self.pending = ""
+        self.streamed = False
+        self._last_render = 0.0
+
+    def _split_point(self) -> int:
+        in_fence = False
+        split = pos = 0
+        for line in self.pending.splitlines(keepends=True):
+            pos += len(line)
+            if line.lstrip().startswith("```"):
+                in_fence = not in_fence
+            elif not in_fence and line.endswith("\n") and not line.strip():
+                split = pos
+        return split
+
+    def feed(self, text: str):
+        if not text:
+            return
+        if self.live is None:
+            if not self.streamed:
+                self.console.rule("[bold green]Zero Response[/bold green]", style="green")
+            self.live = Live(console=self.console, auto_refresh=False, transient=True)
+            self.live.start()
+        self.streamed = True
+        self.pending += text
+
+        split = self._split_point()
+        if split:
+            done, self.pending = self.pending[:split], self.pending[split:]
+            if done.strip():
+                self.live.console.print(Markdown(done))
+
+        now = time.monotonic()
+        if now - self._last_render >= self.interval:
+            self.live.update(Markdown(self.pending), refresh=True)
+            self._last_render = now
+
+    def close(self) -> bool:
+        """Flushes the trailing block. Returns True if anything was streamed
+        since the last close."""
+        if self.live is not None:
+            self.live.stop()
+            self.live = None
+            if self.pending.strip():
+                self.console.print(Markdown(self.pending))
+        self.pending = ""
+        streamed, self.streamed = self.streamed, False
+        return streamed
+
 
-                    # Handle AI Response
-                    elif hasattr(last_msg, "content") and last_msg.content:
-                        content = last_msg.content
-
-                        # Process Multi-part content
-                        if isinstance(content, list):
-                            full_text = "".join(
-                                part["text"]
-                                if isinstance(part, dict) and "text" in part
-                                else str(part)
-                                for part in content
+async def run_turn(app, inputs, config):
+    """Streams one graph run, rendering each node's output as it arrives."""
+    stream = MarkdownStream(console) if settings.stream_output else None
+    streamed = False
+
+    try:
+        async for event in app.astream(
+            inputs, config, stream_mode=["messages", "updates"] if stream else "updates"
+        ):
+            if stream:
+                mode, event = event
+                if mode == "messages":
+                    chunk, metadata = event
+                    if metadata.get("langgraph_node") == "reason":
+                        stream.feed(_content_text(chunk.content))
+                    continue
+                streamed = stream.close()
+
+            for key, value in event.items():
+                # Nodes like "compact" return no update when they have nothing to do
+                if not value:
+                    continue
+
+                # Format node header
+                if key == "reason":
+                    icon = "🧠"
+                    color = "cyan"
+                elif key == "tools":
+                    icon = "🛠️"
+                    color = "orange3"
+                elif key == "compact":
+                    console.print("[dim]Compacted older context to stay within the token budget.[/dim]")
+                    continue
+                else:
+                    icon = "📍"
+                    color = "white"
+
+                console.print(f"\n[bold {color}]{icon} Node: {key}[/bold {color}]")
+
+                last_msg = value["messages"][-1]
+
+                if key == "reason":
+                    usage = usage_report(last_msg)
+                    if usage["input_tokens"]:
+                        console.print(
+                            f"[dim]Tokens: {usage['input_tokens']} in "
+                            f"({usage['cached_tokens']} cached, {usage['uncached_tokens']} uncached), "
+                            f"{usage['output_tokens']} out[/dim]"
+                        )
+
+                # Handle Tool Calls
+                if hasattr(last_msg, "tool_calls") and last_msg.tool_calls:
+                    for tool_call in last_msg.tool_calls:
+                        console.print(
+                            Panel(
+                                f"[bold yellow]Tool:[/bold yellow] {tool_call['name']}\n"
+                                f"[bold yellow]Args:[/bold yellow] {tool_call['args']}",
+                                title="Action Requested",
+                                border_style="yellow",
                             )
-                        else:
-                            full_text = str(content)
-
-                        if full_text.strip():
-                            # Render Markdown in Terminal!
-                            console.print(
-                                Panel(
-                                    Markdown(full_text),
-                                    title="Zero Response",
-                                    border_style="green",
-                                    padding=(1, 2),
-                                )
+                        )
+
+                # Handle AI Response
+                elif hasattr(last_msg, "content") and last_msg.content:
+                    full_text = _content_text(last_msg.content)
+
+                    # Already rendered token by token
+                    if full_text.strip() and not (key == "reason" and streamed):
+                        # Render Markdown in Terminal!
+                        console.print(
+                            Panel(
+                                Markdown(full_text),
+                                title="Zero Response",
+                                border_style="green",
+                                padding=(1, 2),
                             )
+                        )
+    finally:
+        if stream:
+            stream.close()
 
-        except Exception as e:
-            if "RESOURCE_EXHAUSTED" in str(e) or "429" in str(e):
-                console.print(
-                    Panel(
-                        "[bold red]Rate Limit Exceeded (429)[/bold red]\n\n"
-                        "The Gemini API free tier is busy. Please wait ~30 seconds and try again.\n"
-                        "Tip: Once the agent finds your file, it will use fewer tokens.",
-                        title="API Limit",
-                        border_style="red",
-                    )
-                )
-            else:
+
+def print_sessions(rows):
+    if not rows:
+        console.print("No saved sessions.")
+        return
+    table = Table(title="Saved sessions")
+    table.add_column("session")
+    table.add_column("last used")
+    table.add_column("turns", justify="right")
+    for session_id, updated_at, turns in rows:
+        table.add_row(session_id, time.strftime("%Y-%m-%d %H:%M", time.localtime(updated_at)), str(turns))
+    console.print(table)
+
+
+async def main(args):
+    # Deferred so `--help` and argument errors don't wait for the graph to load
+    from src.agent.sessions import new_session_id, open_sessions
+
+    async with open_sessions() as sessions:
+        if args.list_sessions:
+            print_sessions(await sessions.list())
+            return
+
+        expired = await sessions.expire()
+        if expired:
+            console.print(f"[dim]Removed {len(expired)} expired session(s).[/dim]")
+
+        if args.resume and not await sessions.exists(args.resume):
+            console.print(f"[bold red]No saved session named '{args.resume}'.[/bold red]")
+            return
+        session_id = args.resume or args.session or new_session_id()
+        config = sessions.config(session_id)
+
+        console.print(
+            Panel.fit(
+                "[bold cyan]Agent Zero Initialized[/bold cyan]\n"
+                "Your autonomous AI assistant is ready.\n"
+                f"Session: [bold]{session_id}[/bold] (resume with --resume {session_id})\n"
+                "Type [bold red]'quit'[/bold red] to exit.",
+                border_style="bright_blue",
+            )
+        )
+
+        if settings.metrics_port:
+            start_metrics_server(settings.metrics_port)
+            console.print(
+                f"[dim]Metrics: http://127.0.0.1:{settings.metrics_port}/metrics[/dim]"
+            )
+
+        # A run that was cut off mid-task continues from its last checkpoint
+        snapshot = await sessions.app.aget_state(config)
+        if snapshot.next:
+            console.print(f"\n[dim]Resuming interrupted run at: {', '.join(snapshot.next)}[/dim]")
+            try:
+                await run_turn(sessions.app, None, config)
+            except Exception as e:
                 console.print(f"\n[bold red][Error][/bold red] {e}")
+        elif snapshot.values.get("messages"):
+            console.print(f"[dim]Restored {len(snapshot.values['messages'])} messages.[/dim]")
+
+        while True:
+            try:
+                user_input = console.input("[bold green]>> [/bold green]")
+                if user_input.lower() in ["quit", "exit"]:
+                    console.print("[bold yellow]Goodbye![/bold yellow]")
+                    break
+
+                if not user_input.strip():
+                    continue
+
+                console.print(f"\n[dim]Starting workflow for: {user_input}[/dim]")
+
+                # The checkpointer holds the history; only the new message is sent
+                await sessions.touch(session_id)
+                await run_turn(
+                    sessions.app, {"messages": [("user", user_input)], "step_count": 0}, config
+                )
+                await sessions.compact(session_id)
+
+            except Exception as e:
+                if is_rate_limit(e):
+                    console.print(
+                        Panel(
+                            "[bold red]Rate Limit Exceeded (429)[/bold red]\n\n"
+                            f"The Gemini API was still rate limiting after {settings.llm_max_retries} retries.\n"
+                            "Please wait a minute and try again, or lower LLM_RPM / LLM_TPM in .env "
+                            "so requests are queued before they hit the quota.",
+                            title="API Limit",
+                            border_style="red",
+                        )
+                    )
+                else:
+                    console.print(f"\n[bold red][Error][/bold red] {e}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Agent Zero interactive session.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--session", help="start or continue a session with this id")
+    group.add_argument("--resume", metavar="SESSION", help="restore a saved session")
+    group.add_argument("--list-sessions", action="store_true", help="list saved sessions and exit")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,268 @@
+"""Multi-session WebSocket server: many users against one compiled graph.
+
+    python -m src.server [--host HOST] [--port PORT]
+
+Connect to ws://HOST:PORT/sessions/<id> to start or resume a session (or to
+ws://HOST:PORT/ for a new one). Each session has its own checkpointed state
+(its thread id in the shared checkpointer) and its own workspace,
+WORKSPACE_ROOT/sessions/<id>; file, shell, search and memory tools only see
+that directory. `GET /health` reports load as JSON.
+
+Messages are JSON text frames. The client sends
+    {"type": "message", "content": "..."}   start a turn; add "priority": "background"
+                                            for batch work that may wait behind
+                                            interactive turns for model quota
+    {"type": "cancel"}                      stop the running turn
+and receives, per turn, any of
+    {"type": "queued"}                      waiting for a free turn slot
+    {"type": "token", "text": "..."}        streamed model output
+    {"type": "tool_call", "name": ..., "args": {...}}
+    {"type": "tool_result", "name": ..., "content": "..."}
+    {"type": "message", "content": "..."}   the final answer
+    {"type": "done"} or {"type": "error", "message": "..."}
+
+Memory is bounded by `server_max_sessions` connections, one turn per session
+at a time and `server_max_active_turns` turns running across all sessions;
+further turns wait in line.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+from src.agent.sessions import SessionStore, new_session_id, open_sessions
+from src.config import scoped_workspace, settings
+from src.core.scheduler import BACKGROUND, INTERACTIVE, priority
+from src.core.telemetry import span, start_metrics_server
+from src.main import _content_text
+
+SESSION_PATH = re.compile(r"^/(?:sessions/([A-Za-z0-9][A-Za-z0-9_.-]{0,63})?)?/?$")
+TOOL_RESULT_CHARS = 2000  # tool output forwarded to the client per call
+
+
+def session_workspace(session_id: str) -> str:
+    """The session's own directory under `WORKSPACE_ROOT/sessions`."""
+    sessions_dir = os.path.realpath(os.path.join(settings.workspace_root, "sessions"))
+    workspace = os.path.realpath(os.path.join(sessions_dir, session_id))
+    if os.path.dirname(workspace) != sessions_dir:
+        raise ValueError(f"Invalid session id: {session_id!r}")
+    return workspace
+
+
+class AgentServer:
+    """Routes WebSocket connections to sessions of a shared `SessionStore`."""
+
+    def __init__(self, sessions: SessionStore, max_sessions: int = None, max_active_turns: int = None):
+        self.sessions = sessions
+        self.max_sessions = max_sessions or settings.server_max_sessions
+        self.max_active_turns = max_active_turns or settings.server_max_active_turns
+        self.turn_slots = asyncio.Semaphore(self.max_active_turns)
+        self.connections = {}  # session_id -> ServerConnection
+        self.active_turns = 0
+        self.queued_turns = 0
+        self.completed_turns = 0
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self.connections),
+            "max_sessions": self.max_sessions,
+            "active_turns": self.active_turns,
+            "queued_turns": self.queued_turns,
+            "max_active_turns": self.max_active_turns,
+            "completed_turns": self.completed_turns,
+        }
+
+    def process_request(self, connection, request):
+        """Answers plain HTTP requests and refuses connections before the handshake."""
+        path = request.path.split("?", 1)[0]
+        if path == "/health":
+            response = connection.respond(200, json.dumps(self.stats()) + "\n")
+            response.headers["Content-Type"] = "application/json"
+            return response
+        match = SESSION_PATH.match(path)
+        if not match:
+            return connection.respond(404, "Not found. Connect to /sessions/<id>.\n")
+        if match.group(1) in self.connections:
+            return connection.respond(409, "Session is already connected.\n")
+        if len(self.connections) >= self.max_sessions:
+            return connection.respond(503, "Server is at its session limit, try again later.\n")
+        return None
+
+    async def handler(self, websocket):
+        session_id = SESSION_PATH.match(websocket.request.path.split("?", 1)[0]).group(1)
+        session_id = session_id or new_session_id()
+        if session_id in self.connections or len(self.connections) >= self.max_sessions:
+            await websocket.close(1013, "session limit")  # lost a race with another handshake
+            return
+        self.connections[session_id] = websocket
+        turn = None
+        try:
+            config = self.sessions.config(session_id)
+            snapshot = await self.sessions.app.aget_state(config)
+            await self._send(
+                websocket,
+                type="session",
+                id=session_id,
+                messages=len(snapshot.values.get("messages", [])),
+            )
+            if snapshot.next:
+                # A run that was cut off mid-task continues from its last checkpoint
+                turn = asyncio.create_task(self._run_turn(websocket, session_id, None, BACKGROUND))
+
+            async for raw in websocket:
+                try:
+                    request = json.loads(raw)
+                except ValueError:
+                    await self._send(websocket, type="error", message="Expected a JSON object.")
+                    continue
+                kind = request.get("type") if isinstance(request, dict) else None
+                if kind == "cancel":
+                    if turn and not turn.done():
+                        turn.cancel()
+                    continue
+                if kind != "message":
+                    await self._send(websocket, type="error", message=f"Unknown message type: {kind!r}.")
+                    continue
+                content = str(request.get("content", "")).strip()
+                if not content:
+                    continue
+                if len(content) > settings.server_max_message_chars:
+                    await self._send(
+                        websocket,
+                        type="error",
+                        message=f"Message exceeds {settings.server_max_message_chars} characters.",
+                    )
+                elif turn and not turn.done():
+                    await self._send(websocket, type="error", message="A turn is already running in this session.")
+                else:
+                    level = BACKGROUND if request.get("priority") == "background" else INTERACTIVE
+                    turn = asyncio.create_task(self._run_turn(websocket, session_id, content, level))
+        except ConnectionClosed:
+            pass
+        finally:
+            if turn and not turn.done():
+                turn.cancel()
+            del self.connections[session_id]
+
+    async def _run_turn(self, websocket, session_id: str, content: str, level: int = INTERACTIVE):
+        config = self.sessions.config(session_id)
+        inputs = None if content is None else {"messages": [("user", content)], "step_count": 0}
+        workspace = session_workspace(session_id)
+        queued = time.perf_counter()
+        waiting = True
+        self.queued_turns += 1
+        try:
+            if self.turn_slots.locked():
+                await self._send(websocket, type="queued")
+            async with self.turn_slots:
+                waiting = False
+                self.queued_turns -= 1
+                self.active_turns += 1
+                try:
+                    with span(
+                        "turn",
+                        "server",
+                        session=session_id,
+                        queue_ms=round((time.perf_counter() - queued) * 1000, 3),
+                    ), scoped_workspace(workspace), priority(level):
+                        os.makedirs(workspace, exist_ok=True)
+                        await self.sessions.touch(session_id)
+                        await self._stream(websocket, inputs, config)
+                        await self.sessions.compact(session_id)
+                finally:
+                    self.active_turns -= 1
+            self.completed_turns += 1
+            await self._send(websocket, type="done")
+        except asyncio.CancelledError:
+            await self._send(websocket, type="error", message="Turn cancelled.")
+        except Exception as e:
+            await self._send(websocket, type="error", message=str(e))
+        finally:
+            if waiting:
+                self.queued_turns -= 1
+
+    async def _stream(self, websocket, inputs, config):
+        """Forwards one graph run as events (compare `run_turn` in src/main.py)."""
+        streamed = False
+        async for mode, event in self.sessions.app.astream(
+            inputs, config, stream_mode=["messages", "updates"] if settings.stream_output else ["updates"]
+        ):
+            if mode == "messages":
+                chunk, metadata = event
+                text = _content_text(chunk.content)
+                if metadata.get("langgraph_node") == "reason" and text:
+                    streamed = True
+                    await self._send(websocket, type="token", text=text)
+                continue
+            for node, update in event.items():
+                if not update or node not in ("reason", "tools"):
+                    continue
+                for message in update["messages"]:
+                    if node == "tools":
+                        content = _content_text(message.content)
+                        await self._send(
+                            websocket,
+                            type="tool_result",
+                            name=message.name,
+                            content=content[:TOOL_RESULT_CHARS],
+                            truncated=len(content) > TOOL_RESULT_CHARS,
+                        )
+                    elif message.tool_calls:
+                        for call in message.tool_calls:
+                            await self._send(websocket, type="tool_call", name=call["name"], args=call["args"])
+                    else:
+                        await self._send(
+                            websocket,
+                            type="message",
+                            content=_content_text(message.content),
+                            streamed=streamed,
+                        )
+                streamed = False
+
+    @staticmethod
+    async def _send(websocket, **event):
+        try:
+            await websocket.send(json.dumps(event, default=str))
+        except ConnectionClosed:
+            pass
+
+
+async def run_server(host: str = None, port: int = None, ready: asyncio.Future = None):
+    """Serves until cancelled. `ready`, if given, receives the bound port."""
+    async with open_sessions() as sessions:
+        await sessions.expire()
+        server = AgentServer(sessions)
+        async with serve(
+            server.handler,
+            host or settings.server_host,
+            settings.server_port if port is None else port,
+            process_request=server.process_request,
+            max_size=settings.server_max_message_chars * 4 + 1024,
+            max_queue=4,
+        ) as ws_server:
+            bound_port = ws_server.sockets[0].getsockname()[1]
+            if ready is not None:
+                ready.set_result((server, bound_port))
+            else:
+                print(f"Agent Zero server listening on ws://{host or settings.server_host}:{bound_port}/sessions/<id>")
+            await ws_server.serve_forever()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Agent Zero multi-session WebSocket server.")
+    parser.add_argument("--host", help=f"interface to bind (default {settings.server_host})")
+    parser.add_argument("--port", type=int, help=f"port to listen on (default {settings.server_port})")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if settings.metrics_port:
+        start_metrics_server(settings.metrics_port)
+    try:
+        asyncio.run(run_server(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,56 @@
+import asyncio
+import os
+from langchain_core.tools import tool
+from src.config import settings, workspace_root
+from src.core.artifacts import ArtifactStore
+from src.core.cache import LRUCache
+
+ARTIFACT_DIR = ".artifacts"
+
+MAX_OPEN_STORES = 8  # per-workspace stores (server sessions) kept in memory
+
+_stores = LRUCache(
+    MAX_OPEN_STORES, lambda path: ArtifactStore(path, settings.artifact_max_mb * 1024 * 1024)
+)
+
+
+def _get_store() -> ArtifactStore:
+    return _stores.get(os.path.join(workspace_root(), ARTIFACT_DIR))
+
+
+def offload(text: str, source: str) -> str:
+    """Saves a large tool output and returns what the model sees instead:
+    a header with the handle and size, then the beginning of the output."""
+    handle = _get_store().put(text)
+    cut = settings.artifact_preview_chars
+    newline = text.rfind("\n", 0, cut)
+    if newline > cut // 2:
+        cut = newline + 1  # end the preview on a line boundary
+    return (
+        f"[Output of {source} saved as artifact {handle}: {len(text)} characters, "
+        f"{text.count(chr(10)) + 1} lines. Showing the first {cut}; "
+        f"call read_artifact('{handle}', offset={cut}) for more.]\n{text[:cut]}"
+    )
+
+
+@tool
+def read_artifact(handle: str, offset: int = 0, limit: int = 4000) -> str:
+    """Reads part of a large tool output that was saved as an artifact
+    (handles look like 'art-0123456789abcdef'). offset and limit are in characters."""
+    text = _get_store().get(handle)
+    if text is None:
+        return f"Error: Unknown or expired artifact '{handle}'. Re-run the tool that produced it."
+    offset = max(0, offset)
+    limit = max(1, min(limit, settings.read_file_max_bytes))
+    if offset >= len(text):
+        return f"Error: offset {offset} is past the end of {handle} ({len(text)} characters)."
+    end = min(offset + limit, len(text))
+    more = f"; next offset={end}" if end < len(text) else "; end of artifact"
+    return f"[{handle.strip()}: characters {offset}-{end} of {len(text)}{more}]\n{text[offset:end]}"
+
+
+async def _aread_artifact(handle: str, offset: int = 0, limit: int = 4000) -> str:
+    return await asyncio.to_thread(read_artifact.func, handle, offset, limit)
+
+
+read_artifact.coroutine = _aread_artifact
@@ -1,17 +1,181 @@
+import mmap
 import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from itertools import accumulate
 from pathlib import Path
 from langchain_core.tools import tool
-from src.config import settings
+from src.config import settings, workspace_root
+from src.core.trigram_index import mark_stale
+
+PAGE_LINES = 200  # default page when only start_line is given
+PREVIEW_LINES = 40  # lines shown in the summary of a large file
+SNIFF_BYTES = 8192
+INDEX_EVERY = 1024  # a large file's line index keeps every Nth line start
+INDEX_CACHE_SIZE = 16
+
+_line_indexes = OrderedDict()
+_line_indexes_lock = threading.Lock()
+
 
 def _get_safe_path(filename: str) -> Path:
     """Helper: Enforces sandbox security."""
-    safe_root = Path(settings.workspace_root).resolve()
+    safe_root = Path(workspace_root()).resolve()
     target_path = (safe_root / filename).resolve()
 
-    if not str(target_path).startswith(str(safe_root)):
+    # A string prefix check would let "../ab/x" escape from workspace "sessions/a"
+    if target_path != safe_root and safe_root not in target_path.parents:
         raise ValueError("Security Violation: Attempted access outside of workspace root.")
     return target_path
 
+
+def _human_size(size: int) -> str:
+    for unit in ("bytes", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _is_binary(path: Path) -> bool:
+    with open(path, "rb") as f:
+        sample = f.read(SNIFF_BYTES)
+    if b"\0" in sample:
+        return True
+    control = sum(1 for b in sample if b < 32 and b not in (9, 10, 12, 13, 27))
+    return bool(sample) and control / len(sample) > 0.3
+
+
+class LineIndex:
+    """Sparse newline index over a memory-mapped file: the byte offset of
+    every `INDEX_EVERY`-th line, so any line is at most that many lines of
+    scanning away."""
+
+    CHUNK = 1 << 20
+
+    def __init__(self, path: Path):
+        self.starts = array("Q", [0])
+        self.line_count = 0
+        size = path.stat().st_size
+        if not size:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for pos in range(0, size, self.CHUNK):
+                chunk = mm[pos : pos + self.CHUNK]
+                count = chunk.count(b"\n")
+                first = (-self.line_count - 1) % INDEX_EVERY
+                if first < count:
+                    # Cumulative line lengths give each newline's offset without a Python-level scan
+                    ends = list(accumulate(map(len, chunk.split(b"\n"))))
+                    for i in range(first, count, INDEX_EVERY):
+                        self.starts.append(pos + ends[i] + i + 1)
+                self.line_count += count
+            if mm[size - 1] != ord("\n"):
+                self.line_count += 1  # last line has no trailing newline
+
+    def offset(self, mm, line: int) -> int:
+        """Byte offset where 0-based `line` starts (file size if past the end)."""
+        block = min(line // INDEX_EVERY, len(self.starts) - 1)
+        pos = self.starts[block]
+        for _ in range(line - block * INDEX_EVERY):
+            pos = mm.find(b"\n", pos)
+            if pos < 0:
+                return len(mm)
+            pos += 1
+        return pos
+
+
+def _line_index(path: Path) -> LineIndex:
+    """Returns a cached index, rebuilt when the file's size or mtime changes."""
+    stat = path.stat()
+    key = str(path)
+    with _line_indexes_lock:
+        cached = _line_indexes.get(key)
+        if cached and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            _line_indexes.move_to_end(key)
+            return cached[1]
+    index = LineIndex(path)
+    with _line_indexes_lock:
+        _line_indexes[key] = ((stat.st_mtime_ns, stat.st_size), index)
+        while len(_line_indexes) > INDEX_CACHE_SIZE:
+            _line_indexes.popitem(last=False)
+    return index
+
+
+def _read_lines(filename: str, path: Path, start_line: int, num_lines: int) -> str:
+    index = _line_index(path)
+    start = max(start_line, 1) - 1
+    if start >= index.line_count:
+        return f"{filename} has {index.line_count} lines; start_line {start_line} is past the end."
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        begin = index.offset(mm, start)
+        end = begin
+        count = 0
+        limit = begin + settings.read_file_max_bytes
+        while count < max(num_lines, 1) and end < len(mm):
+            newline = mm.find(b"\n", end, limit)
+            if newline >= 0:
+                next_end = newline + 1
+            elif limit < len(mm):
+                break  # keep each page within the size threshold
+            else:
+                next_end = len(mm)
+            end = next_end
+            count += 1
+        if not count:
+            # A single line longer than a page: cut it on a character boundary
+            end = limit
+            while end > begin and mm[end] & 0xC0 == 0x80:
+                end -= 1
+        text = mm[begin:end].decode("utf-8", errors="replace")
+
+    if not count:
+        return (
+            f"[{filename}: line {start + 1} of {index.line_count} is longer than a page; "
+            f"bytes {begin}-{end} shown; next page: byte_offset={end}]\n{text}"
+        )
+    last = start + count
+    header = f"[{filename}: lines {start + 1}-{last} of {index.line_count}"
+    header += f"; next page: start_line={last + 1}]" if last < index.line_count else "]"
+    return f"{header}\n{text}"
+
+
+def _read_bytes(filename: str, path: Path, size: int, offset: int, num_bytes: int) -> str:
+    offset = min(max(offset, 0), size)
+    length = min(max(num_bytes or settings.read_file_max_bytes, 1), settings.read_file_max_bytes)
+    end = min(offset + length, size)
+    if offset == end:
+        return f"{filename} has {size} bytes; byte_offset {offset} is past the end."
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[offset:end].decode("utf-8", errors="replace")
+    header = f"[{filename}: bytes {offset}-{end} of {size}"
+    header += f"; next page: byte_offset={end}]" if end < size else "]"
+    return f"{header}\n{text}"
+
+
+def _file_stats(filename: str, path: Path, size: int, binary: bool) -> str:
+    modified = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(path.stat().st_mtime))
+    size_text = _human_size(size) if size < 1024 else f"{_human_size(size)} ({size} bytes)"
+    if binary:
+        return f"{filename}: {size_text}, binary, modified {modified}"
+    lines = _line_index(path).line_count
+    return f"{filename}: {size_text}, {lines} lines, text, modified {modified}"
+
+
+def _summary(filename: str, path: Path, size: int) -> str:
+    preview = _read_lines(filename, path, 1, PREVIEW_LINES)
+    preview = preview.split("\n", 1)[1][: settings.read_file_max_bytes // 4]
+    lines = _line_index(path).line_count
+    return (
+        f"{filename} is large ({_human_size(size)}, {lines} lines), so only the first "
+        f"lines are shown.\n"
+        f"Page through it with read_file('{filename}', start_line={PREVIEW_LINES + 1}, "
+        f"num_lines={PAGE_LINES}) or byte_offset/num_bytes; stats=True gives size and line count.\n"
+        f"--- first {PREVIEW_LINES} lines ---\n{preview}"
+    )
+
+
 @tool
 def write_file(filename: str, content: str) -> str:
     """Writes content to a file. Overwrites if exists."""
@@ -19,21 +183,47 @@ def write_file(filename: str, content: str) -> str:
         path = _get_safe_path(filename)
         path.parent.mkdir(parents=True, exist_ok=True)
         path.write_text(content, encoding="utf-8")
+        mark_stale(str(path))
         return f"Successfully wrote to {filename}"
     except Exception as e:
         return f"Failed to write to {filename}: {str(e)}"
 
 @tool
-def read_file(filename: str) -> str:
-    """Reads the content of a file."""
+def read_file(
+    filename: str,
+    start_line: int = None,
+    num_lines: int = None,
+    byte_offset: int = None,
+    num_bytes: int = None,
+    stats: bool = False,
+) -> str:
+    """Reads the content of a file.
+    Large files return a summary with the first lines instead of everything;
+    page through them with start_line/num_lines (1-based lines) or
+    byte_offset/num_bytes. stats=True returns size and line count only.
+    """
     try:
         path = _get_safe_path(filename)
         if not path.exists():
             return f"File {filename} does not exist."
+
+        size = path.stat().st_size
+        binary = _is_binary(path)
+        if stats:
+            return _file_stats(filename, path, size, binary)
+        if binary:
+            return f"{filename} is a binary file ({_human_size(size)}); it cannot be read as text."
+
+        if byte_offset is not None or num_bytes is not None:
+            return _read_bytes(filename, path, size, byte_offset or 0, num_bytes)
+        if start_line is not None or num_lines is not None:
+            return _read_lines(filename, path, start_line or 1, num_lines or PAGE_LINES)
+        if size > settings.read_file_max_bytes:
+            return _summary(filename, path, size)
         return path.read_text(encoding="utf-8")
     except Exception as e:
         return f"Failed to read {filename}: {str(e)}"
-    
+
 @tool
 def list_files(directory: str = ".") -> str:
     """Lists files in the given directory (default: root)."""    
@@ -1,54 +1,206 @@
+import asyncio
+import hashlib
 import os
+import re
 import shutil
+import threading
+import time
 import zipfile
+from collections import OrderedDict, defaultdict
 from pathlib import Path
 from langchain_core.tools import tool
-from git import Repo
 from src.config import settings
+from src.core.trigram_index import change_count
 from src.tools.filesystem import _get_safe_path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from git import Repo  # GitPython is imported on first use
+
+
+GIT_URL_PREFIXES = ("http://", "https://", "file://", "ssh://", "git@")
+PARTIAL_FILTERS = {"none": None, "blobless": "blob:none", "treeless": "tree:0"}
+MIRROR_REFSPECS = ["+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*"]
+
+_mirror_locks = defaultdict(threading.Lock)
+
+
+def _mirror_path(url: str) -> Path:
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", url.rstrip("/").rsplit("/", 1)[-1])[:40]
+    return Path(settings.workspace_root).resolve() / ".cache" / "git" / f"{name}-{digest}"
+
+
+def _update_mirror(url: str) -> Path:
+    """Creates or refreshes a bare, blobless mirror of the branches and tags
+    of `url` (not pull request or other refs). It holds their commits and
+    trees but no file contents, so re-ingesting the same repository with full
+    history clones locally and only fetches the blobs it checks out."""
+    from git import Repo
+
+    mirror = _mirror_path(url)
+    with _mirror_locks[str(mirror)]:
+        if (mirror / "HEAD").exists():
+            repo = Repo(mirror)
+        else:
+            mirror.mkdir(parents=True, exist_ok=True)
+            repo = Repo.init(mirror, bare=True)
+            repo.git.config("remote.origin.url", url)
+            repo.git.config("remote.origin.promisor", "true")
+            repo.git.config("remote.origin.partialclonefilter", "blob:none")
+            repo.git.config("core.repositoryformatversion", "1")
+            repo.git.config("extensions.partialclone", "origin")
+            # Let shallow/partial clones of the mirror ask for what they need
+            repo.git.config("uploadpack.allowFilter", "true")
+            repo.git.config("uploadpack.allowAnySHA1InWant", "true")
+        repo.git.fetch("--prune", "--filter=blob:none", "origin", *MIRROR_REFSPECS)
+        # Clones of the mirror check out its HEAD: follow the remote's default branch
+        symref = repo.git.ls_remote("--symref", "origin", "HEAD").split("\n", 1)[0]
+        if symref.startswith("ref: refs/heads/"):
+            repo.git.symbolic_ref("HEAD", symref[len("ref: "):].split("\t", 1)[0])
+    return mirror
+
+
+def _clone(url: str, target: Path, depth: int, partial: str, sparse_paths, use_cache: bool):
+    from git import Repo
+
+    clone_filter = PARTIAL_FILTERS[partial]
+    source = url
+    if use_cache:
+        source = _update_mirror(url).as_uri()
+        # The mirror has no blobs, so a clone of it must be at least blobless
+        clone_filter = clone_filter or "blob:none"
+
+    options = {"no_checkout": True}
+    if depth > 0:
+        options["depth"] = depth
+    if clone_filter:
+        options["filter"] = clone_filter
+    if sparse_paths:
+        options["sparse"] = True
+    repo = Repo.clone_from(source, target, **options)
+
+    if use_cache:
+        # Missing objects (blobs, deeper history) are fetched from the real remote
+        repo.git.remote("set-url", "origin", url)
+    if sparse_paths:
+        repo.git.sparse_checkout("set", *sparse_paths)
+    repo.git.checkout()
+    return repo
 
 
 @tool
-def ingest_external_source(source_url_or_path: str, target_folder: str) -> str:
-    """Clones a public GitHub repo or extracts a local .zip file into the workspace.
-    - If URL starts with http/https and ends with .git, it clones the repo.
-    - If it ends with .zip, it extracts it.
+def ingest_external_source(
+    source_url_or_path: str,
+    target_folder: str,
+    depth: int = 1,
+    partial: str = "none",
+    sparse_paths: Optional[List[str]] = None,
+    use_cache: Optional[bool] = None,
+) -> str:
+    """Clones a git repository or extracts a local .zip file into the workspace.
+    - http(s)://, ssh:// and file:// URLs are cloned; a path ending in .zip is extracted.
+    - depth: commits of history to fetch (0 = all). get_repo_history fetches more on demand.
+    - partial: "none", "blobless" (file contents fetched on demand) or "treeless"
+      (directories and contents on demand), for very large repositories.
+    - sparse_paths: only check out these directories (e.g. ["docs", "src/core"]).
+    - use_cache: keep a local mirror of the branches' history so ingesting the same
+      URL again is fast. Defaults to on for full-history clones (depth=0) only.
     """
     try:
         target_path = _get_safe_path(target_folder)
         if target_path.exists():
             return f"Error: Target folder '{target_folder}' already exists. Please choose a new one."
+        if partial not in PARTIAL_FILTERS:
+            return f"Error: partial must be one of {', '.join(PARTIAL_FILTERS)}."
 
-        target_path.mkdir(parents=True, exist_ok=True)
-
-        if source_url_or_path.endswith(".git") and source_url_or_path.startswith(
-            "http"
-        ):
-            Repo.clone_from(source_url_or_path, target_path)
-            return f"Successfully cloned repository into {target_folder}"
-
-        elif source_url_or_path.endswith(".zip"):
+        if source_url_or_path.endswith(".zip"):
             zip_path = Path(source_url_or_path)
             if not zip_path.exists():
                 return f"Error: Zip file not found at {source_url_or_path}"
 
+            target_path.mkdir(parents=True, exist_ok=True)
             with zipfile.ZipFile(zip_path, "r") as zip_ref:
                 zip_ref.extractall(target_path)
             return f"Successfully extracted zip into {target_folder}"
 
+        elif source_url_or_path.startswith(GIT_URL_PREFIXES):
+            if use_cache is None:
+                # Shallow clones fetch little history: a full mirror would cost more than it saves
+                use_cache = depth <= 0
+            target_path.mkdir(parents=True, exist_ok=True)
+            try:
+                repo = _clone(
+                    source_url_or_path, target_path, depth, partial, sparse_paths, use_cache
+                )
+            except Exception:
+                shutil.rmtree(target_path, ignore_errors=True)
+                raise
+            details = [f"depth {depth}" if depth > 0 else "full history"]
+            if partial != "none":
+                details.append(partial)
+            if sparse_paths:
+                details.append(f"sparse: {', '.join(sparse_paths)}")
+            return (
+                f"Successfully cloned repository into {target_folder} "
+                f"({', '.join(details)}; HEAD {repo.head.commit.hexsha[:10]})"
+            )
+
         else:
-            return "Error: Unsupported source type. Use a .git URL or a path to a .zip file."
+            return "Error: Unsupported source type. Use a git URL (https://, ssh://, file://) or a path to a .zip file."
 
     except Exception as e:
         return f"Error ingesting source: {str(e)}"
 
 
+async def _aingest_external_source(
+    source_url_or_path: str,
+    target_folder: str,
+    depth: int = 1,
+    partial: str = "none",
+    sparse_paths: Optional[List[str]] = None,
+    use_cache: Optional[bool] = None,
+) -> str:
+    # GitPython shells out to git and blocks; run it in a worker thread.
+    return await asyncio.to_thread(
+        ingest_external_source.func,
+        source_url_or_path,
+        target_folder,
+        depth,
+        partial,
+        sparse_paths,
+        use_cache,
+    )
+
+
+ingest_external_source.coroutine = _aingest_external_source
+
+
+def _commits_with_deepening(repo: "Repo", count: int) -> list:
+    """Lists up to `count` commits, deepening a shallow clone from origin
+    only when it holds fewer commits than were asked for."""
+    from git import GitCommandError
+
+    commits = list(repo.iter_commits(max_count=count))
+    while len(commits) < count and repo.git.rev_parse("--is-shallow-repository") == "true":
+        try:
+            repo.git.fetch("--deepen", str(count - len(commits)), "origin")
+        except GitCommandError:
+            break  # no reachable origin: report what is there
+        deeper = list(repo.iter_commits(max_count=count))
+        if len(deeper) == len(commits):
+            break
+        commits = deeper
+    return commits
+
+
 @tool
 def get_repo_history(directory: str = ".", count: int = 10) -> str:
     """Retrieves the latest commit history from a git repository.
     Used for generating accurate scrum reports and tracking updates.
     """
+    from git import Repo
+
     try:
         repo_path = _get_safe_path(directory)
         repo = Repo(repo_path)
@@ -56,7 +208,7 @@ def get_repo_history(directory: str = ".", count: int = 10) -> str:
         if repo.bare:
             return "Error: Could not find a valid git repository at this location."
 
-        commits = list(repo.iter_commits(max_count=count))
+        commits = _commits_with_deepening(repo, count)
         history = []
         for commit in commits:
             date = commit.authored_datetime.strftime("%Y-%m-%d %H:%M")
@@ -67,17 +219,157 @@ def get_repo_history(directory: str = ".", count: int = 10) -> str:
         return f"Error reading git history: {str(e)}"
 
 
+async def _aget_repo_history(directory: str = ".", count: int = 10) -> str:
+    return await asyncio.to_thread(get_repo_history.func, directory, count)
+
+
+get_repo_history.coroutine = _aget_repo_history
+
+
+DIFF_MODES = {"unstaged": [], "staged": ["--cached"], "all": ["HEAD"]}
+DIFF_PAGE_CHARS = 6000
+INLINE_DIFF_LINES = 200  # summaries of change sets up to this size include the diff
+WORKTREE_TTL = 30.0  # seconds a diff involving the working tree is reused
+DIFF_CACHE_SIZE = 64
+
+_diff_cache = OrderedDict()
+_diff_cache_lock = threading.Lock()
+
+
+def _cached_git(repo: "Repo", changes: str, key: tuple, compute):
+    """Memoizes a git query on HEAD and the index mtime. Staging or committing
+    changes either, so staged diffs are reused until then. Editing a file
+    touches neither: diffs that read the working tree are also keyed on
+    `change_count()`, which write_file and finished commands bump, and are
+    capped at `WORKTREE_TTL` for edits made outside the agent."""
+    index = os.path.join(repo.git_dir, "index")
+    head = repo.head.commit.hexsha if repo.head.is_valid() else ""
+    index_mtime = os.stat(index).st_mtime_ns if os.path.exists(index) else 0
+    worktree = None if changes == "staged" else change_count()
+    full_key = (repo.working_tree_dir, head, index_mtime, worktree, changes) + key
+    now = time.monotonic()
+    with _diff_cache_lock:
+        entry = _diff_cache.get(full_key)
+        if entry and (changes == "staged" or now - entry[0] < WORKTREE_TTL):
+            _diff_cache.move_to_end(full_key)
+            return entry[1]
+    value = compute()
+    with _diff_cache_lock:
+        _diff_cache[full_key] = (now, value)
+        while len(_diff_cache) > DIFF_CACHE_SIZE:
+            _diff_cache.popitem(last=False)
+    return value
+
+
+def _numstat(repo: "Repo", changes: str) -> list:
+    """Returns `(added, deleted, path)` per changed file; counts are None for binary files."""
+    output = _cached_git(
+        repo, changes, ("numstat",), lambda: repo.git.diff("--numstat", *DIFF_MODES[changes])
+    )
+    rows = []
+    for line in output.splitlines():
+        added, deleted, path = line.split("\t", 2)
+        rows.append((None if added == "-" else int(added), None if deleted == "-" else int(deleted), path))
+    return rows
+
+
+def _split_hunks(diff: str):
+    """Splits a single-file diff into its header and a list of hunks."""
+    header, hunks = [], []
+    for line in diff.splitlines():
+        if line.startswith("@@"):
+            hunks.append([line])
+        elif hunks:
+            hunks[-1].append(line)
+        else:
+            header.append(line)
+    return "\n".join(header), ["\n".join(h) for h in hunks]
+
+
+def _diff_summary(repo: "Repo", directory: str, changes: str) -> str:
+    rows = _numstat(repo, changes)
+    untracked = []
+    if changes != "staged":
+        untracked = _cached_git(
+            repo, changes, ("untracked",),
+            lambda: repo.git.ls_files("--others", "--exclude-standard").splitlines(),
+        )
+    if not rows and not untracked:
+        return f"No {changes} changes in {directory}."
+
+    added = sum(r[0] or 0 for r in rows)
+    deleted = sum(r[1] or 0 for r in rows)
+    lines = [f"{changes.capitalize()} changes in {directory}: {len(rows)} files changed, +{added} -{deleted}"]
+    for a, d, path in rows:
+        counts = "binary" if a is None else f"+{a} -{d}"
+        lines.append(f"  {counts:<14} {path}")
+    if untracked:
+        shown = ", ".join(untracked[:20])
+        more = f" and {len(untracked) - 20} more" if len(untracked) > 20 else ""
+        lines.append(f"Untracked files ({len(untracked)}): {shown}{more}")
+
+    if rows and added + deleted <= INLINE_DIFF_LINES:
+        diff = _cached_git(repo, changes, ("full",), lambda: repo.git.diff(*DIFF_MODES[changes]))
+        if len(diff) <= DIFF_PAGE_CHARS:
+            return "\n".join(lines) + "\n\n" + diff
+    if rows:
+        lines.append(
+            f"Use get_file_diffs('{directory}', path='<file>', changes='{changes}') to page through one file's diff."
+        )
+    return "\n".join(lines)
+
+
+def _file_diff(repo: "Repo", path: str, changes: str, hunk: int) -> str:
+    diff = _cached_git(
+        repo, changes, ("file", path), lambda: repo.git.diff(*DIFF_MODES[changes], "--", path)
+    )
+    if not diff:
+        return f"No {changes} changes in {path}."
+    header, hunks = _split_hunks(diff)
+    if not hunks:
+        return diff  # binary file, mode change or rename without content changes
+    start = min(max(hunk, 1), len(hunks)) - 1
+    end = start
+    size = len(header)
+    while end < len(hunks) and (end == start or size + len(hunks[end]) <= DIFF_PAGE_CHARS):
+        size += len(hunks[end])
+        end += 1
+    page = "\n".join([header] + hunks[start:end])
+    if len(page) > DIFF_PAGE_CHARS:
+        page = page[:DIFF_PAGE_CHARS] + "\n... [hunk truncated]"
+    title = f"[{path}: hunks {start + 1}-{end} of {len(hunks)} ({changes})"
+    title += f"; next page: hunk={end + 1}]" if end < len(hunks) else "]"
+    return f"{title}\n{page}"
+
+
 @tool
-def get_file_diffs(directory: str = ".") -> str:
-    """Shows the uncommitted changes in the repository to see what is currently being worked on."""
+def get_file_diffs(
+    directory: str = ".", path: str = None, changes: str = "unstaged", hunk: int = 1
+) -> str:
+    """Shows the uncommitted changes in the repository to see what is currently being worked on.
+    Without a path, returns a diffstat (files with +/- line counts, untracked files) and,
+    for small change sets, the diff itself. With a path, returns that file's diff a page
+    of hunks at a time, starting at `hunk`.
+    changes: "unstaged" (working tree vs index), "staged" (index vs HEAD) or "all" (working tree vs HEAD).
+    """
+    from git import Repo
+
     try:
+        if changes not in DIFF_MODES:
+            return f"Error: changes must be one of {', '.join(DIFF_MODES)}."
         repo_path = _get_safe_path(directory)
         repo = Repo(repo_path)
-        diff = repo.git.diff()
-        return (
-            f"Uncommitted changes in {directory}:\n{diff[:2000]}..."
-            if diff
-            else "No uncommitted changes."
-        )
+        if path:
+            return _file_diff(repo, path, changes, hunk)
+        return _diff_summary(repo, directory, changes)
     except Exception as e:
         return f"Error reading diffs: {str(e)}"
+
+
+async def _aget_file_diffs(
+    directory: str = ".", path: str = None, changes: str = "unstaged", hunk: int = 1
+) -> str:
+    return await asyncio.to_thread(get_file_diffs.func, directory, path, changes, hunk)
+
+
+get_file_diffs.coroutine = _aget_file_diffs
@@ -16,10 +16,9 @@ def open_in_app(filename: str, app_name: str = None) -> str:
             return "Error: Cannot open GUI applications directly from inside a Docker container. Please run the agent locally to use this feature."
 
         # Get the absolute path
-        from src.config import settings
+        from src.tools.filesystem import _get_safe_path
 
-        workspace_root = os.path.abspath(settings.workspace_root)
-        file_path = os.path.join(workspace_root, filename)
+        file_path = str(_get_safe_path(filename))
 
         if not os.path.exists(file_path):
             return f"Error: File '{filename}' not found in workspace."
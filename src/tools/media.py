@@ -1,11 +1,13 @@
+import asyncio
 from langchain_core.tools import tool
-from youtube_transcript_api import YouTubeTranscriptApi
 import re
 
 
 @tool
 def get_youtube_transcript(video_url: str) -> str:
     """Retrieves the transcript of a YouTube video given its URL."""
+    from youtube_transcript_api import YouTubeTranscriptApi
+
     try:
         # Extract video ID from URL
         video_id_match = re.search(r"(?:v=|\/)([0-9A-Za-z_-]{11}).*", video_url)
@@ -23,3 +25,10 @@ def get_youtube_transcript(video_url: str) -> str:
         return full_transcript
     except Exception as e:
         return f"Error fetching YouTube transcript: {str(e)}"
+
+
+async def _aget_youtube_transcript(video_url: str) -> str:
+    return await asyncio.to_thread(get_youtube_transcript.func, video_url)
+
+
+get_youtube_transcript.coroutine = _aget_youtube_transcript
@@ -1,57 +1,222 @@
 import json
 import os
+import sqlite3
+import threading
+import time
 from langchain_core.tools import tool
-from src.config import settings
+from src.config import workspace_root
+from src.core.cache import LRUCache
+from src.core.text_index import BM25Index
 
-MEMORY_FILE = "agent_memory.json"
+MEMORY_DB = "agent_memory.db"
+LEGACY_MEMORY_FILE = "agent_memory.json"
+INDEX_MAX_SCAN = 250  # see BM25Index: bounds the work per query term
+MAX_OPEN_STORES = 8  # per-workspace stores (server sessions) kept open
 
 
-def _get_memory_path():
-    return os.path.join(settings.workspace_root, MEMORY_FILE)
+class FactStore:
+    """SQLite-backed key/value store for long-term facts.
 
+    Runs in WAL mode so readers never block the writer and several agent
+    sessions can share one workspace. Every write is an atomic upsert on the
+    primary key; `put_many` batches any number of upserts into one transaction.
 
-def _load_memory():
-    path = _get_memory_path()
-    if os.path.exists(path):
+    `search` ranks facts by BM25 over key and value. The index is built on
+    the first search and kept current in place by this store's writes. Each
+    write transaction also takes the next number from a counter row and
+    stamps it on its rows (`seq`); writers are serialized, so rows written
+    through other connections are picked up via `PRAGMA data_version` and
+    `seq` greater than the last one indexed, without rescanning the table.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")  # one schema upgrade at a time
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS facts ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " seq INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(facts)")}
+            if "seq" not in columns:
+                self._conn.execute("ALTER TABLE facts ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("DROP INDEX IF EXISTS facts_updated_at")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS facts_seq ON facts (seq)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS fact_seq ("
+                " id INTEGER PRIMARY KEY CHECK (id = 0),"
+                " value INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO fact_seq (id, value)"
+                " SELECT 0, COALESCE(MAX(seq), 0) FROM facts"
+            )
+        self._index = None
+        self._index_version = None
+        self._indexed_seq = 0
+
+    def put(self, key: str, value: str):
+        self.put_many([(key, value)])
+
+    def put_many(self, items):
+        items = [(k, str(v)) for k, v in items]
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                # Taking the number locks out other writers until this commits
+                self._conn.execute("UPDATE fact_seq SET value = value + 1 WHERE id = 0")
+                seq = self._conn.execute("SELECT value FROM fact_seq WHERE id = 0").fetchone()[0]
+                self._conn.executemany(
+                    "INSERT INTO facts (key, value, updated_at, seq) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT(key) DO UPDATE SET value = excluded.value,"
+                    " updated_at = excluded.updated_at, seq = excluded.seq",
+                    ((k, v, now, seq) for k, v in items),
+                )
+            if self._index is not None:
+                # data_version ignores this connection's own commits
+                for k, v in items:
+                    self._index.add(k, f"{k} {v}")
+                if seq == self._indexed_seq + 1:
+                    self._indexed_seq = seq  # otherwise another writer came in between
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM facts WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def items(self):
+        # rowid order == first-insertion order, matching the old JSON file.
+        with self._lock:
+            return self._conn.execute(
+                "SELECT key, value FROM facts ORDER BY rowid"
+            ).fetchall()
+
+    def _index_rows(self, rows):
+        for key, value, seq in rows:
+            self._index.add(key, f"{key} {value}")
+            self._indexed_seq = max(self._indexed_seq, seq)
+
+    def _sync_index(self):
+        # Caller holds the lock.
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._index is None:
+            self._index = BM25Index(max_scan=INDEX_MAX_SCAN)
+            self._index_rows(self._conn.execute("SELECT key, value, seq FROM facts"))
+        elif version != self._index_version:
+            self._index_rows(
+                self._conn.execute(
+                    "SELECT key, value, seq FROM facts WHERE seq > ?", (self._indexed_seq,)
+                )
+            )
+        self._index_version = version
+
+    def search(self, query: str, k: int = 5) -> list:
+        """Returns up to `k` `(key, value)` pairs, most relevant first."""
+        with self._lock:
+            self._sync_index()
+            keys = [key for key, _ in self._index.search(query, k)]
+            if not keys:
+                return []
+            rows = dict(
+                self._conn.execute(
+                    f"SELECT key, value FROM facts WHERE key IN ({','.join('?' * len(keys))})",
+                    keys,
+                ).fetchall()
+            )
+        return [(key, rows[key]) for key in keys if key in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+
+    def migrate_json(self, json_path: str) -> int:
+        """One-time import of a legacy `agent_memory.json`. The file is renamed
+        to `*.migrated` afterwards so it is never imported twice."""
+        if not os.path.exists(json_path):
+            return 0
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
+            with open(json_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        self.put_many(legacy.items())
+        os.replace(json_path, json_path + ".migrated")
+        return len(legacy)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
 
 
-def _save_memory(memory):
-    path = _get_memory_path()
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(memory, f, indent=4)
+def _open_store(path: str) -> FactStore:
+    store = FactStore(path)
+    store.migrate_json(os.path.join(os.path.dirname(path), LEGACY_MEMORY_FILE))
+    return store
+
+
+_stores = LRUCache(MAX_OPEN_STORES, _open_store, on_evict=FactStore.close)
+
+
+def _get_store() -> FactStore:
+    return _stores.get(os.path.join(workspace_root(), MEMORY_DB))
 
 
 @tool
 def store_fact(key: str, value: str) -> str:
     """Stores a fact or preference in the agent's long-term memory."""
-    memory = _load_memory()
-    memory[key] = value
-    _save_memory(memory)
+    _get_store().put(key, value)
     return f"Stored fact: {key} = {value}"
 
 
 @tool
 def retrieve_fact(key: str) -> str:
     """Retrieves a fact or preference from the agent's long-term memory."""
-    memory = _load_memory()
-    if key in memory:
-        return f"Fact for '{key}': {memory[key]}"
+    store = _get_store()
+    value = store.get(key)
+    if value is not None:
+        return f"Fact for '{key}': {value}"
+    similar = store.search(key, 3)
+    if similar:
+        return f"No fact found for '{key}'. Similar facts:\n" + _format_facts(similar)
     return f"No fact found for '{key}'."
 
 
+@tool
+def search_facts(query: str, k: int = 5) -> str:
+    """Searches long-term memory for the facts most relevant to `query`
+    (matched against keys and values, best first). Prefer it over list_all_facts."""
+    facts = _get_store().search(query, k)
+    if not facts:
+        return f"No facts matching '{query}'."
+    return f"Facts matching '{query}':\n" + _format_facts(facts)
+
+
+def _format_facts(facts) -> str:
+    return "\n".join(f"{k}: {v}" for k, v in facts)
+
+
+def relevant_facts(query: str, k: int) -> list:
+    """Top-`k` facts for `query`; empty if memory was never used in this workspace."""
+    if not query.strip() or not os.path.exists(os.path.join(workspace_root(), MEMORY_DB)):
+        return []
+    return _get_store().search(query, k)
+
+
 @tool
 def list_all_facts() -> str:
     """Lists all facts stored in the agent's long-term memory."""
-    memory = _load_memory()
-    if not memory:
+    facts = _get_store().items()
+    if not facts:
         return "Memory is empty."
 
-    facts = [f"{k}: {v}" for k, v in memory.items()]
-    return "Stored facts:\n" + "\n".join(facts)
+    return "Stored facts:\n" + _format_facts(facts)
@@ -1,47 +1,132 @@
 import os
+from collections import Counter
 from pathlib import Path
 from langchain_core.tools import tool
+from src.config import workspace_root
+from src.core.cache import LRUCache
+from src.core.tree_index import IgnoreRules, TreeIndex, ancestor_rules, is_ignored
 from src.tools.filesystem import _get_safe_path
 from typing import List
 
 
+DEFAULT_IGNORE_DIRS = [
+    ".git",
+    "__pycache__",
+    "node_modules",
+    "venv",
+    ".venv",
+    "dist",
+    "build",
+    # Agent Zero's own caches, logs and checkpoints
+    ".cache",
+    ".logs",
+    ".checkpoints",
+    ".traces",
+    ".artifacts",
+]
+COLLAPSE_FILES = 25  # directories with more files (or subdirectories) are summarized
+COLLAPSE_SHOW = 8  # entries still listed by name in a collapsed directory
+
+MAX_LOADED_INDEXES = 8  # per-workspace indexes (server sessions) kept in memory
+
+# Evicted indexes are saved and reloaded from disk on the workspace's next walk
+_tree_indexes = LRUCache(
+    MAX_LOADED_INDEXES,
+    lambda root: TreeIndex(root, os.path.join(root, ".cache", "tree_index.json")),
+    on_evict=TreeIndex.save,
+)
+
+
+def _get_tree_index() -> TreeIndex:
+    return _tree_indexes.get(str(Path(workspace_root()).resolve()))
+
+
+def _collapsed(files: list) -> str:
+    extensions = Counter(os.path.splitext(f)[1] or "(no extension)" for f in files)
+    kinds = ", ".join(f"{ext} x{count}" for ext, count in extensions.most_common(5))
+    return f"... {len(files) - COLLAPSE_SHOW} more files ({len(files)} total: {kinds})"
+
+
 @tool
-def explore_project(directory: str = ".", ignore_dirs: List[str] = None) -> str:
-    """Recursively lists all files in a project directory to help understand the structure.
+def explore_project(
+    directory: str = ".",
+    ignore_dirs: List[str] = None,
+    max_depth: int = 4,
+    max_files: int = 300,
+) -> str:
+    """Recursively lists the files in a project directory to help understand the structure.
     Useful for generating project updates or scrum reports.
+    Honours .gitignore. Directories deeper than max_depth are shown but not expanded,
+    large directories are summarized, and at most max_files files are listed;
+    explore a subdirectory to see more.
     """
     if ignore_dirs is None:
-        ignore_dirs = [
-            ".git",
-            "__pycache__",
-            "node_modules",
-            "venv",
-            ".venv",
-            "dist",
-            "build",
-        ]
+        ignore_dirs = DEFAULT_IGNORE_DIRS
 
     try:
         root_path = _get_safe_path(directory)
+        if not root_path.is_dir():
+            return f"{directory} is not a valid directory."
+        index = _get_tree_index()
+        rel_root = root_path.relative_to(index.root).as_posix()
+        rel_root = "" if rel_root == "." else rel_root
+
         tree = []
+        listed = 0
+        truncated = False
+        # Depth-first in name order: (rel_dir, level, inherited .gitignore rules)
+        # or a line of text to emit once the directories before it are done
+        stack = [(rel_root, 0, ancestor_rules(index.root, rel_root))]
+
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                tree.append(item)  # summary line for collapsed subdirectories
+                continue
+            rel_dir, level, rules = item
+            name = rel_dir.rsplit("/", 1)[-1] if rel_dir else (root_path.name or directory)
+            if level >= max_depth:
+                tree.append(f"{'  ' * level}{name}/ ...")
+                continue
+            tree.append(f"{'  ' * level}{name}/")
+
+            dirs, files = index.listing(rel_dir)
+            if ".gitignore" in files:
+                loaded = IgnoreRules.load(rel_dir, os.path.join(index.root, rel_dir, ".gitignore"))
+                rules = rules + [loaded] if loaded else rules
 
-        for root, dirs, files in os.walk(root_path):
-            # Filter ignored directories
-            dirs[:] = [d for d in dirs if d not in ignore_dirs]
+            def rel(entry):
+                return f"{rel_dir}/{entry}" if rel_dir else entry
 
-            relative_root = os.path.relpath(root, root_path)
-            if relative_root == ".":
-                level = 0
-            else:
-                level = relative_root.count(os.sep) + 1
+            dirs = [d for d in dirs if d not in ignore_dirs and not is_ignored(rules, rel(d), True)]
+            files = [f for f in files if not is_ignored(rules, rel(f), False)]
 
-            indent = "  " * level
-            tree.append(f"{indent}{os.path.basename(root)}/")
+            indent = "  " * (level + 1)
+            shown = files[:COLLAPSE_SHOW] if len(files) > COLLAPSE_FILES else files
+            for f in shown:
+                if listed >= max_files:
+                    truncated = True
+                    break
+                tree.append(f"{indent}{f}")
+                listed += 1
+            if truncated:
+                break
+            if len(shown) < len(files):
+                tree.append(f"{indent}{_collapsed(files)}")
 
-            sub_indent = "  " * (level + 1)
-            for f in files:
-                tree.append(f"{sub_indent}{f}")
+            if len(dirs) > COLLAPSE_FILES:
+                hidden = dirs[COLLAPSE_SHOW:]
+                stack.append(f"{indent}... {len(hidden)} more directories: {', '.join(hidden[:20])}")
+                dirs = dirs[:COLLAPSE_SHOW]
+            for d in reversed(dirs):
+                stack.append((rel(d), level + 1, rules))
 
+        if truncated:
+            tree.append(
+                f"... stopped after {max_files} files; explore a subdirectory "
+                "or raise max_files to see more."
+            )
+        index.save()
         return "Project Structure:\n" + "\n".join(tree)
     except Exception as e:
         return f"Error exploring project: {str(e)}"
@@ -1,33 +1,127 @@
 import json
 import os
+import threading
+from collections import defaultdict
 from langchain_core.tools import tool
-from src.config import settings
+from src.config import workspace_root
+from src.core.cache import LRUCache
+from src.core.text_index import BM25Index
 from src.tools.web import scrape_website
 import datetime
 
-RESOURCES_FILE = "resources_kb.json"
+RESOURCES_FILE = "resources_kb.jsonl"
+LEGACY_RESOURCES_FILE = "resources_kb.json"
+MAX_LOADED_KBS = 8  # per-workspace indexes (server sessions) kept in memory
 
 
-def _get_resources_path():
-    return os.path.join(settings.workspace_root, RESOURCES_FILE)
+class ResourceKB:
+    """Append-only resource log (`resources_kb.jsonl`) with in-memory indexes.
 
+    Adding a resource appends one line to the log and updates the category
+    index and the BM25 index in place. Lines appended by other processes are
+    picked up incrementally on the next access by reading from the last known
+    offset, so the file is never re-parsed in full.
+    """
 
-def _load_resources():
-    path = _get_resources_path()
-    if os.path.exists(path):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.entries = []
+        self.by_category = defaultdict(list)
+        self.index = BM25Index()
+        self._offset = 0
+
+    def _refresh(self):
+        # Caller holds the lock.
+        if not os.path.exists(self.path):
+            return
+        size = os.path.getsize(self.path)
+        if size < self._offset:
+            # The log was replaced or truncated; start over.
+            self._reset()
+        if size == self._offset:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        # Only consume complete lines; a concurrent writer may be mid-append.
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            doc_id = len(self.entries)
+            self.entries.append(entry)
+            self.by_category[entry["category"].lower()].append(doc_id)
+            self.index.add(
+                doc_id, f"{entry['url']} {entry['category']} {entry['summary']}"
+            )
+        self._offset += end
+
+    def append(self, entries):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            data = "".join(json.dumps(e) + "\n" for e in entries)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+            self._refresh()
+
+    def list(self, category: str = None) -> list:
+        with self._lock:
+            self._refresh()
+            if category is None:
+                return list(self.entries)
+            return [self.entries[i] for i in self.by_category.get(category.lower(), [])]
+
+    def search(self, query: str, category: str = None, limit: int = 5) -> list:
+        with self._lock:
+            self._refresh()
+            allowed = None
+            if category:
+                allowed = set(self.by_category.get(category.lower(), []))
+            hits = self.index.search(query, k=limit, allowed=allowed)
+            return [self.entries[doc_id] for doc_id, _ in hits]
+
+    def migrate_json(self, json_path: str) -> int:
+        """One-time import of a legacy `resources_kb.json` array. The file is
+        renamed to `*.migrated` afterwards so it is never imported twice."""
+        if not os.path.exists(json_path):
+            return 0
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return []
-    return []
+            with open(json_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        self.append(legacy)
+        os.replace(json_path, json_path + ".migrated")
+        return len(legacy)
+
+
+def _open_kb(path: str) -> ResourceKB:
+    kb = ResourceKB(path)
+    kb.migrate_json(os.path.join(os.path.dirname(path), LEGACY_RESOURCES_FILE))
+    return kb
+
+
+_kbs = LRUCache(MAX_LOADED_KBS, _open_kb)
+
+
+def _get_kb() -> ResourceKB:
+    return _kbs.get(os.path.join(workspace_root(), RESOURCES_FILE))
 
 
-def _save_resources(resources):
-    path = _get_resources_path()
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(resources, f, indent=4)
+def _format_resources(resources) -> str:
+    output = []
+    for r in resources:
+        output.append(
+            f"[{r['category']}] {r['url']}\n   Summary: {r['summary']}\n   Added: {r['date_added']}"
+        )
+    return "\n\n".join(output)
 
 
 @tool
@@ -37,8 +131,6 @@ def add_resource(
     """Adds a link/resource to the knowledge base, automatically scrapes a summary if not provided,
     and sorts it by category.
     """
-    resources = _load_resources()
-
     summary = manual_summary
     if not summary:
         # Attempt to auto-summarize by scraping the first 500 chars
@@ -54,28 +146,37 @@ def add_resource(
         "date_added": datetime.datetime.now().isoformat(),
     }
 
-    resources.append(new_entry)
-    _save_resources(resources)
+    _get_kb().append([new_entry])
 
     return f"Successfully added resource to '{category}': {url}"
 
 
 @tool
-def list_resources(category: str = None) -> str:
-    """Lists stored resources, optionally filtered by category."""
-    resources = _load_resources()
+def list_resources(category: str = None, limit: int = 20) -> str:
+    """Lists stored resources, optionally filtered by category.
+    Shows at most `limit` entries; use 'search_resources' to find specific links.
+    """
+    resources = _get_kb().list(category)
     if not resources:
-        return "No resources found."
-
-    if category:
-        resources = [r for r in resources if r["category"].lower() == category.lower()]
-        if not resources:
+        if category:
             return f"No resources found in category '{category}'."
+        return "No resources found."
 
-    output = []
-    for r in resources:
-        output.append(
-            f"[{r['category']}] {r['url']}\n   Summary: {r['summary']}\n   Added: {r['date_added']}"
+    output = _format_resources(resources[:limit])
+    if len(resources) > limit:
+        output += (
+            f"\n\n... {len(resources) - limit} more. "
+            "Use 'search_resources' to narrow down."
         )
+    return output
 
-    return "\n\n".join(output)
+
+@tool
+def search_resources(query: str, category: str = None, limit: int = 5) -> str:
+    """Searches the resources knowledge base by keywords (URL, category and summary),
+    returning the most relevant entries first. Optionally restrict to one category.
+    """
+    resources = _get_kb().search(query, category, limit)
+    if not resources:
+        return f"No resources matching '{query}'."
+    return _format_resources(resources)
@@ -0,0 +1,104 @@
+import asyncio
+import fnmatch
+import os
+import re
+from langchain_core.tools import tool
+from src.core.cache import LRUCache
+from src.core.trigram_index import TrigramIndex, literal_runs
+from src.core.tree_index import iter_files
+from src.tools.project import DEFAULT_IGNORE_DIRS, _get_tree_index, _tree_indexes
+
+MAX_LINE_CHARS = 200
+MAX_LOADED_INDEXES = 8  # per-workspace indexes kept in memory (server sessions)
+
+def _open_search_index(root: str) -> TrigramIndex:
+    def list_files():
+        tree = _tree_indexes.get(root)
+        yield from iter_files(tree, "", DEFAULT_IGNORE_DIRS)
+        tree.save()
+
+    return TrigramIndex(root, list_files, os.path.join(root, ".cache", "search_index.bin"))
+
+
+# Evicted indexes are saved and reloaded from disk on the workspace's next search
+_search_indexes = LRUCache(MAX_LOADED_INDEXES, _open_search_index, on_evict=TrigramIndex.save)
+
+
+def _get_search_index() -> TrigramIndex:
+    return _search_indexes.get(_get_tree_index().root)
+
+
+def _compile(pattern: str):
+    try:
+        return re.compile(pattern), literal_runs(pattern)
+    except re.error:
+        # Not a valid regex (e.g. "foo(") -- search for it literally
+        return re.compile(re.escape(pattern)), [pattern]
+
+
+def _matches_glob(path: str, glob: str) -> bool:
+    return fnmatch.fnmatch(path, glob) or fnmatch.fnmatch(os.path.basename(path), glob)
+
+
+@tool
+def search_workspace(pattern: str, glob: str = None, max_hits: int = 50, context: int = 1) -> str:
+    """Searches the contents of all files in the workspace for a regular expression
+    (plain text works too) and returns matching lines with line numbers and
+    `context` lines around them. Narrow it with a glob such as '*.py' or 'repo/src/*'.
+    Much faster than exploring and reading files one by one; honours .gitignore.
+    """
+    try:
+        regex, literals = _compile(pattern)
+        index = _get_search_index()
+        index.refresh()
+
+        blocks = []
+        hits = 0
+        files_matched = 0
+        for path in index.candidates(literals):
+            if glob and not _matches_glob(path, glob):
+                continue
+            try:
+                with open(os.path.join(index.root, path), "r", encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+            except OSError:
+                continue
+            if not regex.search(text):
+                continue
+
+            lines = text.splitlines()
+            shown = set()
+            block = [path]
+            for number, line in enumerate(lines):
+                if hits >= max_hits:
+                    break
+                if not regex.search(line):
+                    continue
+                hits += 1
+                for n in range(max(0, number - context), min(len(lines), number + context + 1)):
+                    if n in shown:
+                        continue
+                    if shown and n - 1 not in shown:
+                        block.append("  --")
+                    shown.add(n)
+                    marker = ":" if n == number or regex.search(lines[n]) else "-"
+                    block.append(f"  {n + 1}{marker} {lines[n][:MAX_LINE_CHARS]}")
+            if len(block) > 1:
+                files_matched += 1
+                blocks.append("\n".join(block))
+            if hits >= max_hits:
+                blocks.append(f"... stopped at {max_hits} matches; narrow the pattern or glob to see more.")
+                break
+
+        if not blocks:
+            return f"No matches for '{pattern}'" + (f" in files matching '{glob}'." if glob else ".")
+        return f"{hits} matches in {files_matched} files:\n" + "\n".join(blocks)
+    except Exception as e:
+        return f"Error searching workspace: {str(e)}"
+
+
+async def _asearch_workspace(pattern: str, glob: str = None, max_hits: int = 50, context: int = 1) -> str:
+    return await asyncio.to_thread(search_workspace.func, pattern, glob, max_hits, context)
+
+
+search_workspace.coroutine = _asearch_workspace
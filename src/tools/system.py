@@ -1,43 +1,272 @@
+import asyncio
+import codecs
+import itertools
+import os
+import signal
 import subprocess
+import threading
+import time
+from collections import deque
 from langchain_core.tools import tool
-from src.config import settings
-import os
+from src.config import settings, workspace_root
+from src.core.trigram_index import mark_stale
 
+MAX_FINISHED_JOBS = 20  # finished jobs (and their logs) kept for poll_job/tail_job
 
-@tool
-def execute_command(command: str, timeout: int = 30) -> str:
-    """Executes a shell command securely and returns the output (stdout and stderr).
-    The command is executed in the workspace directory.
+_jobs = {}
+_jobs_lock = threading.Lock()
+_job_ids = itertools.count(1)
+
+
+class OutputBuffer:
+    """Keeps the first `head_chars` and last `tail_chars` of a stream.
+    Everything in between is only counted; the full stream goes to the log file.
     """
-    try:
-        # Resolve the workspace root to an absolute path
-        workspace_root = os.path.abspath(settings.workspace_root)
 
-        # Ensure the workspace directory exists
-        if not os.path.exists(workspace_root):
-            os.makedirs(workspace_root)
+    def __init__(self, head_chars: int, tail_chars: int):
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self.head = ""
+        self.tail = deque()
+        self.tail_len = 0
+        self.total_chars = 0
+        self.lines = 0
+        self._lock = threading.Lock()
 
-        # Execute the command
-        result = subprocess.run(
+    def write(self, text: str):
+        with self._lock:
+            self.total_chars += len(text)
+            self.lines += text.count("\n")
+            room = self.head_chars - len(self.head)
+            if room > 0:
+                self.head += text[:room]
+                text = text[room:]
+            if not text:
+                return
+            self.tail.append(text)
+            self.tail_len += len(text)
+            while self.tail and self.tail_len - len(self.tail[0]) >= self.tail_chars:
+                self.tail_len -= len(self.tail.popleft())
+
+    def render(self, log_hint: str = "") -> str:
+        with self._lock:
+            tail = "".join(self.tail)[-self.tail_chars:] if self.tail_chars else ""
+            omitted = self.total_chars - len(self.head) - len(tail)
+            if omitted <= 0:
+                return self.head + tail
+            return (
+                f"{self.head}\n... [{omitted} characters omitted{log_hint}] ...\n{tail}"
+            )
+
+
+class Job:
+    """A shell command running in the workspace, streamed into an
+    `OutputBuffer` and spilled in full to a log file."""
+
+    def __init__(self, command: str):
+        self.id = f"job-{next(_job_ids)}"
+        self.command = command
+        self.started_at = time.time()
+        self.finished_at = None
+        self.workspace = os.path.abspath(workspace_root())
+        log_dir = os.path.join(self.workspace, ".logs", "commands")
+        os.makedirs(log_dir, exist_ok=True)
+        self.log_path = os.path.join(log_dir, f"{self.id}-{int(self.started_at)}.log")
+        self.log_name = os.path.relpath(self.log_path, self.workspace)
+        # Errors and summaries tend to be at the end, so the tail gets most of the budget
+        head = settings.command_output_chars // 4
+        self.output = OutputBuffer(head, settings.command_output_chars - head)
+        self.process = subprocess.Popen(
             command,
             shell=True,
-            cwd=workspace_root,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
+            cwd=self.workspace,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            # Own process group, so a kill also reaches the command's children
+            start_new_session=os.name != "nt",
         )
+        self._reader = threading.Thread(target=self._pump, daemon=True)
+        self._reader.start()
+
+    def _pump(self):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        fd = self.process.stdout.fileno()
+        with open(self.log_path, "wb") as log:
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                log.write(chunk)
+                log.flush()
+                self.output.write(decoder.decode(chunk))
+            self.output.write(decoder.decode(b"", final=True))
+        self.process.stdout.close()
+        self.process.wait()
+        mark_stale()  # the command may have changed any file in the workspace
+        self.finished_at = time.time()
+
+    @property
+    def running(self) -> bool:
+        return self.finished_at is None
+
+    def wait(self, timeout: float) -> bool:
+        self._reader.join(timeout)
+        return not self.running
+
+    def kill(self):
+        if not self.running:
+            return
+        try:
+            if os.name == "nt":
+                self.process.kill()
+            else:
+                os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self._reader.join(5)
+
+    def status(self) -> str:
+        end = self.finished_at or time.time()
+        state = "running" if self.running else f"exited with code {self.process.returncode}"
+        return (
+            f"{self.id} [{state}] after {end - self.started_at:.1f}s: {self.command}\n"
+            f"Output{' so far' if self.running else ''}: {self.output.lines} lines, {self.output.total_chars} characters "
+            f"(full log: {self.log_name})"
+        )
+
+    def result(self) -> str:
+        text = self.output.render(f"; full log: {self.log_name}").strip()
+        return f"Exit code: {self.process.returncode}\n{text}" if text else (
+            f"Exit code: {self.process.returncode} (no output)"
+        )
+
+
+def _prune_logs(log_dir: str, running: set):
+    """Deletes all but the newest `MAX_FINISHED_JOBS` logs of finished
+    commands, including those left behind by earlier runs."""
+    logs = []
+    for entry in os.scandir(log_dir):
+        if entry.name.endswith(".log") and entry.path not in running:
+            try:
+                logs.append((entry.stat().st_mtime_ns, entry.path))
+            except OSError:
+                continue
+    for _, path in sorted(logs)[:-MAX_FINISHED_JOBS]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _start_job(command: str) -> Job:
+    job = Job(command)
+    with _jobs_lock:
+        _jobs[job.id] = job
+        finished = [j for j in _jobs.values() if not j.running]
+        for old in finished[:-MAX_FINISHED_JOBS]:
+            del _jobs[old.id]
+        running = {j.log_path for j in _jobs.values() if j.running}
+    _prune_logs(os.path.dirname(job.log_path), running | {job.log_path})
+    return job
+
+
+def _visible_jobs() -> list:
+    """Jobs started from the current workspace; sessions never see each other's."""
+    workspace = os.path.abspath(workspace_root())
+    with _jobs_lock:
+        return [job for job in _jobs.values() if job.workspace == workspace]
 
-        output = []
-        if result.stdout:
-            output.append(f"STDOUT:\n{result.stdout}")
-        if result.stderr:
-            output.append(f"STDERR:\n{result.stderr}")
 
-        if not output:
-            return "Command executed successfully with no output."
+def _get_job(job_id: str) -> Job:
+    with _jobs_lock:
+        job = _jobs.get(job_id.strip())
+    return job if job and job.workspace == os.path.abspath(workspace_root()) else None
 
-        return "\n".join(output)
-    except subprocess.TimeoutExpired:
-        return f"Error: Command timed out after {timeout} seconds."
+
+def _read_tail(path: str, lines: int, block: int = 65536) -> str:
+    """Returns the last `lines` lines of a file without reading all of it."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = pos = f.tell()
+        data = b""
+        while pos > 0 and data.count(b"\n") <= lines:
+            pos = max(0, pos - block)
+            f.seek(pos)
+            data = f.read(end - pos)
+    return b"\n".join(data.splitlines()[-lines:]).decode("utf-8", errors="replace")
+
+
+@tool
+def execute_command(command: str, timeout: int = 30, background: bool = False) -> str:
+    """Executes a shell command securely and returns its exit code and output
+    (stdout and stderr combined). The command is executed in the workspace directory.
+    Long output is trimmed to its beginning and end; the full log is kept in the workspace.
+    Set background=True for long builds or test runs: it returns a job id at once,
+    to be checked with poll_job, tail_job and kill_job.
+    """
+    try:
+        # Ensure the workspace directory exists
+        os.makedirs(os.path.abspath(workspace_root()), exist_ok=True)
+
+        job = _start_job(command)
+        if background:
+            return f"Started {job.id} in the background. Check it with poll_job('{job.id}')."
+
+        if not job.wait(timeout):
+            job.kill()
+            return f"Error: Command timed out after {timeout} seconds.\n{job.result()}"
+        return job.result()
     except Exception as e:
         return f"Error executing command: {str(e)}"
+
+
+async def _aexecute_command(command: str, timeout: int = 30, background: bool = False) -> str:
+    return await asyncio.to_thread(execute_command.func, command, timeout, background)
+
+
+execute_command.coroutine = _aexecute_command
+
+
+@tool
+def poll_job(job_id: str = "") -> str:
+    """Reports the status of a background job started by execute_command.
+    Once it has finished, returns its exit code and (trimmed) output.
+    Without a job id, lists all known jobs."""
+    if not job_id:
+        jobs = _visible_jobs()
+        if not jobs:
+            return "No jobs have been started."
+        return "\n".join(job.status().splitlines()[0] for job in jobs)
+
+    job = _get_job(job_id)
+    if job is None:
+        return f"Error: Unknown job '{job_id}'."
+    if job.running:
+        return job.status()
+    return f"{job.status()}\n{job.result()}"
+
+
+@tool
+def tail_job(job_id: str, lines: int = 50) -> str:
+    """Returns the last lines of a job's output log (running or finished)."""
+    job = _get_job(job_id)
+    if job is None:
+        return f"Error: Unknown job '{job_id}'."
+    try:
+        text = _read_tail(job.log_path, max(1, lines))
+    except OSError as e:
+        return f"Error reading log for {job_id}: {str(e)}"
+    return f"{job.status()}\n{text}" if text else f"{job.status()}\n(no output yet)"
+
+
+@tool
+def kill_job(job_id: str) -> str:
+    """Stops a running background job and its child processes."""
+    job = _get_job(job_id)
+    if job is None:
+        return f"Error: Unknown job '{job_id}'."
+    if not job.running:
+        return f"{job.id} already finished with code {job.process.returncode}."
+    job.kill()
+    return f"Killed {job.id}.\n{job.result()}"
@@ -1,56 +1,150 @@
+import asyncio
+import os
+import threading
+import time
 from langchain_core.tools import tool
-from duckduckgo_search import DDGS
-import httpx
-from bs4 import BeautifulSoup
 from typing import Optional
+from src.config import settings
+from src.core.cache import DiskCache
+from src.core.telemetry import register_gauge
+
+
+_search_cache = None
+_stats_lock = threading.Lock()
+SEARCH_CACHE_STATS = {"hits": 0, "misses": 0, "saved_seconds": 0.0}
+
+
+def _get_search_cache() -> DiskCache:
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = DiskCache(
+            os.path.join(settings.workspace_root, ".cache", "search"),
+            max_bytes=settings.search_cache_max_mb * 1024 * 1024,
+            ttl=settings.search_cache_ttl,
+        )
+    return _search_cache
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _search_results(query: str, max_results: int) -> list:
+    """Returns DuckDuckGo results, served from the search cache when possible.
+    A cached result set fetched with a larger `max_results` also answers
+    smaller requests for the same normalized query."""
+    cache = _get_search_cache()
+    key = _normalize_query(query)
+    entry, fresh = cache.get(key)
+
+    # DDG may return fewer results than asked for; what matters is what we asked.
+    if entry is not None and fresh and entry["max_results"] >= max_results:
+        with _stats_lock:
+            SEARCH_CACHE_STATS["hits"] += 1
+            SEARCH_CACHE_STATS["saved_seconds"] += entry["latency"]
+        return entry["results"][:max_results]
+
+    from duckduckgo_search import DDGS
+
+    # Refetch a stale entry at its own size so a smaller request does not
+    # replace it with fewer results.
+    fetch = max(max_results, entry["max_results"]) if entry is not None else max_results
+    start = time.perf_counter()
+    with DDGS() as ddgs:
+        results = list(ddgs.text(query, max_results=fetch))
+    latency = time.perf_counter() - start
+
+    with _stats_lock:
+        SEARCH_CACHE_STATS["misses"] += 1
+    if results:
+        cache.set(
+            key,
+            {"max_results": fetch, "results": results, "latency": latency},
+        )
+    return results[:max_results]
+
+
+def get_search_cache_stats() -> dict:
+    """Hit/miss counters for the search cache since process start."""
+    with _stats_lock:
+        stats = dict(SEARCH_CACHE_STATS)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+
+register_gauge("search_cache_hits", lambda: get_search_cache_stats()["hits"])
+register_gauge("search_cache_misses", lambda: get_search_cache_stats()["misses"])
+register_gauge("search_cache_hit_rate", lambda: round(get_search_cache_stats()["hit_rate"], 3))
+register_gauge("search_cache_saved_s", lambda: round(get_search_cache_stats()["saved_seconds"], 3))
 
 
 @tool
 def search_web(query: str, max_results: int = 5) -> str:
     """Searches the web for the given query using DuckDuckGo."""
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
-            if not results:
-                return f"No results found for '{query}'."
-
-            output = [f"Search results for '{query}':"]
-            for i, res in enumerate(results, 1):
-                output.append(
-                    f"{i}. {res['title']}\n   URL: {res['href']}\n   Snippet: {res['body']}"
-                )
-
-            return "\n\n".join(output)
+        results = _search_results(query, max_results)
+        if not results:
+            return f"No results found for '{query}'."
+
+        output = [f"Search results for '{query}':"]
+        for i, res in enumerate(results, 1):
+            output.append(
+                f"{i}. {res['title']}\n   URL: {res['href']}\n   Snippet: {res['body']}"
+            )
+
+        return "\n\n".join(output)
     except Exception as e:
         return f"Error searching the web: {str(e)}"
 
 
+async def _asearch_web(query: str, max_results: int = 5) -> str:
+    # DDGS is a blocking client; run it off the event loop.
+    return await asyncio.to_thread(search_web.func, query, max_results)
+
+
+search_web.coroutine = _asearch_web
+
+
+def _extract_text(html: str) -> str:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Remove script and style elements
+    for script_or_style in soup(["script", "style"]):
+        script_or_style.decompose()
+
+    # Get text and clean it up
+    text = soup.get_text(separator="\n")
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = "\n".join(chunk for chunk in chunks if chunk)
+
+    # Limit text length to avoid token issues (arbitrary limit)
+    return text[:10000]
+
+
 @tool
 def scrape_website(url: str) -> str:
     """Scrapes the text content from a given URL."""
+    from src.core.http import fetch_text
+
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        with httpx.Client(
-            headers=headers, follow_redirects=True, timeout=10.0
-        ) as client:
-            response = client.get(url)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Remove script and style elements
-            for script_or_style in soup(["script", "style"]):
-                script_or_style.decompose()
-
-            # Get text and clean it up
-            text = soup.get_text(separator="\n")
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = "\n".join(chunk for chunk in chunks if chunk)
-
-            # Limit text length to avoid token issues (arbitrary limit)
-            return text[:10000]
+        return _extract_text(fetch_text(url))
     except Exception as e:
         return f"Error scraping the website: {str(e)}"
+
+
+async def _ascrape_website(url: str) -> str:
+    from src.core.http import afetch_text
+
+    try:
+        html = await afetch_text(url)
+        # Parsing is CPU-bound; keep it off the loop for large pages.
+        return await asyncio.to_thread(_extract_text, html)
+    except Exception as e:
+        return f"Error scraping the website: {str(e)}"
+
+
+scrape_website.coroutine = _ascrape_website
@@ -0,0 +1,66 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+import re
+from langchain_core.messages import AIMessage, ToolMessage
+from src.agent import graph
+from src.config import settings
+from src.core.artifacts import ArtifactStore
+from src.core.cache import DiskCache
+from src.tools.artifacts import read_artifact
+
+
+class ReadThenAnswer:
+    """Stub model: reads big.txt once, then answers."""
+
+    def invoke(self, messages, **kwargs):
+        if any(isinstance(m, ToolMessage) for m in messages):
+            return AIMessage(content="done")
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": "read_file", "args": {"filename": "big.txt"}, "id": "r1"}],
+        )
+
+
+def test_large_tool_output_becomes_an_artifact(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    text = "".join(f"line {i}: " + "x" * 60 + "\n" for i in range(200))  # ~14k characters
+    (tmp_path / "big.txt").write_text(text)
+    monkeypatch.setattr(graph, "llm_with_tools", ReadThenAnswer())
+
+    result = graph.app.invoke({"messages": [("user", "read big.txt")], "step_count": 0})
+
+    tool_message = next(m for m in result["messages"] if isinstance(m, ToolMessage))
+    assert len(tool_message.content) < settings.artifact_preview_chars + 300
+    handle = re.search(r"art-[0-9a-f]{16}", tool_message.content).group(0)
+
+    page = read_artifact.invoke({"handle": handle, "offset": 0, "limit": 100000})
+    assert text in page
+    page = read_artifact.invoke({"handle": handle, "offset": 5000, "limit": 100})
+    assert page.splitlines()[0] == f"[{handle}: characters 5000-5100 of {len(text)}; next offset=5100]"
+    assert read_artifact.invoke({"handle": "art-0000000000000000"}).startswith("Error")
+
+
+def test_stores_evict_least_recently_used_files(tmp_path):
+    artifacts = ArtifactStore(str(tmp_path / "artifacts"), max_bytes=2500)
+    handles = [artifacts.put(f"{i}" * 1000) for i in range(2)]
+    os.utime(artifacts._path(handles[0][4:]), (1, 1))  # least recently used
+    assert artifacts.get(handles[0]) is not None  # a read makes it recent again
+    os.utime(artifacts._path(handles[1][4:]), (1, 1))
+    artifacts.put("2" * 1000)
+    assert artifacts.get(handles[0]) is not None
+    assert artifacts.get(handles[1]) is None
+
+    cache = DiskCache(str(tmp_path / "http"), max_bytes=2500, ttl=60)
+    for key in ("a", "b"):
+        cache.set(key, key * 1000)
+    os.utime(cache._path("a"), (1, 1))
+    reopened = DiskCache(str(tmp_path / "http"), max_bytes=2500, ttl=60)  # seeds its total from disk
+    reopened.set("c", "c" * 1000)
+    assert reopened.get("a") == (None, False)
+    assert reopened.get("b") == ("b" * 1000, True)
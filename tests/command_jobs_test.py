@@ -0,0 +1,27 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+
+from src.config import settings
+from src.tools import system
+from src.tools.system import execute_command, poll_job, tail_job
+
+
+def test_command_logs_are_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    monkeypatch.setattr(system, "MAX_FINISHED_JOBS", 3)
+    log_dir = tmp_path / ".logs" / "commands"
+    log_dir.mkdir(parents=True)
+    (log_dir / "job-1-1000.log").write_text("from an earlier run\n")
+
+    for i in range(6):
+        assert execute_command.invoke({"command": f"echo run {i}"}) == f"Exit code: 0\nrun {i}"
+
+    # The new job's own log is written while the oldest ones are pruned
+    assert len(os.listdir(log_dir)) <= 4
+    assert not (log_dir / "job-1-1000.log").exists()
+    job_id = poll_job.invoke({}).splitlines()[-1].split()[0]
+    assert "run 5" in tail_job.invoke({"job_id": job_id})
@@ -0,0 +1,73 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph.message import add_messages
+from src.agent.compaction import (
+    COMPACTED_MARKER,
+    SUMMARY_MARKER,
+    compact_node,
+    estimate_tokens,
+)
+from src.config import settings
+
+
+def _history(turns: int, output_chars: int = 4000) -> list:
+    """`turns` user requests, each answered after one read_file call."""
+    messages = []
+    for n in range(turns):
+        messages += [
+            HumanMessage(content=f"question {n}", id=f"h{n}"),
+            AIMessage(
+                content="",
+                tool_calls=[{"name": "read_file", "args": {"filename": f"{n}.txt"}, "id": f"c{n}"}],
+                id=f"a{n}",
+            ),
+            ToolMessage(content="x" * output_chars, tool_call_id=f"c{n}", id=f"t{n}"),
+            AIMessage(content=f"answer {n}", id=f"r{n}"),
+        ]
+    return messages
+
+
+def test_under_budget_history_is_left_alone(monkeypatch):
+    monkeypatch.setattr(settings, "context_token_budget", 100_000)
+    assert compact_node({"messages": _history(3)}) is None
+
+
+def test_old_tool_outputs_become_stubs(monkeypatch):
+    history = _history(3)
+    monkeypatch.setattr(settings, "context_keep_recent", 2)
+    # Room for the stubs, but not for three full tool outputs.
+    monkeypatch.setattr(settings, "context_token_budget", estimate_tokens(history) - 1000)
+
+    compacted = add_messages(history, compact_node({"messages": history})["messages"])
+
+    assert [m.id for m in compacted] == [m.id for m in history]
+    by_id = {m.id: m for m in compacted}
+    assert by_id["t0"].content.startswith(COMPACTED_MARKER)
+    assert by_id["t1"].content.startswith(COMPACTED_MARKER)
+    # The last two model steps and the current request stay verbatim.
+    assert by_id["t2"].content == "x" * 4000
+    assert by_id["h2"].content == "question 2"
+    assert by_id["a0"].tool_calls[0]["id"] == "c0"
+    assert estimate_tokens(compacted) <= settings.context_token_budget
+
+
+def test_earlier_turns_fold_into_a_summary(monkeypatch):
+    history = _history(3)
+    monkeypatch.setattr(settings, "context_keep_recent", 2)
+    monkeypatch.setattr(settings, "context_token_budget", 1200)
+
+    compacted = add_messages(history, compact_node({"messages": history})["messages"])
+
+    assert compacted[0].content.startswith(SUMMARY_MARKER)
+    assert "User: question 0" in compacted[0].content
+    assert "Tools: read_file" in compacted[0].content
+    assert "Agent: answer 1" in compacted[0].content
+    # Everything from the current request on is kept.
+    assert [m.id for m in compacted[1:]] == ["h2", "a2", "t2", "r2"]
@@ -0,0 +1,90 @@
+import sys
+import os
+import sqlite3
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from langchain_core.messages import AIMessage
+from src.agent import graph
+from src.config import settings
+from src.tools.memory import FactStore, retrieve_fact, search_facts, store_fact
+
+
+def test_search_ranks_by_key_and_value_and_sees_other_writers(tmp_path):
+    path = str(tmp_path / "facts.db")
+    store = FactStore(path)
+    store.put_many(
+        [
+            ("favorite_drink", "green tea, no sugar"),
+            ("editor", "neovim with the gruvbox theme"),
+            ("standup_time", "10:15 every weekday"),
+        ]
+    )
+    assert store.search("what tea do I drink", 1) == [("favorite_drink", "green tea, no sugar")]
+    assert store.search("nothing relevant", 3) == []
+
+    store.put("editor", "vscode")  # own writes update the index in place
+    assert store.search("neovim", 3) == []
+
+    other = FactStore(path)  # e.g. another session sharing the workspace
+    other.put("gym", "tuesday and thursday evenings")
+    assert store.search("when is the gym", 1) == [("gym", "tuesday and thursday evenings")]
+    other.close()
+    store.close()
+
+
+def test_index_sees_writes_that_interleave_with_its_own(tmp_path):
+    path = str(tmp_path / "facts.db")
+    store, other = FactStore(path), FactStore(path)
+    store.put("editor", "neovim")
+    assert store.search("neovim", 1) == [("editor", "neovim")]  # builds the index
+
+    other.put("gym", "tuesday evenings")  # committed before, but not yet seen by, ...
+    store.put("drink", "green tea")  # ... this store's own write
+    assert store.search("gym", 1) == [("gym", "tuesday evenings")]
+    assert store.search("tea", 1) == [("drink", "green tea")]
+    other.close()
+    store.close()
+
+
+def test_upgrades_a_table_without_seq(tmp_path):
+    path = str(tmp_path / "facts.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE facts (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)")
+    conn.execute("CREATE INDEX facts_updated_at ON facts (updated_at)")
+    conn.execute("INSERT INTO facts VALUES ('home_city', 'Lisbon', 1.0)")
+    conn.commit()
+    conn.close()
+
+    store = FactStore(path)
+    assert store.search("city", 1) == [("home_city", "Lisbon")]
+    FactStore(path).put("editor", "neovim")
+    assert store.search("neovim", 1) == [("editor", "neovim")]
+    store.close()
+
+
+def test_tools_and_recall_hook(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    store_fact.invoke({"key": "favorite_drink", "value": "green tea"})
+    store_fact.invoke({"key": "home_city", "value": "Lisbon"})
+
+    assert "favorite_drink: green tea" in search_facts.invoke({"query": "drink"})
+    assert "Similar facts" in retrieve_fact.invoke({"key": "drink"})
+
+    requests = []
+
+    class RecordingLLM:
+        def invoke(self, messages, **kwargs):
+            requests.append(messages)
+            return AIMessage(content="tea")
+
+    monkeypatch.setattr(graph, "llm_with_tools", RecordingLLM())
+    monkeypatch.setattr(settings, "memory_recall_k", 1)
+    graph.app.invoke({"messages": [("user", "make me my usual drink")], "step_count": 0})
+
+    context = requests[0][-1].content
+    assert "- favorite_drink: green tea" in context
+    assert "Lisbon" not in context
@@ -0,0 +1,44 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from benchmarks.fake_llm import ScriptedChatModel
+from src.agent import graph
+from src.config import settings
+
+
+def test_each_turn_replays_the_script():
+    model = ScriptedChatModel(steps=[[("list_files", {})], [("read_file", {"filename": "a.txt"})]], answer="ok")
+    history = [HumanMessage(content="first")]
+
+    first = model.invoke(history)
+    assert [c["name"] for c in first.tool_calls] == ["list_files"]
+    history += [first, ToolMessage(content="a.txt", tool_call_id=first.tool_calls[0]["id"])]
+    second = model.invoke(history)
+    assert [c["name"] for c in second.tool_calls] == ["read_file"]
+    history += [second, ToolMessage(content="hello", tool_call_id=second.tool_calls[0]["id"])]
+    assert model.invoke(history).content == "ok"
+
+    # A new user turn starts the script over.
+    history += [AIMessage(content="ok"), HumanMessage(content="again")]
+    assert [c["name"] for c in model.invoke(history).tool_calls] == ["list_files"]
+    assert model.calls == 4
+    assert model.invoke(history).usage_metadata["output_tokens"] == 10
+
+
+def test_the_graph_runs_a_scripted_turn_offline(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    script = [[("write_file", {"filename": "note.md", "content": "hi"})], [("read_file", {"filename": "note.md"})]]
+    model = ScriptedChatModel(steps=script, answer="Saved note.md.")
+    monkeypatch.setattr(graph, "llm_with_tools", model)
+
+    result = graph.app.invoke({"messages": [("user", "write a note")], "step_count": 0})
+
+    assert result["messages"][-1].content == "Saved note.md."
+    assert (tmp_path / "note.md").read_text() == "hi"
+    assert model.calls == 3
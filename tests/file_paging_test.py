@@ -0,0 +1,72 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from src.config import settings
+from src.tools import filesystem
+from src.tools.filesystem import read_file
+
+
+def read(**args):
+    return read_file.invoke({"filename": "big.log", **args})
+
+
+def test_line_pages_match_the_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    monkeypatch.setattr(filesystem, "INDEX_EVERY", 16)
+    lines = [f"line {i}" + "x" * (i % 7) for i in range(1, 1001)]
+    (tmp_path / "big.log").write_text("\n".join(lines), encoding="utf-8")  # no trailing newline
+
+    page = read(start_line=500, num_lines=3)
+    header, text = page.split("\n", 1)
+    assert header == "[big.log: lines 500-502 of 1000; next page: start_line=503]"
+    assert text.splitlines() == lines[499:502]
+    for start in (1, 16, 17, 33, 999):
+        assert read(start_line=start, num_lines=1).split("\n", 1)[1].rstrip("\n") == lines[start - 1]
+    assert read(start_line=1000, num_lines=5).startswith("[big.log: lines 1000-1000 of 1000]")
+    assert "past the end" in read(start_line=1001)
+    assert read(stats=True).startswith("big.log:") and "1000 lines" in read(stats=True)
+
+    # The index is rebuilt once the file changes
+    (tmp_path / "big.log").write_text("first\nsecond\n", encoding="utf-8")
+    assert read(start_line=2, num_lines=1) == "[big.log: lines 2-2 of 2]\nsecond\n"
+
+
+def test_byte_pages_stay_within_the_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    monkeypatch.setattr(settings, "read_file_max_bytes", 100)
+    (tmp_path / "big.log").write_text("0123456789" * 50, encoding="utf-8")
+
+    assert read(byte_offset=10, num_bytes=5) == "[big.log: bytes 10-15 of 500; next page: byte_offset=15]\n01234"
+    assert read(byte_offset=0, num_bytes=10_000).startswith("[big.log: bytes 0-100 of 500;")
+    for num_bytes in (-1, -10_000):
+        page = read(byte_offset=0, num_bytes=num_bytes)
+        assert page.startswith("[big.log: bytes 0-1 of 500;")
+        assert len(page.split("\n", 1)[1]) == 1
+    assert read(byte_offset=495).endswith("56789")
+    assert "past the end" in read(byte_offset=500)
+
+    summary = read()  # larger than the cap: preview instead of the whole file
+    assert "is large" in summary and len(summary) < 500
+
+
+def test_a_huge_single_line_is_cut_at_the_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    monkeypatch.setattr(settings, "read_file_max_bytes", 1000)
+    (tmp_path / "big.log").write_text("é" + "x" * 200_000 + "\nend\n", encoding="utf-8")
+
+    page = read(start_line=1)
+    header, text = page.split("\n", 1)
+    assert header == "[big.log: line 1 of 2 is longer than a page; bytes 0-1000 shown; next page: byte_offset=1000]"
+    assert text == "é" + "x" * 998
+    assert read(byte_offset=1000, num_bytes=3).endswith("\nxxx")
+    assert read(start_line=2) == "[big.log: lines 2-2 of 2]\nend\n"
+
+    (tmp_path / "big.log").write_text("a" + "é" * 100_000, encoding="utf-8")
+    page = read(start_line=1).split("\n", 1)[1]
+    assert page == "a" + "é" * 499  # cut before a split character
+    assert len(read()) < 1000  # the summary's preview is capped too
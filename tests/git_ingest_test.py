@@ -0,0 +1,98 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+
+import pytest
+from git import Repo
+from src.config import settings
+from src.tools.filesystem import write_file
+from src.tools.github import _mirror_path, get_file_diffs, get_repo_history, ingest_external_source
+from src.tools.system import execute_command
+
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    """A local repository with 6 commits, served over file://."""
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path / "workspace"))
+    repo = Repo.init(tmp_path / "upstream")
+    repo.config_writer().set_value("uploadpack", "allowFilter", "true").release()
+    for i in range(6):
+        for folder in ("docs", "src"):
+            path = tmp_path / "upstream" / folder / "file.txt"
+            path.parent.mkdir(exist_ok=True)
+            path.write_text(f"{folder} revision {i}\n")
+        repo.index.add(["docs/file.txt", "src/file.txt"])
+        repo.index.commit(f"commit {i}")
+    repo.create_head("feature")
+    repo.git.update_ref("refs/pull/1/head", "HEAD~1")  # not worth mirroring
+    return (tmp_path / "upstream").as_uri()
+
+
+def commit_count(path):
+    return len(list(Repo(path).iter_commits()))
+
+
+def test_shallow_sparse_clone_from_mirror(upstream):
+    result = ingest_external_source.invoke(
+        {"source_url_or_path": upstream, "target_folder": "repo", "sparse_paths": ["docs"], "use_cache": True}
+    )
+    assert result.startswith("Successfully cloned"), result
+
+    target = os.path.join(settings.workspace_root, "repo")
+    assert commit_count(target) == 1
+    assert os.path.exists(os.path.join(target, "docs", "file.txt"))
+    assert not os.path.exists(os.path.join(target, "src"))
+    default_branch = Repo(upstream[len("file://"):]).active_branch.path
+    mirror = Repo(_mirror_path(upstream))
+    assert {ref.path for ref in mirror.refs} == {"refs/heads/feature", default_branch}
+    assert mirror.head.reference.path == default_branch
+    # Missing objects come from the real remote, not the cache
+    assert Repo(target).remotes.origin.url == upstream
+
+
+def test_history_deepens_shallow_clone_on_demand(upstream):
+    ingest_external_source.invoke({"source_url_or_path": upstream, "target_folder": "repo"})
+    target = os.path.join(settings.workspace_root, "repo")
+    assert commit_count(target) == 1
+    assert not _mirror_path(upstream).exists()  # shallow clones skip the mirror by default
+
+    history = get_repo_history.invoke({"directory": "repo", "count": 4})
+    assert "commit 5" in history and "commit 2" in history
+    assert commit_count(target) == 4
+
+
+def test_reingest_reuses_mirror_and_sees_new_commits(upstream, tmp_path):
+    ingest_external_source.invoke({"source_url_or_path": upstream, "target_folder": "one", "depth": 0})
+    assert (_mirror_path(upstream) / "HEAD").exists()
+    upstream_repo = Repo(tmp_path / "upstream")
+    (tmp_path / "upstream" / "new.txt").write_text("new\n")
+    upstream_repo.index.add(["new.txt"])
+    upstream_repo.index.commit("commit 6")
+
+    result = ingest_external_source.invoke(
+        {"source_url_or_path": upstream, "target_folder": "two", "partial": "treeless", "depth": 0}
+    )
+    assert result.startswith("Successfully cloned"), result
+    target = os.path.join(settings.workspace_root, "two")
+    assert commit_count(target) == 7
+    assert os.path.exists(os.path.join(target, "new.txt"))
+
+
+def test_worktree_diff_sees_the_agents_own_edits(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    repo = Repo.init(tmp_path)
+    (tmp_path / "notes.md").write_text("one\n")
+    repo.index.add(["notes.md"])
+    repo.index.commit("notes")
+
+    write_file.invoke({"filename": "notes.md", "content": "two\n"})
+    assert "+two" in get_file_diffs.invoke({})
+    write_file.invoke({"filename": "notes.md", "content": "three\n"})
+    diff = get_file_diffs.invoke({"path": "notes.md"})
+    assert "+three" in diff and "+two" not in diff
+
+    execute_command.invoke({"command": "echo four > notes.md"})
+    assert "+four" in get_file_diffs.invoke({})
@@ -0,0 +1,63 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+import httpx
+from src.config import settings
+from src.core import http
+from src.core.http import fetch_text, normalize_url
+
+
+def _serve(monkeypatch, tmp_path, respond):
+    """Routes the shared client to `respond(request)` and returns the list of
+    requests it received."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return respond(request)
+
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    monkeypatch.setattr(http, "_cache", None)
+    monkeypatch.setattr(http, "_client", httpx.Client(transport=httpx.MockTransport(handler)))
+    return requests
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Example.com:443/a?b=2&a=1#top") == "https://example.com/a?a=1&b=2"
+    assert normalize_url("http://example.com:8080") == "http://example.com:8080/"
+
+
+def test_fresh_pages_are_served_from_disk(tmp_path, monkeypatch):
+    requests = _serve(monkeypatch, tmp_path, lambda r: httpx.Response(200, text="page"))
+
+    assert fetch_text("https://example.com/a?y=1&x=2") == "page"
+    assert fetch_text("https://EXAMPLE.com/a?x=2&y=1#section") == "page"
+    assert len(requests) == 1
+
+
+def test_stale_pages_are_revalidated(tmp_path, monkeypatch):
+    def respond(request):
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text="page", headers={"etag": '"v1"', "cache-control": "no-cache"})
+
+    requests = _serve(monkeypatch, tmp_path, respond)
+
+    assert fetch_text("https://example.com/") == "page"
+    assert fetch_text("https://example.com/") == "page"
+    assert [r.headers.get("if-none-match") for r in requests] == [None, '"v1"']
+
+
+def test_no_store_pages_are_not_cached(tmp_path, monkeypatch):
+    requests = _serve(
+        monkeypatch, tmp_path, lambda r: httpx.Response(200, text="secret", headers={"cache-control": "no-store"})
+    )
+
+    fetch_text("https://example.com/")
+    fetch_text("https://example.com/")
+    assert len(requests) == 2
@@ -27,6 +27,8 @@ async def test_agent_graph():
     found_success = False
     async for event in app.astream(initial_state):
         for key, value in event.items():
+            if not value:
+                continue
             print(f"Node: {key}")
             last_msg = value["messages"][-1]
             if hasattr(last_msg, "content") and "INTEGRATION_TEST_PASSED" in str(
@@ -61,6 +63,8 @@ async def test_agent_graph():
     search_called = False
     async for event in app.astream(initial_state):
         for key, value in event.items():
+            if not value:
+                continue
             last_msg = value["messages"][-1]
             if hasattr(last_msg, "tool_calls") and last_msg.tool_calls:
                 for tc in last_msg.tool_calls:
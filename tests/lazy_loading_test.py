@@ -0,0 +1,35 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from langchain_core.messages import AIMessage
+from benchmarks.startup import deferred_imports_loaded
+from src.agent import graph
+
+
+def test_importing_the_graph_defers_heavy_libraries():
+    assert deferred_imports_loaded(dict(os.environ)) == []
+
+
+class Stub:
+    def invoke(self, messages, **kwargs):
+        return AIMessage(content="done")
+
+
+def test_a_swapped_model_is_used_without_building_the_client(monkeypatch):
+    def no_client(*args, **kwargs):
+        raise AssertionError("get_llm() must not run when llm_with_tools is swapped")
+
+    monkeypatch.setattr(graph, "get_llm", no_client)
+    monkeypatch.setattr(graph, "llm", None)
+    monkeypatch.setattr(graph, "llm_with_tools", Stub())
+    monkeypatch.setattr(graph, "fast_llm_with_tools", Stub())
+
+    result = graph.app.invoke({"messages": [("user", "hi")], "step_count": 0})
+
+    assert result["messages"][-1].content == "done"
+    assert graph.llm is None
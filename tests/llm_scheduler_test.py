@@ -0,0 +1,106 @@
+import sys
+import os
+import asyncio
+import time
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+import pytest
+from langchain_core.exceptions import ModelRateLimitError
+from langchain_core.messages import AIMessage
+from src.agent import graph
+from src.core import llm as llm_module
+from src.core.scheduler import BACKGROUND, LLMScheduler, TokenBucket, priority, retry_after
+
+
+class RateLimitedLLM:
+    """Stub model: fails the first `failures` requests with a Gemini-style 429."""
+
+    def __init__(self, failures: int, retry_in: float = 0.05):
+        self.failures = failures
+        self.retry_in = retry_in
+        self.attempts = []
+
+    def _respond(self):
+        self.attempts.append(time.monotonic())
+        if len(self.attempts) <= self.failures:
+            raise ModelRateLimitError(
+                f"429 RESOURCE_EXHAUSTED. Quota exceeded. Please retry in {self.retry_in}s."
+            )
+        return AIMessage(content="done", usage_metadata={"input_tokens": 10, "output_tokens": 2, "total_tokens": 12})
+
+    def invoke(self, messages, **kwargs):
+        return self._respond()
+
+    async def ainvoke(self, messages, **kwargs):
+        return self._respond()
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = LLMScheduler(max_retries=3, backoff_base=0.01, backoff_max=0.02)
+    monkeypatch.setattr(llm_module, "_scheduler", scheduler)
+    return scheduler
+
+
+def test_turn_survives_rate_limits_and_honours_retry_after(monkeypatch, scheduler):
+    stub = RateLimitedLLM(failures=2, retry_in=0.1)
+    monkeypatch.setattr(graph, "llm_with_tools", stub)
+
+    result = asyncio.run(
+        graph.app.ainvoke({"messages": [("user", "hello")], "step_count": 0})
+    )
+
+    assert result["messages"][-1].content == "done"
+    assert len(stub.attempts) == 3
+    gaps = [b - a for a, b in zip(stub.attempts, stub.attempts[1:])]
+    assert min(gaps) >= 0.1  # never sooner than the API asked
+    assert scheduler.stats["retries"] == 2 and scheduler.stats["rate_limited"] == 2
+
+
+def test_gives_up_after_max_retries(monkeypatch, scheduler):
+    monkeypatch.setattr(graph, "llm_with_tools", RateLimitedLLM(failures=10, retry_in=0.01))
+    with pytest.raises(ModelRateLimitError):
+        graph.app.invoke({"messages": [("user", "hello")], "step_count": 0})
+    assert scheduler.stats["retries"] == 3
+
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    bucket = TokenBucket(60, clock=lambda: now[0])  # 1 unit per second
+    bucket.take(60)
+    assert bucket.wait_time(3) == pytest.approx(3.0)
+    now[0] = 2.0
+    assert bucket.wait_time(3) == pytest.approx(1.0)
+    assert bucket.wait_time(1000) == pytest.approx(58.0)  # capped at a full bucket
+
+
+def test_interactive_requests_go_first():
+    scheduler = LLMScheduler(rpm=600)  # one request every 0.1 s once the burst is spent
+    scheduler.requests.level = 0
+    order = []
+
+    async def request(name, level):
+        async def call():
+            order.append(name)
+
+        with priority(level):
+            await scheduler.acall(call)
+
+    async def main():
+        background = [asyncio.create_task(request(f"bg{i}", BACKGROUND)) for i in range(3)]
+        await asyncio.sleep(0.01)
+        await request("interactive", 0)
+        await asyncio.gather(*background)
+
+    asyncio.run(main())
+    assert order.index("interactive") <= 1  # at most the already-admitted head went first
+
+
+def test_retry_after_parsing():
+    assert retry_after(Exception("429 RESOURCE_EXHAUSTED. {'retryDelay': '37s'}")) == 37
+    assert retry_after(Exception("Please retry in 2.5s.")) == 2.5
+    assert retry_after(Exception("500 INTERNAL")) is None
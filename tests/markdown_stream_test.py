@@ -0,0 +1,49 @@
+import sys
+import os
+import io
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from rich.console import Console
+from src.main import MarkdownStream
+
+
+def _stream():
+    out = io.StringIO()
+    return MarkdownStream(Console(file=out, width=60), interval=0), out
+
+
+def test_completed_blocks_are_printed_once():
+    stream, out = _stream()
+    for token in ["# Ti", "tle\n", "\nFirst para", "graph\n\nSecond", " one"]:
+        stream.feed(token)
+
+    # Both finished blocks were flushed; only the last one is still live.
+    assert stream.pending == "Second one"
+    assert stream.close() is True
+    text = out.getvalue()
+    assert text.count("Title") == 1
+    assert text.count("First paragraph") == 1
+    assert text.count("Second one") == 1
+    assert stream.close() is False
+
+
+def test_blank_lines_inside_a_code_fence_do_not_split_it():
+    stream, out = _stream()
+    stream.feed("```python\nx = 1\n\ny = 2\n")
+    assert stream.pending.startswith("```python")
+
+    stream.feed("```\n\nafter")
+    assert stream.pending == "after"
+    stream.close()
+    assert out.getvalue().count("x = 1") == 1
+
+
+def test_empty_tokens_start_nothing():
+    stream, out = _stream()
+    stream.feed("")
+    assert stream.close() is False
+    assert out.getvalue() == ""
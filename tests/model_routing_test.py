@@ -0,0 +1,61 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from src.agent import graph
+from src.agent.routing import FAST, STRONG, choose_tier
+from src.config import settings
+
+
+class TierStub:
+    """Stub model for one tier: calls read_file `reads` times, then answers."""
+
+    def __init__(self, name, calls, reads):
+        self.name = name
+        self.calls = calls
+        self.reads = reads
+
+    def invoke(self, messages, **kwargs):
+        self.calls.append(self.name)
+        if self.calls.count("fast") + self.calls.count("strong") <= self.reads:
+            return AIMessage(
+                content="",
+                tool_calls=[{"name": "read_file", "args": {"filename": "a.txt"}, "id": f"c{len(self.calls)}"}],
+            )
+        return AIMessage(content=f"answer from {self.name}")
+
+
+def test_continuation_steps_use_fast_model_and_answers_escalate(monkeypatch):
+    monkeypatch.setattr(settings, "fast_model", "stub-fast")
+    calls = []
+    monkeypatch.setattr(graph, "llm_with_tools", TierStub("strong", calls, reads=3))
+    monkeypatch.setattr(graph, "fast_llm_with_tools", TierStub("fast", calls, reads=3))
+
+    result = graph.app.invoke({"messages": [("user", "summarize a.txt")], "step_count": 0})
+
+    # Plan on strong, two mechanical hops on fast, the fast answer is redone on strong
+    assert calls == ["strong", "fast", "fast", "fast", "strong"]
+    assert result["messages"][-1].content == "answer from strong"
+    assert result["messages"][-1].response_metadata["tier"] == STRONG
+
+
+def test_routing_rules(monkeypatch):
+    monkeypatch.setattr(settings, "fast_model", "stub-fast")
+    call = AIMessage(content="", tool_calls=[{"name": "read_file", "args": {}, "id": "1"}])
+    ok = ToolMessage(content="contents", tool_call_id="1")
+    failed = ToolMessage(content="Error: File not found.", tool_call_id="1")
+    write = AIMessage(content="", tool_calls=[{"name": "write_file", "args": {}, "id": "1"}])
+
+    assert choose_tier([HumanMessage(content="hi")], 0)[0] == STRONG
+    assert choose_tier([HumanMessage(content="hi"), call, ok], 1)[0] == FAST
+    assert choose_tier([HumanMessage(content="hi"), call, failed], 1)[0] == STRONG
+    assert choose_tier([HumanMessage(content="hi"), write, ok], 1)[0] == STRONG
+    assert choose_tier([HumanMessage(content="hi"), call, ok], 14)[0] == STRONG
+
+    monkeypatch.setattr(settings, "fast_model", "")
+    assert choose_tier([HumanMessage(content="hi"), call, ok], 1)[0] == STRONG
@@ -0,0 +1,71 @@
+import sys
+import os
+from types import SimpleNamespace
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from langchain_core.messages import AIMessage, SystemMessage
+from src.agent import graph
+from src.agent.prompt import CONTEXT_MARKER, ContextCache, prefix_fingerprint
+
+
+class RecordingLLM:
+    """Stub model: asks for `list_files` twice, then answers."""
+
+    def __init__(self):
+        self.requests = []
+
+    def invoke(self, messages, **kwargs):
+        self.requests.append(messages)
+        if len(self.requests) < 3:
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "list_files", "args": {}, "id": f"call-{len(self.requests)}"}
+                ],
+            )
+        return AIMessage(content="done")
+
+
+def test_prefix_is_byte_identical_across_steps(monkeypatch):
+    stub = RecordingLLM()
+    monkeypatch.setattr(graph, "llm_with_tools", stub)
+
+    graph.app.invoke({"messages": [("user", "what is in the workspace?")], "step_count": 0})
+
+    assert len(stub.requests) == 3
+    for request in stub.requests:
+        assert isinstance(request[0], SystemMessage)
+        assert request[0].content == graph.SYSTEM_PROMPT
+        assert request[-1].content.startswith(CONTEXT_MARKER)
+
+    # History between the system prompt and the volatile tail only grows.
+    for before, after in zip(stub.requests, stub.requests[1:]):
+        old, new = before[1:-1], after[1:-1]
+        assert [m.content for m in new[: len(old)]] == [m.content for m in old]
+
+
+def test_tool_schema_fingerprint_is_stable():
+    first = prefix_fingerprint(graph.SYSTEM_PROMPT, graph.tools_list)
+    assert first == prefix_fingerprint(graph.SYSTEM_PROMPT, list(graph.tools_list))
+
+
+def test_context_cache_is_created_once_and_refreshed(monkeypatch):
+    calls = []
+    caches = SimpleNamespace(
+        create=lambda **kw: calls.append("create") or SimpleNamespace(name="cachedContents/1"),
+        update=lambda **kw: calls.append("update"),
+    )
+    llm = SimpleNamespace(client=SimpleNamespace(caches=caches), model="stub")
+    cache = ContextCache(llm, graph.SYSTEM_PROMPT, graph.tools_list, ttl=100)
+
+    assert cache.get_name() == "cachedContents/1"
+    assert cache.get_name() == "cachedContents/1"
+    assert calls == ["create"]
+
+    cache._expires_at = 0  # simulate the TTL running low
+    cache.get_name()
+    assert calls == ["create", "update"]
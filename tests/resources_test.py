@@ -0,0 +1,55 @@
+import sys
+import os
+import json
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from src.core.text_index import BM25Index
+from src.tools.resources import ResourceKB
+
+
+def _entry(url, category, summary):
+    return {"url": url, "category": category, "summary": summary, "date_added": "2026-01-01"}
+
+
+def test_bm25_ranks_the_closest_match_first():
+    index = BM25Index()
+    index.add(0, "python packaging guide")
+    index.add(1, "async python event loop internals")
+    index.add(2, "rust async runtime")
+
+    assert [doc for doc, _ in index.search("python async")][:1] == [1]
+    assert {doc for doc, _ in index.search("async")} == {1, 2}
+    assert [doc for doc, _ in index.search("async", allowed={2})] == [2]
+    assert index.search("the of and") == []
+
+
+def test_search_filters_by_category_and_follows_other_writers(tmp_path):
+    path = str(tmp_path / "resources_kb.jsonl")
+    kb = ResourceKB(path)
+    kb.append([
+        _entry("https://docs.python.org/3/library/asyncio.html", "Python", "asyncio event loop reference"),
+        _entry("https://tokio.rs", "Rust", "async runtime for rust"),
+    ])
+
+    assert [r["url"] for r in kb.search("async", category="rust")] == ["https://tokio.rs"]
+    assert len(kb.list("PYTHON")) == 1
+
+    # Another process appends to the same log; the index catches up on the next read.
+    ResourceKB(path).append([_entry("https://trio.readthedocs.io", "Python", "async library for python")])
+    assert [r["url"] for r in kb.search("async python", limit=1)] == ["https://trio.readthedocs.io"]
+    assert len(kb.list()) == 3
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = tmp_path / "resources_kb.json"
+    legacy.write_text(json.dumps([_entry("https://example.com", "Misc", "an example")]))
+    kb = ResourceKB(str(tmp_path / "resources_kb.jsonl"))
+
+    assert kb.migrate_json(str(legacy)) == 1
+    assert kb.migrate_json(str(legacy)) == 0
+    assert os.path.exists(str(legacy) + ".migrated")
+    assert [r["url"] for r in kb.list()] == ["https://example.com"]
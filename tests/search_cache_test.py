@@ -0,0 +1,57 @@
+import sys
+import os
+import types
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from src.config import settings
+from src.core.telemetry import current_metrics
+from src.tools import web
+
+
+def test_cached_search_shows_in_metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    monkeypatch.setattr(web, "_search_cache", None)
+    monkeypatch.setattr(web, "SEARCH_CACHE_STATS", {"hits": 0, "misses": 0, "saved_seconds": 0.0})
+    results = [{"title": "LangGraph", "href": "https://example.com", "body": "docs"}]
+    cache = web._get_search_cache()
+    assert cache.max_bytes == settings.search_cache_max_mb * 1024 * 1024
+    cache.set("langgraph docs", {"max_results": 5, "results": results, "latency": 0.8})
+
+    assert web._search_results("LangGraph  Docs", 3) == results
+
+    gauges = current_metrics()["gauges"]
+    assert gauges["search_cache_hits"] == 1
+    assert gauges["search_cache_hit_rate"] == 1.0
+    assert gauges["search_cache_saved_s"] == 0.8
+
+
+def test_stale_entry_is_refetched_at_its_own_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    monkeypatch.setattr(web, "_search_cache", None)
+    monkeypatch.setattr(web, "SEARCH_CACHE_STATS", {"hits": 0, "misses": 0, "saved_seconds": 0.0})
+    asked = []
+
+    class DDGS:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def text(self, query, max_results):
+            asked.append(max_results)
+            return [{"title": f"r{i}", "href": f"https://example.com/{i}", "body": ""} for i in range(max_results)]
+
+    monkeypatch.setitem(sys.modules, "duckduckgo_search", types.SimpleNamespace(DDGS=DDGS))
+    cache = web._get_search_cache()
+    cache.set("langgraph", {"max_results": 10, "results": [], "latency": 0.5}, ttl=-1)
+
+    assert len(web._search_results("langgraph", 3)) == 3
+    assert asked == [10]
+    # The refreshed entry still answers the larger request from the cache.
+    assert len(web._search_results("langgraph", 10)) == 10
+    assert asked == [10]
@@ -0,0 +1,55 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+import sqlite3
+import pytest
+from src.config import scoped_workspace, settings
+from src.server import SESSION_PATH, session_workspace
+from src.tools import memory, project
+from src.tools.memory import list_all_facts, store_fact
+from src.tools.project import explore_project
+
+
+def test_session_path_rejects_dot_ids():
+    for path in ("/sessions/..", "/sessions/.", "/sessions/../", "/sessions/.hidden", "/sessions/a/b"):
+        assert SESSION_PATH.match(path) is None, path
+    assert SESSION_PATH.match("/sessions/alice").group(1) == "alice"
+    assert SESSION_PATH.match("/sessions/run-1.2_b/").group(1) == "run-1.2_b"
+    assert SESSION_PATH.match("/sessions/").group(1) is None
+
+
+def test_session_workspace_stays_under_sessions(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+    sessions_dir = os.path.realpath(tmp_path / "sessions")
+    assert session_workspace("alice") == os.path.join(sessions_dir, "alice")
+    for session_id in ("..", ".", "../alice", "a/b"):
+        with pytest.raises(ValueError):
+            session_workspace(session_id)
+
+    os.makedirs(tmp_path / "sessions")
+    os.symlink(tmp_path, tmp_path / "sessions" / "escape")
+    with pytest.raises(ValueError):
+        session_workspace("escape")
+
+
+def test_per_session_stores_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory._stores, "size", 2)
+    monkeypatch.setattr(project._tree_indexes, "size", 2)
+    opened = []
+    for name in ("a", "b", "c"):
+        with scoped_workspace(str(tmp_path / name)):
+            store_fact.invoke({"key": "name", "value": name})
+            opened.append(memory._get_store())
+            explore_project.invoke({})
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].count()  # evicted and closed
+    assert opened[2].count() == 1
+    assert len(project._tree_indexes._items) == 2
+    with scoped_workspace(str(tmp_path / "a")):
+        assert "name: a" in list_all_facts.invoke({})  # reopened on the next use
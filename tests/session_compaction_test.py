@@ -0,0 +1,52 @@
+import sys
+import os
+import asyncio
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from langchain_core.messages import AIMessage
+from src.agent import graph
+from src.agent.sessions import open_sessions
+
+
+class EchoLLM:
+    def invoke(self, messages, **kwargs):
+        return AIMessage(content=f"reply {len(messages)}")
+
+    async def ainvoke(self, messages, **kwargs):
+        return self.invoke(messages)
+
+
+def test_compact_keeps_the_conversation(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph, "llm_with_tools", EchoLLM())
+
+    async def run():
+        async with open_sessions(str(tmp_path / "sessions.db")) as sessions:
+            config = sessions.config("alice")
+            for turn in range(3):
+                await sessions.app.ainvoke({"messages": [("user", f"turn {turn}")], "step_count": 0}, config)
+            before = (await sessions.app.aget_state(config)).values["messages"]
+
+            assert await sessions.compact("alice", keep=1)
+            assert await sessions.checkpoint_count("alice") == 1
+            after = (await sessions.app.aget_state(config)).values["messages"]
+            assert [m.content for m in after] == [m.content for m in before]
+
+            await sessions.app.ainvoke({"messages": [("user", "turn 3")], "step_count": 0}, config)
+            messages = (await sessions.app.aget_state(config)).values["messages"]
+            assert [m.content for m in messages[: len(before)]] == [m.content for m in before]
+            assert [m.content for m in messages[len(before) :]][0] == "turn 3"
+            assert len(messages) == len(before) + 2
+            rows = await sessions._execute("SELECT DISTINCT thread_id FROM writes")
+            assert rows == [("alice",)]
+
+            # A compaction cut off before its swap leaves only a scratch thread behind
+            await sessions.app.aupdate_state(sessions.config(".compact-0"), {"messages": before}, as_node="reason")
+            await sessions.setup()
+            rows = await sessions._execute("SELECT DISTINCT thread_id FROM checkpoints")
+            assert rows == [("alice",)]
+
+    asyncio.run(run())
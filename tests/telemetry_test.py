@@ -0,0 +1,20 @@
+import sys
+import os
+import json
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from src.core.telemetry import read_trace
+
+
+def test_read_trace_orders_backups_numerically(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    # trace.jsonl.1 is the newest backup; .10 is older than .2
+    for n in (1, 2, 10):
+        (tmp_path / f"trace.jsonl.{n}").write_text(json.dumps({"file": n}) + "\n")
+    path.write_text(json.dumps({"file": 0}) + "\n")
+    (tmp_path / "trace.jsonl.lock").write_text("not a backup\n")
+    assert [r["file"] for r in read_trace(str(path))] == [10, 2, 1, 0]
@@ -0,0 +1,89 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.graph import END, START, MessagesState, StateGraph
+from src.agent import tool_node
+from src.agent.tool_node import build_tool_node
+from src.config import settings
+
+
+class InFlight:
+    """Counts calls running at the same time."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.now = 0
+        self.peak = 0
+
+    def enter(self):
+        with self.lock:
+            self.now += 1
+            self.peak = max(self.peak, self.now)
+
+    def exit(self):
+        with self.lock:
+            self.now -= 1
+
+
+def _graph(tools):
+    """The tool node alone, compiled the way the agent graph runs it."""
+    builder = StateGraph(MessagesState)
+    builder.add_node("tools", build_tool_node(tools))
+    builder.add_edge(START, "tools")
+    builder.add_edge("tools", END)
+    return builder.compile()
+
+
+def _turn(name: str, calls: int) -> dict:
+    tool_calls = [{"name": name, "args": {"n": n}, "id": f"c{n}"} for n in range(calls)]
+    return {"messages": [AIMessage(content="", tool_calls=tool_calls)]}
+
+
+def test_async_tool_calls_run_concurrently_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "tool_concurrency", 2)
+    flight = InFlight()
+
+    @tool
+    async def slow(n: int) -> str:
+        """Waits a little."""
+        flight.enter()
+        await asyncio.sleep(0.2)
+        flight.exit()
+        return f"done {n}"
+
+    start = time.perf_counter()
+    result = asyncio.run(_graph([slow]).ainvoke(_turn("slow", 4)))
+    elapsed = time.perf_counter() - start
+
+    assert [m.content for m in result["messages"][1:]] == [f"done {n}" for n in range(4)]
+    assert flight.peak == 2
+    assert elapsed < 0.7  # two waves of 0.2 s, not four
+
+
+def test_sync_tool_calls_run_in_threads_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "tool_concurrency", 2)
+    monkeypatch.setattr(tool_node, "_thread_semaphore", None)
+    flight = InFlight()
+
+    @tool
+    def blocking(n: int) -> str:
+        """Blocks a little."""
+        flight.enter()
+        time.sleep(0.2)
+        flight.exit()
+        return f"done {n}"
+
+    result = _graph([blocking]).invoke(_turn("blocking", 4))
+
+    assert [m.content for m in result["messages"][1:]] == [f"done {n}" for n in range(4)]
+    assert flight.peak == 2
@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from langchain_core.messages import AIMessage, HumanMessage
+from src.agent import graph
+from src.agent.tool_selection import CORE_TOOLS, get_selector
+
+
+class RequestingLLM:
+    """Stub model: asks for a test runner, runs the tests, then answers.
+    Records the tool names bound to each request."""
+
+    def __init__(self):
+        self.bound = []
+
+    def invoke(self, messages, **kwargs):
+        self.bound.append({t["function"]["name"] for t in kwargs["tools"]})
+        step = len(self.bound)
+        if step == 1:
+            call = {"name": "request_tools", "args": {"need": "run a shell command"}, "id": "c1"}
+        elif step == 2:
+            call = {"name": "execute_command", "args": {"command": "echo ok"}, "id": "c2"}
+        else:
+            return AIMessage(content="tests pass")
+        return AIMessage(content="", tool_calls=[call])
+
+
+def test_request_tools_attaches_tools_for_the_rest_of_the_turn(monkeypatch):
+    stub = RequestingLLM()
+    monkeypatch.setattr(graph, "llm_with_tools", stub)
+
+    result = graph.app.invoke({"messages": [("user", "fix the typo in notes.md")], "step_count": 0})
+
+    assert result["messages"][-1].content == "tests pass"
+    assert stub.bound[0] == CORE_TOOLS  # a file edit needs nothing else
+    assert {"execute_command", "poll_job"} <= stub.bound[1]
+    assert stub.bound[1] == stub.bound[2]  # stable for the rest of the turn
+    assert len(stub.bound[1]) < len(graph.tools_list)
+
+
+def test_selection_follows_the_request_and_recent_usage():
+    selector = get_selector()
+
+    def selected(*messages):
+        return {t.name for t in selector.select(list(messages))} - CORE_TOOLS
+
+    assert "get_youtube_transcript" in selected(HumanMessage("summarize this youtube video"))
+    assert {"get_repo_history", "get_file_diffs"} <= selected(HumanMessage("what changed in the repo?"))
+    assert "create_routine" in selected(HumanMessage("plan my week, exam on friday"))
+
+    earlier = AIMessage(content="", tool_calls=[{"name": "search_web", "args": {"query": "x"}, "id": "c1"}])
+    follow_up = selected(HumanMessage("find langgraph docs"), earlier, HumanMessage("and the next one?"))
+    assert "search_web" in follow_up
@@ -0,0 +1,88 @@
+import sys
+import os
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+os.environ.setdefault("GOOGLE_API_KEY", "offline-test")
+os.environ.setdefault("TRACE_ENABLED", "false")
+
+from src.config import settings
+from src.core.tree_index import IgnoreRules, TreeIndex, iter_files
+from src.tools.project import explore_project
+
+
+def ignored(rules, path, is_dir=False):
+    return rules.match(path, is_dir) is True
+
+
+def test_ignore_rules():
+    rules = IgnoreRules("", ["/build/", "/out", "*.log", "!keep.log", "docs/**/draft.md", "cache/", "# comment"])
+    assert ignored(rules, "build", is_dir=True)
+    assert not ignored(rules, "src/build", is_dir=True)  # anchored directory rule
+    assert not ignored(rules, "build")  # directory-only
+    assert ignored(rules, "out") and not ignored(rules, "src/out")
+    assert ignored(rules, "src/debug.log")
+    assert rules.match("src/keep.log", False) is False  # re-included
+    assert ignored(rules, "docs/a/b/draft.md") and ignored(rules, "docs/draft.md")
+    assert ignored(rules, "src/cache", is_dir=True)  # unanchored directory rule
+
+    nested = IgnoreRules("pkg", ["/dist/"])
+    assert ignored(nested, "pkg/dist", is_dir=True)
+    assert not ignored(nested, "pkg/sub/dist", is_dir=True)
+
+
+def test_explore_honours_gitignore(tmp_path, monkeypatch):
+    for path in ("out/a.o", "src/out/main.c", "src/app.py", "src/app.log", "pkg/gen/x.whl", "pkg/setup.py"):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("x")
+    (tmp_path / ".gitignore").write_text("/out/\n*.log\n")
+    (tmp_path / "pkg" / ".gitignore").write_text("gen/\n")
+    monkeypatch.setattr(settings, "workspace_root", str(tmp_path))
+
+    tree = explore_project.invoke({})
+
+    for name in ("app.py", "main.c", "setup.py"):
+        assert name in tree
+    for name in ("a.o", "app.log", "x.whl"):
+        assert name not in tree
+
+
+def test_listings_are_rescanned_only_when_a_directory_changes(tmp_path):
+    root = tmp_path / "ws"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "app.py").write_text("x")
+
+    index = TreeIndex(str(root), str(tmp_path / "tree.json"))
+    assert index.listing("src") == ([], ["app.py"])
+    index.save()
+
+    reloaded = TreeIndex(str(root), str(tmp_path / "tree.json"))
+    assert reloaded.listing("src") == ([], ["app.py"])
+    assert reloaded.scans == 0  # nothing changed since the save
+
+    (root / "src" / "new.py").write_text("x")
+    assert reloaded.listing("src") == ([], ["app.py", "new.py"])
+    assert reloaded.scans == 1
+
+
+def test_walk_honours_gitignore_and_rescans_only_changed_dirs(tmp_path):
+    root = tmp_path / "ws"
+    for path in ("build/a.o", "src/build/main.c", "src/app.py", "src/app.log", "pkg/dist/x.whl", "pkg/setup.py"):
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text("x")
+    (root / ".gitignore").write_text("/build/\n*.log\n")
+    (root / "pkg" / ".gitignore").write_text("dist/\n")
+
+    index = TreeIndex(str(root), str(tmp_path / "tree.json"))
+    files = sorted(iter_files(index, "", set()))
+    assert files == [".gitignore", "pkg/.gitignore", "pkg/setup.py", "src/app.py", "src/build/main.c"]
+
+    index.save()
+    reloaded = TreeIndex(str(root), str(tmp_path / "tree.json"))
+    assert sorted(iter_files(reloaded, "", set())) == files
+    assert reloaded.scans == 0  # nothing changed since the save
+
+    (root / "src" / "new.py").write_text("x")
+    assert "src/new.py" in set(iter_files(reloaded, "", set()))
+    assert reloaded.scans == 1
@@ -0,0 +1,66 @@
+import sys
+import os
+import re
+
+# Add project root to sys.path to allow imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from src.core.trigram_index import TrigramIndex, literal_runs, mark_stale
+
+
+@pytest.mark.parametrize(
+    "pattern, literals",
+    [
+        ("def load_config", ["def load_config"]),
+        (r"def foo\(", ["def foo("]),
+        (r"hello[0-9]+world", ["hello", "world"]),
+        (r"colou?r_name", ["colo", "r_name"]),
+        (r"[\]abc]ode", ["ode"]),
+        (r"[^]abc]ode", ["ode"]),
+        (r"[]abc]ode", ["ode"]),
+        (r"[abc\\]xyz", ["xyz"]),
+        (r"foo\|bar", ["foo|bar"]),
+        (r"a\\|bcd", []),
+        (r"(abc|def)ghi", []),
+        (r"x{2,3}yzw", ["yzw"]),
+    ],
+)
+def test_literal_runs(pattern, literals):
+    assert literal_runs(pattern) == literals
+
+
+@pytest.mark.parametrize("pattern, text", [(r"[\]abc]ode", "]ode"), (r"ab?cdef", "acdef"), (r"(xy)?zzz", "zzz")])
+def test_literal_runs_are_in_every_match(pattern, text):
+    assert re.search(pattern, text)
+    assert all(literal in text for literal in literal_runs(pattern))
+
+
+def test_index_follows_edits(tmp_path):
+    def list_files():
+        return sorted(p.name for p in tmp_path.iterdir() if p.is_file())
+
+    (tmp_path / "a.py").write_text("def load_config(): pass\n")
+    (tmp_path / "b.py").write_text("import os\n")
+    index = TrigramIndex(str(tmp_path), list_files, str(tmp_path / ".cache" / "index.bin"))
+    index.refresh()
+    assert index.candidates(["load_config"]) == ["a.py"]
+
+    (tmp_path / "b.py").write_text("config = load_config()\n")
+    mark_stale(str(tmp_path / "b.py"))  # as write_file does
+    index.refresh()
+    assert index.candidates(["load_config"]) == ["a.py", "b.py"]
+
+    (tmp_path / "a.py").unlink()
+    (tmp_path / "c.py").write_text("load_config\n")
+    mark_stale()  # as a finished shell command does
+    index.refresh()
+    assert sorted(index.candidates(["load_config"])) == ["b.py", "c.py"]
+
+    # A new process starts from the saved copy and still revalidates it
+    index.save()
+    (tmp_path / "c.py").write_text("nothing here\n")
+    reloaded = TrigramIndex(str(tmp_path), list_files, str(tmp_path / ".cache" / "index.bin"))
+    assert reloaded.files
+    reloaded.refresh()
+    assert reloaded.candidates(["load_config"]) == ["b.py"]